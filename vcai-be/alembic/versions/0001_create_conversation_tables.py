@@ -0,0 +1,69 @@
+"""Create conversation, phase result and report tables
+
+Revision ID: 0001
+Revises:
+Create Date: 2024-09-01 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "conversations",
+        sa.Column("id", sa.String(length=64), primary_key=True),
+        sa.Column("status", sa.String(length=32), nullable=False),
+        sa.Column("prompt", sa.Text(), nullable=False),
+        sa.Column("files", sa.JSON(), nullable=False),
+        sa.Column("metadata", sa.JSON(), nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_conversations_created_at", "conversations", ["created_at"])
+    op.create_index("ix_conversations_status", "conversations", ["status"])
+
+    op.create_table(
+        "phase_results",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "conversation_id",
+            sa.String(length=64),
+            sa.ForeignKey("conversations.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("phase", sa.String(length=32), nullable=False),
+        sa.Column("agent_type", sa.String(length=32), nullable=False),
+        sa.Column("content", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_phase_results_conversation_id", "phase_results", ["conversation_id"])
+
+    op.create_table(
+        "reports",
+        sa.Column(
+            "conversation_id",
+            sa.String(length=64),
+            sa.ForeignKey("conversations.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("report", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("reports")
+    op.drop_index("ix_phase_results_conversation_id", table_name="phase_results")
+    op.drop_table("phase_results")
+    op.drop_index("ix_conversations_status", table_name="conversations")
+    op.drop_index("ix_conversations_created_at", table_name="conversations")
+    op.drop_table("conversations")
@@ -0,0 +1,28 @@
+"""Add overall score and keyset pagination index to conversations
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-09-08 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("conversations", sa.Column("overall_score", sa.Integer(), nullable=True))
+    op.drop_index("ix_conversations_created_at", table_name="conversations")
+    op.create_index("ix_conversations_created_at_id", "conversations", ["created_at", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_conversations_created_at_id", table_name="conversations")
+    op.create_index("ix_conversations_created_at", "conversations", ["created_at"])
+    op.drop_column("conversations", "overall_score")
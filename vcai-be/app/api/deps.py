@@ -0,0 +1,18 @@
+"""
+Shared FastAPI dependencies for API endpoints
+"""
+
+from fastapi import Request
+
+from app.services.job_queue import JobQueue
+from app.services.specialized_autogen_service import SpecializedAutoGenService
+
+
+def get_autogen_service(request: Request) -> SpecializedAutoGenService:
+    """Return the application-scoped specialized AutoGen service built at startup"""
+    return request.app.state.autogen_service
+
+
+def get_job_queue(request: Request) -> JobQueue:
+    """Return the application-scoped queue that runs startup analyses"""
+    return request.app.state.job_queue
@@ -6,6 +6,7 @@ from typing import List, Optional
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
+from app.core.config import settings
 from app.services.specialized_autogen_service import SpecializedAutoGenService
 
 router = APIRouter()
@@ -179,7 +180,7 @@ async def get_workflow_info():
             {
                 "phase": 2, 
                 "name": "Verification Conversations",
-                "description": "Verifier agent reviews each specialist analysis",
+                "description": "Verifier agent reviews each specialist analysis as soon as it is ready, concurrently",
                 "agents": ["verifier"],
                 "interactions": [
                     "marketing ↔ verifier",
@@ -197,5 +198,7 @@ async def get_workflow_info():
             }
         ],
         "total_duration_estimate": "6-13 minutes",
+        # Past this the report is returned with the unfinished sections marked missing
+        "deadline_seconds": settings.ANALYSIS_DEADLINE_SECONDS or None,
         "output": "Comprehensive startup success report with scores, recommendations, and next steps"
     }
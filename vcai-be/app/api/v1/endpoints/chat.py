@@ -2,13 +2,21 @@
 Chat endpoints for specialized AutoGen integration with file upload support
 """
 
+import uuid
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
 from pydantic import BaseModel
 import json
 
-from app.services.specialized_autogen_service import SpecializedAutoGenService
-from app.core.exceptions import AutoGenException
+from app.api.deps import get_autogen_service, get_job_queue
+from app.core.config import settings
+from app.services.file_ingestion import new_upload_dir, remove_upload_dir, save_upload
+from app.services.job_queue import JobQueue
+from app.services.specialized_autogen_service import WORKFLOW_PROFILES, SpecializedAutoGenService
+from app.services.websocket_manager import FINAL_STATUSES
+from app.core.exceptions import (
+    AutoGenException, ConflictException, QueueFullException, ValidationException
+)
 from app.models.schemas import ChatRequestSchema
 
 router = APIRouter()
@@ -37,49 +45,77 @@ class StartupAnalysisResponse(BaseModel):
     status: str
     message: str
     websocket_url: str
+    queue_position: int = 0
 
 
 @router.post("/analyze-startup", response_model=StartupAnalysisResponse)
 async def analyze_startup_idea(
     prompt: str = Form(...),
     conversation_id: Optional[str] = Form(None),
-    files: Optional[List[UploadFile]] = File(None)
+    force_refresh: bool = Form(False),
+    profile: str = Form(settings.WORKFLOW_PROFILE),
+    files: Optional[List[UploadFile]] = File(None),
+    job_queue: JobQueue = Depends(get_job_queue),
+    autogen_service: SpecializedAutoGenService = Depends(get_autogen_service),
 ):
-    """Start the specialized startup analysis workflow with file uploads"""
+    """Queue the specialized startup analysis workflow with file uploads
+    
+    profile selects the workflow ("standard" or "fast"). Returns 429 with
+    Retry-After when the queue is full and 409 when conversation_id is taken.
+    """
+    if profile not in WORKFLOW_PROFILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown profile {profile!r}, expected one of: {', '.join(WORKFLOW_PROFILES)}"
+        )
+    
     try:
-        autogen_service = SpecializedAutoGenService()
-        
-        # Process uploaded files
-        file_info = []
-        if files:
-            for file in files:
-                # In a real implementation, you'd save files and process them
-                file_info.append({
-                    "name": file.filename,
-                    "type": file.content_type,
-                    "size": file.size if hasattr(file, 'size') else 0
-                })
-        
-        # Start the analysis workflow (runs in background)
-        import asyncio
-        asyncio.create_task(autogen_service.process_startup_analysis(
-            prompt=prompt,
-            files=file_info,
-            conversation_id=conversation_id
-        ))
-        
-        # Generate conversation ID if not provided
+        # Generate conversation ID if not provided, so the client polls the same ID the workflow uses
         if not conversation_id:
-            import uuid
             conversation_id = str(uuid.uuid4())
+        elif await autogen_service.store.exists(conversation_id):
+            raise ConflictException(f"Conversation {conversation_id} already exists")
+        
+        # Stream uploads to disk; text is extracted when the analysis runs
+        file_info = []
+        upload_dir = new_upload_dir() if files else None
+        try:
+            for file in files or []:
+                file_info.append(await save_upload(file, upload_dir))
+            
+            # Queue the analysis workflow; it runs once a worker slot is free
+            ticket = await job_queue.submit(conversation_id, {
+                "prompt": prompt,
+                "files": file_info,
+                "conversation_id": conversation_id,
+                "force_refresh": force_refresh,
+                "profile": profile,
+            })
+        except BaseException:
+            # No run will read the files saved so far
+            if upload_dir is not None:
+                await remove_upload_dir(upload_dir)
+            raise
         
         return StartupAnalysisResponse(
             conversation_id=conversation_id,
-            status="started",
-            message="Startup analysis initiated. Connect to WebSocket for real-time updates.",
-            websocket_url=f"/api/v1/ws?conversation_id={conversation_id}"
+            status="queued",
+            message=(
+                f"Startup analysis queued with {ticket.position} ahead. "
+                "Connect to WebSocket for real-time updates."
+            ),
+            websocket_url=f"/api/v1/ws?conversation_id={conversation_id}",
+            queue_position=ticket.position
         )
     
+    except QueueFullException as e:
+        raise HTTPException(
+            status_code=429, detail=e.message, headers={"Retry-After": str(e.retry_after)}
+        )
+    except ConflictException as e:
+        raise HTTPException(status_code=409, detail=e.message)
+    except ValidationException as e:
+        raise HTTPException(status_code=413, detail=e.message)
     except AutoGenException as e:
         raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
@@ -102,10 +138,12 @@ async def send_simple_message(request: ChatRequestSchema):
 
 
 @router.get("/conversations/{conversation_id}")
-async def get_conversation(conversation_id: str):
+async def get_conversation(
+    conversation_id: str,
+    autogen_service: SpecializedAutoGenService = Depends(get_autogen_service),
+):
     """Get conversation history by ID"""
     try:
-        autogen_service = SpecializedAutoGenService()
         conversation = await autogen_service.get_conversation(conversation_id)
         
         if not conversation:
@@ -113,31 +151,95 @@ async def get_conversation(conversation_id: str):
         
         return conversation
     
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.delete("/conversations/{conversation_id}")
+async def cancel_conversation(
+    conversation_id: str,
+    autogen_service: SpecializedAutoGenService = Depends(get_autogen_service),
+    job_queue: JobQueue = Depends(get_job_queue),
+):
+    """Cancel a queued or running analysis, releasing its LLM calls
+    
+    Returns 409 if the analysis already finished.
+    """
+    try:
+        conversation = await autogen_service.get_conversation(conversation_id)
+        if conversation and conversation.get("status") in FINAL_STATUSES:
+            raise HTTPException(
+                status_code=409, 
+                detail=f"Conversation already {conversation['status']}"
+            )
+        
+        if not await job_queue.cancel(conversation_id):
+            if not conversation:
+                raise HTTPException(status_code=404, detail="Conversation not found")
+            # Left processing by a process that no longer runs it
+            await autogen_service.record_cancellation(conversation_id)
+        elif not conversation:
+            # Withdrawn before it started, so no run will store or report it
+            await autogen_service.record_withdrawal(conversation_id)
+        
+        return {"conversation_id": conversation_id, "status": "cancelled"}
+    
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
 @router.get("/conversations")
-async def list_conversations(limit: int = 10, offset: int = 0):
-    """List all conversations with pagination"""
+async def list_conversations(
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    offset: Optional[int] = Query(None, include_in_schema=False),
+    autogen_service: SpecializedAutoGenService = Depends(get_autogen_service),
+):
+    """List conversations newest first; pass next_cursor back as cursor for the next page"""
+    if offset is not None:
+        # Ignoring it would silently return the first page every time
+        raise HTTPException(
+            status_code=400, detail="offset is no longer supported, pass next_cursor as cursor"
+        )
+    
     try:
-        autogen_service = SpecializedAutoGenService()
-        conversations = await autogen_service.list_conversations(limit=limit, offset=offset)
+        conversations = await autogen_service.list_conversations(
+            limit=limit, cursor=cursor, fields=fields
+        )
         return conversations
     
+    except ValidationException as e:
+        raise HTTPException(status_code=400, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
 @router.get("/conversations/{conversation_id}/status")
-async def get_conversation_status(conversation_id: str):
+async def get_conversation_status(
+    conversation_id: str,
+    autogen_service: SpecializedAutoGenService = Depends(get_autogen_service),
+    job_queue: JobQueue = Depends(get_job_queue),
+):
     """Get the current status of a conversation"""
     try:
-        autogen_service = SpecializedAutoGenService()
         conversation = await autogen_service.get_conversation(conversation_id)
         
         if not conversation:
-            raise HTTPException(status_code=404, detail="Conversation not found")
+            # Not started yet: report where it is in the queue
+            position = await job_queue.position(conversation_id)
+            if position is None:
+                raise HTTPException(status_code=404, detail="Conversation not found")
+            return {
+                "conversation_id": conversation_id,
+                "status": "queued",
+                "queue_position": position,
+                "has_final_report": False
+            }
         
         return {
             "conversation_id": conversation_id,
@@ -147,5 +249,7 @@ async def get_conversation_status(conversation_id: str):
             "has_final_report": "final_report" in conversation
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -2,7 +2,13 @@
 Health check endpoints
 """
 
-from fastapi import APIRouter
+import os
+
+from fastapi import APIRouter, Request
+
+from app.services import llm_http
+from app.services.llm_executor import llm_executor
+from app.services.websocket_manager import manager as websocket_manager
 
 router = APIRouter()
 
@@ -14,11 +20,13 @@ async def health_check():
 
 
 @router.get("/detailed")
-async def detailed_health_check():
+async def detailed_health_check(request: Request):
     """Detailed health check with system information"""
     import psutil
     import time
     
+    autogen_service = getattr(request.app.state, "autogen_service", None)
+    
     return {
         "status": "healthy",
         "service": "vcai-backend-api",
@@ -27,5 +35,23 @@ async def detailed_health_check():
             "cpu_percent": psutil.cpu_percent(),
             "memory_percent": psutil.virtual_memory().percent,
             "disk_percent": psutil.disk_usage('/').percent
-        }
+        },
+        "process": {
+            "pid": os.getpid(),
+            "rss_bytes": psutil.Process().memory_info().rss,
+        },
+        "agent_pool": autogen_service.session_pool.stats() if autogen_service else None,
+        "agent_calls": autogen_service.resilience.stats() if autogen_service else None,
+        "model_router": autogen_service.model_router.stats() if autogen_service else None,
+        "llm_executor": llm_executor.stats(),
+        "llm_http": llm_http.stats(),
+        "websocket": websocket_manager.stats(),
+        "job_queue": (
+            await request.app.state.job_queue.stats()
+            if hasattr(request.app.state, "job_queue") else None
+        ),
+        "result_cache": (
+            autogen_service.result_cache.stats()
+            if autogen_service and autogen_service.result_cache else None
+        ),
     }
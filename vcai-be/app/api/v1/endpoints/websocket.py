@@ -20,9 +20,13 @@ router = APIRouter()
 async def websocket_endpoint(
     websocket: WebSocket,
     client_id: Optional[str] = Query(None),
-    conversation_id: Optional[str] = Query(None)
+    conversation_id: Optional[str] = Query(None),
+    last_seq: Optional[int] = Query(None)
 ):
-    """WebSocket endpoint for real-time communication"""
+    """WebSocket endpoint for real-time communication
+    
+    Pass last_seq (0 on first connect) to have events after it replayed before live ones.
+    """
     
     # Generate client ID if not provided
     if not client_id:
@@ -34,7 +38,6 @@ async def websocket_endpoint(
         
         # Join conversation if specified
         if conversation_id:
-            manager.join_conversation(client_id, conversation_id)
             await manager.send_personal_message(
                 {
                     "type": "connection_established",
@@ -44,6 +47,7 @@ async def websocket_endpoint(
                 },
                 client_id
             )
+            manager.join_conversation(client_id, conversation_id, last_seq)
         else:
             await manager.send_personal_message(
                 {
@@ -90,7 +94,7 @@ async def websocket_endpoint(
     except Exception as e:
         logger.error(f"WebSocket error for client {client_id}: {e}")
     finally:
-        manager.disconnect(client_id)
+        manager.disconnect(client_id, websocket)
 
 
 async def handle_websocket_message(client_id: str, message: dict):
@@ -101,7 +105,6 @@ async def handle_websocket_message(client_id: str, message: dict):
     if message_type == "join_conversation":
         conversation_id = message.get("conversation_id")
         if conversation_id:
-            manager.join_conversation(client_id, conversation_id)
             await manager.send_personal_message(
                 {
                     "type": "joined_conversation",
@@ -110,6 +113,20 @@ async def handle_websocket_message(client_id: str, message: dict):
                 },
                 client_id
             )
+            manager.join_conversation(client_id, conversation_id, message.get("last_seq"))
+    
+    elif message_type == "leave_conversation":
+        conversation_id = message.get("conversation_id")
+        if conversation_id:
+            manager.leave_conversation(client_id, conversation_id)
+            await manager.send_personal_message(
+                {
+                    "type": "left_conversation",
+                    "conversation_id": conversation_id,
+                    "message": f"Left conversation {conversation_id}"
+                },
+                client_id
+            )
     
     elif message_type == "ping":
         await manager.send_personal_message(
@@ -3,7 +3,7 @@ Application configuration settings
 """
 
 import secrets
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 
 from pydantic import AnyHttpUrl, validator
 from pydantic_settings import BaseSettings
@@ -37,18 +37,130 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./vcai.db"
     DATABASE_TEST_URL: Optional[str] = None
+    DATABASE_CREATE_TABLES: bool = True  # Disable where alembic migrations own the schema
+    DATABASE_FLUSH_INTERVAL_MS: int = 200
+    DATABASE_BATCH_SIZE: int = 50
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
     
+    # WebSocket events between workers: "memory" (single worker) or "redis" (uses REDIS_URL)
+    EVENT_BUS_BACKEND: str = "memory"
+    EVENT_BUS_CHANNEL_PREFIX: str = "vcai:ws:"
+    
     # OpenAI Configuration for AutoGen
     OPENAI_API_KEY: str = ""
     OPENAI_MODEL: str = "gpt-4-turbo-preview"
+    OPENAI_BASE_URL: Optional[str] = None  # e.g. scripts/mock_llm_server.py at http://localhost:8100/v1
+    
+    # Models in order of preference per agent type or per phase ("specialist_analysis",
+    # "verification", "summary"), as JSON: AGENT_MODELS='{"verifier": ["gpt-4o-mini", "gpt-4o"]}'.
+    # An agent's own entry wins over its phase's; both default to [OPENAI_MODEL]
+    AGENT_MODELS: Dict[str, List[str]] = {}
+    PHASE_MODELS: Dict[str, List[str]] = {}
+    
+    # A model is passed over while its calls in the window have failed more often than the
+    # max error rate or have a p95 latency over the limit (0 disables the latency check)
+    MODEL_ROUTER_WINDOW_SECONDS: int = 5 * 60
+    MODEL_ROUTER_MIN_SAMPLES: int = 5
+    MODEL_ROUTER_MAX_ERROR_RATE: float = 0.25
+    MODEL_ROUTER_MAX_P95_SECONDS: float = 120.0
     
     # AutoGen Configuration
     AUTOGEN_CACHE_SEED: int = 42
     AUTOGEN_WORK_DIR: str = "./autogen_workdir"
     
+    # Isolated proxy + agent sessions kept per agent type
+    AGENT_POOL_SIZE: int = 4
+    
+    # LLM call limits shared by all agents in the process (0 disables a rate limit)
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_REQUESTS_PER_MINUTE: int = 500
+    LLM_TOKENS_PER_MINUTE: int = 150000
+    LLM_REQUEST_TIMEOUT_SECONDS: float = 180.0  # Per HTTP request, so a hung call frees its thread
+    # Cancelled thread-mode calls that may finish on spare threads after giving their slot to
+    # the next call; past this many, a cancelled call keeps its slot until its thread returns
+    LLM_MAX_ABANDONED_CALLS: int = 16
+    
+    # "thread": AutoGen chats on the LLM executor's threads; "async": agent chats are
+    # coroutines on an async completion client and hold no thread while waiting
+    LLM_EXECUTION_MODE: str = "thread"
+    
+    # One pooled HTTP client shared by every agent; HTTP/2 is used when h2 is installed
+    LLM_HTTP2: bool = True
+    LLM_HTTP_MAX_CONNECTIONS: int = 32
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 32
+    LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    
+    # Agent calls are retried on 429, 5xx and timeouts with full-jitter exponential backoff
+    LLM_RETRY_ATTEMPTS: int = 3
+    LLM_RETRY_BASE_DELAY_SECONDS: float = 1.0
+    LLM_RETRY_MAX_DELAY_SECONDS: float = 30.0
+    
+    # Hedging: a call slower than this percentile of its agent's recent calls gets a
+    # duplicate and the first reply wins; at most LLM_HEDGE_MAX_RATE of calls are hedged
+    LLM_HEDGE_ENABLED: bool = False
+    LLM_HEDGE_PERCENTILE: float = 95.0
+    LLM_HEDGE_MAX_RATE: float = 0.05
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    LLM_HEDGE_WINDOW: int = 200
+    
+    # Stream agent completions to WebSocket clients as agent_message_delta frames
+    STREAM_AGENT_OUTPUT: bool = True
+    STREAM_FLUSH_INTERVAL_MS: int = 50
+    
+    # Uploaded pitch materials: streamed to disk, extracted in a process pool and
+    # ranked into each specialist's prompt up to INGESTION_TOKENS_PER_AGENT
+    UPLOAD_DIR: str = "./uploads"
+    UPLOAD_CHUNK_BYTES: int = 1024 * 1024
+    UPLOAD_MAX_BYTES: int = 50 * 1024 * 1024
+    INGESTION_PROCESS_WORKERS: int = 2
+    INGESTION_CHUNK_TOKENS: int = 300
+    INGESTION_MAX_CHARS: int = 2_000_000
+    INGESTION_TOKENS_PER_AGENT: int = 1500
+    UPLOAD_TTL_SECONDS: int = 24 * 60 * 60  # Swept at startup if a run never cleaned up
+    
+    # Startup analyses run through a job queue: "inprocess" or "celery" (broker: REDIS_URL)
+    JOB_QUEUE_BACKEND: str = "inprocess"
+    JOB_WORKER_CONCURRENCY: int = 4
+    JOB_QUEUE_MAX_LENGTH: int = 100
+    JOB_DEFAULT_DURATION_SECONDS: int = 60  # Used for Retry-After until runs have been timed
+    
+    # Outbound frames queued per WebSocket client before it is treated as a slow consumer
+    WS_SEND_QUEUE_SIZE: int = 256
+    WS_SEND_TIMEOUT_SECONDS: float = 10.0
+    
+    # Recent events kept per conversation so clients can resume with last_seq
+    EVENT_LOG_MAX_EVENTS: int = 2000
+    EVENT_LOG_MAX_BYTES: int = 64 * 1024 * 1024
+    EVENT_LOG_TTL_SECONDS: int = 10 * 60
+    
+    # Default workflow profile: "standard" (one verification per specialist) or "fast" (one batched verification)
+    WORKFLOW_PROFILE: str = "standard"
+    
+    # Wall-clock limits per analysis (0 disables one); specialists still running at their
+    # limit are cancelled and the report is built from those that finished
+    ANALYSIS_DEADLINE_SECONDS: int = 15 * 60
+    SPECIALIST_PHASE_TIMEOUT_SECONDS: int = 10 * 60  # Analysis plus verification
+    SUMMARY_PHASE_TIMEOUT_SECONDS: int = 4 * 60
+    JOB_CANCEL_POLL_SECONDS: float = 1.0  # How often Celery workers check for cancellation
+    
+    # Summary agent output: "json_schema" (models with structured outputs), "json_object" or "text"
+    SUMMARY_RESPONSE_FORMAT: str = "json_object"
+    
+    # Input token budgets; longer analyses are trimmed to headings, scores and recommendations first
+    VERIFICATION_PROMPT_MAX_TOKENS: int = 3000
+    SUMMARY_PROMPT_MAX_TOKENS: int = 6000
+    
+    # Agent replies cached per phase by idea fingerprint, system message and model
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_MAX_ENTRIES: int = 1024
+    RESULT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESULT_CACHE_TTL_SECONDS: int = 6 * 60 * 60
+    
+    # Prometheus scrape endpoint at /metrics; set PROMETHEUS_MULTIPROC_DIR when running several workers
+    METRICS_ENABLED: bool = True
+    
     # Environment
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
@@ -27,6 +27,19 @@ class ValidationException(VcAiException):
         super().__init__(message, status_code=400)
 
 
+class ConflictException(VcAiException):
+    """Exception raised when a resource with the same ID already exists"""
+    def __init__(self, message: str):
+        super().__init__(message, status_code=409)
+
+
+class QueueFullException(VcAiException):
+    """Exception raised when the analysis queue cannot accept more work"""
+    def __init__(self, message: str, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__(message, status_code=429)
+
+
 async def vcai_exception_handler(request: Request, exc: VcAiException):
     """Handle custom VcAi exceptions"""
     return JSONResponse(
@@ -35,7 +48,8 @@ async def vcai_exception_handler(request: Request, exc: VcAiException):
             "error": exc.__class__.__name__,
             "message": exc.message,
             "status_code": exc.status_code
-        }
+        },
+        headers={"Retry-After": str(exc.retry_after)} if isinstance(exc, QueueFullException) else None
     )
 
 
@@ -47,7 +61,8 @@ async def http_exception_handler(request: Request, exc: HTTPException):
             "error": "HTTPException",
             "message": exc.detail,
             "status_code": exc.status_code
-        }
+        },
+        headers=getattr(exc, "headers", None)
     )
 
 
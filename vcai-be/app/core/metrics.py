@@ -0,0 +1,135 @@
+"""
+Prometheus metrics for the analysis workflow, LLM executor and WebSocket delivery
+
+Updates are in-process counter increments, cheap enough for every call. When
+PROMETHEUS_MULTIPROC_DIR is set (several uvicorn workers), values are shared
+through that directory and /metrics aggregates every worker.
+"""
+
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+
+# LLM-bound work: from tens of milliseconds (cache, short replies) to minutes
+LLM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600)
+# Local waits and socket writes
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+FANOUT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+ANALYSIS_PHASE_SECONDS = Histogram(
+    "vcai_analysis_phase_seconds",
+    "Duration of each phase of a startup analysis",
+    ["phase"],
+    buckets=LLM_BUCKETS,
+)
+ANALYSIS_ERRORS = Counter(
+    "vcai_analysis_errors_total",
+    "Startup analyses that failed, by the phase they failed in",
+    ["phase"],
+)
+ANALYSIS_CANCELLED = Counter(
+    "vcai_analysis_cancelled_total",
+    "Startup analyses cancelled by a client, by the phase they were cancelled in",
+    ["phase"],
+)
+ANALYSIS_PARTIAL = Counter(
+    "vcai_analysis_partial_total",
+    "Startup analyses completed with sections missing after a timeout",
+)
+ACTIVE_ANALYSES = Gauge(
+    "vcai_active_analyses",
+    "Startup analyses currently running in this process",
+    multiprocess_mode="livesum",
+)
+
+AGENT_CALL_SECONDS = Histogram(
+    "vcai_agent_call_seconds",
+    "Duration of one agent chat, including executor queue wait",
+    ["agent_type"],
+    buckets=LLM_BUCKETS,
+)
+AGENT_TOKENS = Counter(
+    "vcai_agent_tokens_total",
+    "Estimated tokens sent to (in) and received from (out) each agent",
+    ["agent_type", "direction"],
+)
+AGENT_RETRIES = Counter(
+    "vcai_agent_retries_total",
+    "Agent calls retried after a transient failure",
+    ["agent_type", "reason"],
+)
+AGENT_HEDGES = Counter(
+    "vcai_agent_hedges_total",
+    "Duplicate calls fired for slow agent calls, by whether the duplicate finished first",
+    ["agent_type", "outcome"],
+)
+MODEL_CALLS = Counter(
+    "vcai_model_calls_total",
+    "Agent calls by the model they were routed to and their outcome",
+    ["agent_type", "model", "outcome"],
+)
+MODEL_FALLBACKS = Counter(
+    "vcai_model_fallbacks_total",
+    "Agent calls routed past a degraded preferred model, by the model used instead",
+    ["agent_type", "model"],
+)
+
+LLM_QUEUE_WAIT_SECONDS = Histogram(
+    "vcai_llm_queue_wait_seconds",
+    "Time an LLM call waited for rate limits and an executor slot",
+    buckets=FAST_BUCKETS + (30, 60),
+)
+AGENT_POOL_WAIT_SECONDS = Histogram(
+    "vcai_agent_pool_wait_seconds",
+    "Time a chat waited to check out a pooled agent session",
+    ["agent_type"],
+    buckets=FAST_BUCKETS + (30, 60),
+)
+LLM_HTTP_REQUESTS = Counter(
+    "vcai_llm_http_requests_total",
+    "HTTP requests to the LLM API through the shared client",
+    ["http_version"],
+)
+LLM_HTTP_CONNECTIONS = Counter(
+    "vcai_llm_http_connections_opened_total",
+    "New TCP connections to the LLM API; requests minus this is connection reuse",
+)
+LLM_TLS_HANDSHAKES = Counter(
+    "vcai_llm_tls_handshakes_total",
+    "TLS handshakes with the LLM API",
+)
+
+WS_CONNECTIONS = Gauge(
+    "vcai_websocket_connections",
+    "Open WebSocket connections",
+    multiprocess_mode="livesum",
+)
+WS_SEND_SECONDS = Histogram(
+    "vcai_websocket_send_seconds",
+    "Time to write one frame to a WebSocket",
+    buckets=FAST_BUCKETS,
+)
+WS_BROADCAST_FANOUT = Histogram(
+    "vcai_websocket_broadcast_fanout",
+    "Local clients a conversation event was queued for",
+    buckets=FANOUT_BUCKETS,
+)
+
+
+def render_metrics() -> tuple:
+    """Exposition text and content type for the /metrics endpoint"""
+    registry = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,63 @@
+"""
+SQLAlchemy models for persisted conversations
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import JSON, DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+
+class Base(DeclarativeBase):
+    """Declarative base for all tables"""
+
+
+class ConversationRecord(Base):
+    """One startup analysis run"""
+
+    __tablename__ = "conversations"
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    status: Mapped[str] = mapped_column(String(32))
+    prompt: Mapped[str] = mapped_column(Text)
+    files: Mapped[List[Dict[str, Any]]] = mapped_column(JSON, default=list)
+    # "metadata" is reserved on declarative classes
+    metadata_: Mapped[Dict[str, Any]] = mapped_column("metadata", JSON, default=dict)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    overall_score: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Serves newest-first keyset pagination on (created_at, id)
+        Index("ix_conversations_created_at_id", "created_at", "id"),
+        Index("ix_conversations_status", "status"),
+    )
+
+
+class PhaseResultRecord(Base):
+    """Output of one agent in one workflow phase"""
+
+    __tablename__ = "phase_results"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    conversation_id: Mapped[str] = mapped_column(
+        String(64), ForeignKey("conversations.id", ondelete="CASCADE"), index=True
+    )
+    phase: Mapped[str] = mapped_column(String(32))
+    agent_type: Mapped[str] = mapped_column(String(32))
+    content: Mapped[Dict[str, Any]] = mapped_column(JSON)
+    created_at: Mapped[datetime] = mapped_column(DateTime)
+
+
+class ReportRecord(Base):
+    """Final structured report of a conversation"""
+
+    __tablename__ = "reports"
+
+    conversation_id: Mapped[str] = mapped_column(
+        String(64), ForeignKey("conversations.id", ondelete="CASCADE"), primary_key=True
+    )
+    report: Mapped[Dict[str, Any]] = mapped_column(JSON)
+    created_at: Mapped[datetime] = mapped_column(DateTime)
@@ -0,0 +1,34 @@
+"""
+Async database engine and session factory
+"""
+
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+# Async drivers for the sync URLs used in settings and docker-compose
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def get_async_database_url(database_url: str) -> str:
+    """Swap a plain database URL to its async driver"""
+    scheme, sep, rest = database_url.partition("://")
+    if "+" in scheme:
+        base, _, driver = scheme.partition("+")
+        # Sync drivers such as psycopg2 can't be used with the async engine
+        if driver in ("aiosqlite", "asyncpg"):
+            return database_url
+        scheme = base
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+def create_engine(database_url: str) -> AsyncEngine:
+    """Create an async engine for the configured database"""
+    return create_async_engine(get_async_database_url(database_url), pool_pre_ping=True)
+
+
+def create_session_factory(engine: AsyncEngine) -> async_sessionmaker:
+    """Session factory that keeps objects usable after commit"""
+    return async_sessionmaker(engine, expire_on_commit=False)
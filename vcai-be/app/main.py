@@ -2,13 +2,64 @@
 Main FastAPI application entry point for VcAi Backend
 """
 
-from fastapi import FastAPI
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 
 from app.api.v1.api import api_router
 from app.core.config import settings
 from app.core.exceptions import add_exception_handlers
+from app.core.metrics import render_metrics
+from app.services import file_ingestion, llm_http
+from app.services.job_queue import create_job_queue
+from app.services.specialized_autogen_service import SpecializedAutoGenService
+from app.services.websocket_manager import manager as websocket_manager
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build process-wide services once, before the first request is served"""
+    started = time.perf_counter()
+    
+    # Agent construction is blocking (LLM clients, work dir), keep it off the event loop
+    autogen_service = await asyncio.to_thread(SpecializedAutoGenService)
+    await autogen_service.store.init()
+    app.state.autogen_service = autogen_service
+    
+    # Uploads are deleted when their analysis finishes; this catches runs that never did
+    removed = await asyncio.to_thread(file_ingestion.sweep_uploads, settings.UPLOAD_TTL_SECONDS)
+    if removed:
+        logger.info(f"Removed {removed} stale upload directories")
+    
+    # Receive events published by analyses running on other workers
+    await websocket_manager.start()
+    
+    # Analyses run through a bounded queue instead of untracked background tasks
+    job_queue = create_job_queue(
+        lambda job: autogen_service.process_startup_analysis(**job)
+    )
+    await job_queue.start()
+    app.state.job_queue = job_queue
+    
+    logger.info(
+        f"SpecializedAutoGenService warmed in {(time.perf_counter() - started) * 1000:.1f} ms"
+    )
+    
+    yield
+    
+    await job_queue.close()
+    await websocket_manager.close()
+    file_ingestion.shutdown_pool()
+    await autogen_service.store.close()
+    await llm_http.aclose_llm_http_clients()
+
 
 # Create FastAPI instance
 app = FastAPI(
@@ -18,6 +69,7 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url=f"{settings.API_V1_STR}/docs",
     redoc_url=f"{settings.API_V1_STR}/redoc",
+    lifespan=lifespan,
 )
 
 # Set up CORS
@@ -56,6 +108,14 @@ async def health_check():
     return {"status": "healthy", "service": "vcai-backend"}
 
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus scrape endpoint"""
+        body, content_type = render_metrics()
+        return Response(content=body, media_type=content_type)
+
+
 if __name__ == "__main__":
     import uvicorn
     
@@ -0,0 +1,180 @@
+"""
+Pool of isolated AutoGen agent sessions for concurrent analyses
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, Tuple
+
+from autogen import ConversableAgent, UserProxyAgent
+
+from app.core.metrics import AGENT_POOL_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+def session_key(agent_type: str, model: Optional[str] = None) -> str:
+    """Pool key for an agent type's sessions on one model"""
+    return f"{agent_type}:{model}" if model else agent_type
+
+
+def parse_session_key(key: str) -> Tuple[str, Optional[str]]:
+    """(agent_type, model) from a pool key; model names may contain colons, agent types don't"""
+    agent_type, _, model = key.partition(":")
+    return agent_type, model or None
+
+
+class AgentSession:
+    """A user proxy + agent pair that serves one chat at a time"""
+
+    def __init__(
+        self,
+        agent_type: str,
+        agent: ConversableAgent,
+        user_proxy: UserProxyAgent,
+        model: Optional[str] = None,
+    ):
+        self.agent_type = agent_type
+        self.agent = agent
+        self.user_proxy = user_proxy
+        self.model = model
+        # Agents are built for one model, so sessions are pooled per agent type and model
+        self.key = session_key(agent_type, model)
+
+    def reset(self):
+        """Clear chat history on both sides so the next checkout starts clean"""
+        self.user_proxy.reset()
+        self.agent.reset()
+
+
+class AgentSessionPool:
+    """Bounded pool of sessions per key (see session_key) with checkout/checkin"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[str], AgentSession],
+        keys: Iterable[str],
+        size: int,
+    ):
+        if size < 1:
+            raise ValueError("Agent session pool size must be at least 1")
+
+        self.size = size
+        self._session_factory = session_factory
+        self._idle: Dict[str, asyncio.Queue] = {key: asyncio.Queue() for key in keys}
+        self._created: Dict[str, int] = {key: 0 for key in self._idle}
+        self._in_use: Dict[str, int] = {key: 0 for key in self._idle}
+        self._waiters: Dict[str, int] = {key: 0 for key in self._idle}
+        self._waiting = 0
+
+        # Wait time metrics
+        self._checkouts = 0
+        self._total_wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    def warm(self, keys: Optional[Iterable[str]] = None):
+        """Build sessions up front so no request pays agent construction; all keys by default"""
+        for key in self._idle if keys is None else keys:
+            while self._created[key] < self.size:
+                self._idle[key].put_nowait(self._session_factory(key))
+                self._created[key] += 1
+
+    async def checkout(self, key: str) -> AgentSession:
+        """Take an idle session, building one if the pool has room, otherwise wait"""
+        if key not in self._idle:
+            raise KeyError(f"Unknown agent session key: {key}")
+
+        idle = self._idle[key]
+        started = time.perf_counter()
+
+        if idle.empty() and self._created[key] < self.size:
+            session = await self._build(key)
+        else:
+            self._waiting += 1
+            self._waiters[key] += 1
+            try:
+                while True:
+                    session = await idle.get()
+                    if session is not None:
+                        break
+                    # A slot was freed: build its replacement, unless another checkout already has
+                    if self._created[key] < self.size:
+                        session = await self._build(key)
+                        break
+            finally:
+                self._waiting -= 1
+                self._waiters[key] -= 1
+
+        waited = time.perf_counter() - started
+        self._checkouts += 1
+        self._total_wait_seconds += waited
+        self._max_wait_seconds = max(self._max_wait_seconds, waited)
+        AGENT_POOL_WAIT_SECONDS.labels(agent_type=session.agent_type).observe(waited)
+        self._in_use[key] += 1
+
+        return session
+
+    async def _build(self, key: str) -> AgentSession:
+        self._created[key] += 1
+        try:
+            return await asyncio.to_thread(self._session_factory, key)
+        except BaseException:
+            self._release_slot(key)
+            raise
+
+    def _release_slot(self, key: str):
+        """Give up a session's place in the pool, waking a waiter to build a replacement"""
+        self._created[key] -= 1
+        if self._waiters[key]:
+            # None in the idle queue tells the waiter that gets it to build a session
+            self._idle[key].put_nowait(None)
+
+    def checkin(self, session: AgentSession):
+        """Reset a session and return it to the pool"""
+        self._in_use[session.key] -= 1
+
+        try:
+            session.reset()
+        except Exception as e:
+            # A session that can't be reset is dropped; a waiter or the next checkout rebuilds it
+            logger.error(f"Discarding {session.key} session that failed to reset: {e}")
+            self._release_slot(session.key)
+            return
+
+        self._idle[session.key].put_nowait(session)
+
+    def discard(self, session: AgentSession):
+        """Drop a checked-out session instead of returning it; a replacement is built when needed"""
+        self._in_use[session.key] -= 1
+        self._release_slot(session.key)
+
+    @asynccontextmanager
+    async def session(self, key: str) -> AsyncIterator[AgentSession]:
+        """Check out a session for the duration of a chat"""
+        session = await self.checkout(key)
+        cancelled = False
+        try:
+            yield session
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            if cancelled:
+                # A cancelled chat may still be running on an LLM thread with this session
+                self.discard(session)
+            else:
+                self.checkin(session)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool occupancy and checkout wait time metrics"""
+        return {
+            "size_per_agent": self.size,
+            "created": dict(self._created),
+            "in_use": dict(self._in_use),
+            "waiting": self._waiting,
+            "checkouts": self._checkouts,
+            "avg_wait_ms": (self._total_wait_seconds / self._checkouts * 1000) if self._checkouts else 0.0,
+            "max_wait_ms": self._max_wait_seconds * 1000,
+        }
@@ -0,0 +1,101 @@
+"""
+Streaming of agent completions to WebSocket clients as they are generated
+"""
+
+import asyncio
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.llm_executor import raise_if_cancelled
+from app.services.websocket_manager import manager as websocket_manager
+
+# AutoGen colours streamed output for terminals
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+
+
+class DeltaIOStream:
+    """AutoGen IOStream that hands streamed completion text to a callback instead of stdout"""
+
+    def __init__(self, on_delta: Callable[[str], None]):
+        self._on_delta = on_delta
+
+    def print(self, *objects: Any, sep: str = " ", end: str = "\n", flush: bool = False) -> None:
+        # Called per streamed chunk on the worker thread: stop reading once cancelled
+        raise_if_cancelled()
+        # Streamed chunks are printed with end=""; everything else is terminal decoration
+        if end != "":
+            return
+        text = ANSI_ESCAPE.sub("", sep.join(str(obj) for obj in objects))
+        if text:
+            self._on_delta(text)
+
+    def input(self, prompt: str = "", *, password: bool = False) -> str:
+        return ""
+
+
+class AgentMessageStreamer:
+    """Coalesces completion deltas into indexed agent_message_delta frames on a short timer"""
+
+    def __init__(
+        self,
+        conversation_id: str,
+        agent_type: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        flush_interval: float = settings.STREAM_FLUSH_INTERVAL_MS / 1000,
+        on_delta: Optional[Callable[[str], Awaitable[None]]] = None,
+    ):
+        self.conversation_id = conversation_id
+        self.agent_type = agent_type
+        self.metadata = metadata or {}
+        self.flush_interval = flush_interval
+        # Called with each coalesced delta after its frame is broadcast
+        self.on_delta = on_delta
+        self._loop = asyncio.get_running_loop()
+        self._buffer: List[str] = []
+        self._delta_index = 0
+        self._closed = False
+        self._pending = asyncio.Event()
+        self._pump = asyncio.create_task(self._run())
+
+    def feed(self, delta: str):
+        """Queue a delta; must be called on the event loop"""
+        self._buffer.append(delta)
+        self._pending.set()
+
+    def feed_threadsafe(self, delta: str):
+        """Queue a delta from the LLM worker thread"""
+        self._loop.call_soon_threadsafe(self.feed, delta)
+
+    def iostream(self) -> DeltaIOStream:
+        """IOStream to install around a blocking AutoGen call"""
+        return DeltaIOStream(self.feed_threadsafe)
+
+    async def _run(self):
+        while True:
+            await self._pending.wait()
+            if not self._closed:
+                # Let small deltas accumulate into one frame
+                await asyncio.sleep(self.flush_interval)
+            self._pending.clear()
+            await self._flush()
+            if self._closed and not self._buffer:
+                return
+
+    async def _flush(self):
+        if not self._buffer:
+            return
+        delta = "".join(self._buffer)
+        self._buffer.clear()
+        await websocket_manager.broadcast_agent_message_delta(
+            self.conversation_id, self.agent_type, delta, self._delta_index, self.metadata
+        )
+        self._delta_index += 1
+        if self.on_delta is not None:
+            await self.on_delta(delta)
+
+    async def aclose(self):
+        """Flush whatever is buffered and stop the pump"""
+        self._closed = True
+        self._pending.set()
+        await self._pump
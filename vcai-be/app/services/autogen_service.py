@@ -2,7 +2,7 @@
 AutoGen service for managing multi-agent conversations with specialized workflow
 """
 
-import asyncio
+import bisect
 import json
 import uuid
 from datetime import datetime
@@ -14,14 +14,26 @@ from autogen import ConversableAgent, UserProxyAgent, AssistantAgent
 
 from app.core.config import settings
 from app.core.exceptions import AutoGenException
+from app.services.llm_executor import llm_executor
+from app.services.llm_http import get_llm_http_client
+from app.utils.pagination import decode_cursor, encode_cursor, parse_fields, project
+from app.utils.tokens import estimate_tokens
 from app.services.websocket_manager import manager as websocket_manager
 
 
+# Fields that can be requested from the conversation listing
+CONVERSATION_LIST_FIELDS = ("id", "created_at", "agents_used", "messages")
+
+DEFAULT_LIST_FIELDS = ("id", "created_at", "agents_used")
+
+
 class AutoGenService:
     """Service for managing AutoGen multi-agent conversations"""
     
     def __init__(self):
         self.conversations: Dict[str, Dict] = {}
+        # (created_at, id) pairs kept sorted for keyset pagination
+        self.conversation_index: List[Tuple[str, str]] = []
         self.agents: Dict[str, ConversableAgent] = {}
         self.work_dir = Path(settings.AUTOGEN_WORK_DIR)
         self.work_dir.mkdir(exist_ok=True)
@@ -31,7 +43,11 @@ class AutoGenService:
             "model": settings.OPENAI_MODEL,
             "api_key": settings.OPENAI_API_KEY,
             "cache_seed": settings.AUTOGEN_CACHE_SEED,
+            "timeout": settings.LLM_REQUEST_TIMEOUT_SECONDS,
+            "http_client": get_llm_http_client(),
         }
+        if settings.OPENAI_BASE_URL:
+            self.default_llm_config["base_url"] = settings.OPENAI_BASE_URL
         
         # Create default agents
         self._create_default_agents()
@@ -103,17 +119,22 @@ class AutoGenService:
                     "messages": [],
                     "agents_used": [],
                 }
+                bisect.insort(
+                    self.conversation_index,
+                    (self.conversations[conversation_id]["created_at"], conversation_id),
+                )
             
             # Get or create agents for this conversation
             user_proxy = self.agents["user_proxy"]
             assistant = self.agents["assistant"]
             
             # Start the conversation
-            response = await asyncio.to_thread(
+            response = await llm_executor.run(
                 user_proxy.initiate_chat,
                 assistant,
                 message=message,
                 max_turns=3,
+                prompt_tokens=estimate_tokens(message),
             )
             
             # Extract agent responses
@@ -160,28 +181,38 @@ class AutoGenService:
         """Get conversation by ID"""
         return self.conversations.get(conversation_id)
     
-    async def list_conversations(self, limit: int = 10, offset: int = 0) -> Dict:
-        """List conversations with pagination"""
-        conversations = list(self.conversations.values())
-        total = len(conversations)
+    async def list_conversations(
+        self, 
+        limit: int = 10, 
+        cursor: Optional[str] = None, 
+        fields: Optional[str] = None
+    ) -> Dict:
+        """List conversations newest first with cursor pagination and field projection"""
+        selected = parse_fields(fields, CONVERSATION_LIST_FIELDS, DEFAULT_LIST_FIELDS)
         
-        # Sort by creation date (newest first)
-        conversations.sort(key=lambda x: x["created_at"], reverse=True)
+        # Walk the sorted index backwards from just before the cursor
+        end = len(self.conversation_index)
+        if cursor:
+            end = bisect.bisect_left(self.conversation_index, decode_cursor(cursor))
+        start = max(end - limit, 0)
+        page = self.conversation_index[start:end][::-1]
         
-        # Apply pagination
-        paginated = conversations[offset:offset + limit]
+        next_cursor = encode_cursor(*page[-1]) if page and start > 0 else None
         
         return {
-            "conversations": paginated,
-            "total": total,
+            "conversations": [
+                project(self.conversations[conversation_id], selected)
+                for _, conversation_id in page
+            ],
             "limit": limit,
-            "offset": offset,
+            "next_cursor": next_cursor,
         }
     
     async def delete_conversation(self, conversation_id: str) -> bool:
         """Delete conversation by ID"""
         if conversation_id in self.conversations:
-            del self.conversations[conversation_id]
+            conversation = self.conversations.pop(conversation_id)
+            self.conversation_index.remove((conversation["created_at"], conversation_id))
             return True
         return False
     
@@ -0,0 +1,321 @@
+"""
+Async repository for conversations, phase results and reports
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.exceptions import ConflictException, ValidationException
+from app.db.models import Base, ConversationRecord, PhaseResultRecord, ReportRecord
+from app.db.session import create_engine, create_session_factory
+from app.utils.pagination import decode_cursor, encode_cursor, parse_fields
+
+logger = logging.getLogger(__name__)
+
+# Fields that can be requested from the conversation listing
+CONVERSATION_LIST_FIELDS = {
+    "id": ConversationRecord.id,
+    "status": ConversationRecord.status,
+    "overall_score": ConversationRecord.overall_score,
+    "created_at": ConversationRecord.created_at,
+    "completed_at": ConversationRecord.completed_at,
+    "prompt": ConversationRecord.prompt,
+    "files": ConversationRecord.files,
+    "metadata": ConversationRecord.metadata_,
+    "error": ConversationRecord.error,
+}
+
+DEFAULT_LIST_FIELDS = ("id", "status", "overall_score", "created_at", "completed_at")
+
+
+class ConversationStore:
+    """Persists conversations in SQLite locally and Postgres in deploys"""
+
+    def __init__(
+        self,
+        database_url: str = settings.DATABASE_URL,
+        flush_interval: float = settings.DATABASE_FLUSH_INTERVAL_MS / 1000,
+        batch_size: int = settings.DATABASE_BATCH_SIZE,
+    ):
+        self.engine = create_engine(database_url)
+        self.session_factory = create_session_factory(self.engine)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        # Phase results are buffered and written in batches
+        self._pending_phase_results: List[PhaseResultRecord] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        # The event loop only holds weak references to tasks; keep ours until they finish
+        self._background_flushes: Set[asyncio.Task] = set()
+        # Readers flush first; the lock makes them wait for a batch already in flight
+        self._flush_lock = asyncio.Lock()
+
+    async def init(self):
+        """Create tables when running without migrations (local SQLite)"""
+        if settings.DATABASE_CREATE_TABLES:
+            async with self.engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+
+    async def close(self):
+        """Write buffered results and release connections"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+        if self._background_flushes:
+            await asyncio.gather(*self._background_flushes, return_exceptions=True)
+        await self.flush()
+        await self.engine.dispose()
+
+    async def create_conversation(
+        self,
+        conversation_id: str,
+        prompt: str,
+        files: Optional[List[Dict]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        status: str = "processing",
+    ) -> Dict[str, Any]:
+        """Insert a new conversation; raises ConflictException if the ID is taken"""
+        record = ConversationRecord(
+            id=conversation_id,
+            status=status,
+            prompt=prompt,
+            files=files or [],
+            metadata_=metadata or {},
+            created_at=datetime.now(),
+        )
+        async with self.session_factory() as session:
+            session.add(record)
+            try:
+                await session.commit()
+            except IntegrityError:
+                raise ConflictException(f"Conversation {conversation_id} already exists")
+        return self._conversation_to_dict(record)
+
+    async def exists(self, conversation_id: str) -> bool:
+        """Whether a conversation with this ID has been stored"""
+        async with self.session_factory() as session:
+            found = await session.execute(
+                select(ConversationRecord.id).where(ConversationRecord.id == conversation_id)
+            )
+            return found.first() is not None
+
+    async def delete_conversation(self, conversation_id: str):
+        """Remove a conversation with its phase results and report"""
+        await self.flush()
+
+        async with self.session_factory() as session:
+            # Explicit, since SQLite only cascades with foreign keys switched on
+            await session.execute(delete(PhaseResultRecord).where(PhaseResultRecord.conversation_id == conversation_id))
+            await session.execute(delete(ReportRecord).where(ReportRecord.conversation_id == conversation_id))
+            await session.execute(delete(ConversationRecord).where(ConversationRecord.id == conversation_id))
+            await session.commit()
+
+    async def update_status(self, conversation_id: str, status: str, error: Optional[str] = None):
+        """Change a conversation's status"""
+        values: Dict[str, Any] = {"status": status}
+        if error is not None:
+            values["error"] = error
+        async with self.session_factory() as session:
+            await session.execute(
+                update(ConversationRecord).where(ConversationRecord.id == conversation_id).values(**values)
+            )
+            await session.commit()
+
+    async def update_metadata(self, conversation_id: str, metadata: Dict[str, Any]):
+        """Merge keys into a conversation's metadata"""
+        async with self.session_factory() as session:
+            record = await session.get(ConversationRecord, conversation_id)
+            if record is None:
+                return
+            record.metadata_ = {**(record.metadata_ or {}), **metadata}
+            await session.commit()
+
+    def record_phase_result(self, conversation_id: str, phase: str, agent_type: str, content: Dict[str, Any]):
+        """Buffer a phase result; it is written with the next batch"""
+        self._pending_phase_results.append(
+            PhaseResultRecord(
+                conversation_id=conversation_id,
+                phase=phase,
+                agent_type=agent_type,
+                content=content,
+                created_at=datetime.now(),
+            )
+        )
+
+        if len(self._pending_phase_results) >= self.batch_size:
+            self._start_background_flush(0)
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = self._start_background_flush(self.flush_interval)
+
+    def _start_background_flush(self, delay: float) -> asyncio.Task:
+        task = asyncio.create_task(self._flush_in_background(delay))
+        self._background_flushes.add(task)
+        task.add_done_callback(self._background_flush_done)
+        return task
+
+    def _background_flush_done(self, task: asyncio.Task):
+        self._background_flushes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Background flush of phase results failed: {task.exception()}")
+
+    async def _flush_in_background(self, delay: float):
+        await asyncio.sleep(delay)
+        try:
+            # Cancelling a delayed flush must not abort a write that has started
+            await asyncio.shield(self.flush())
+        except Exception:
+            # Already logged and re-buffered; the next flush retries
+            pass
+
+    async def flush(self):
+        """Write all buffered phase results in one transaction"""
+        async with self._flush_lock:
+            if not self._pending_phase_results:
+                return
+
+            batch = self._pending_phase_results
+            self._pending_phase_results = []
+
+            try:
+                async with self.session_factory() as session:
+                    session.add_all(batch)
+                    await session.commit()
+            except Exception as e:
+                logger.error(f"Failed to write {len(batch)} phase results: {e}")
+                self._pending_phase_results = batch + self._pending_phase_results
+                raise
+
+    async def complete_conversation(
+        self,
+        conversation_id: str,
+        report: Dict[str, Any],
+        status: str = "completed",
+    ):
+        """Store the final report and mark the conversation finished"""
+        await self.flush()
+
+        async with self.session_factory() as session:
+            session.add(ReportRecord(conversation_id=conversation_id, report=report, created_at=datetime.now()))
+            await session.execute(
+                update(ConversationRecord)
+                .where(ConversationRecord.id == conversation_id)
+                .values(
+                    status=status,
+                    overall_score=report.get("overall_score"),
+                    completed_at=datetime.now(),
+                )
+            )
+            await session.commit()
+
+    async def get_conversation(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """Load a conversation with its phase results and report"""
+        await self.flush()
+
+        async with self.session_factory() as session:
+            record = await session.get(ConversationRecord, conversation_id)
+            if record is None:
+                return None
+
+            phase_results = (
+                await session.execute(
+                    select(PhaseResultRecord)
+                    .where(PhaseResultRecord.conversation_id == conversation_id)
+                    .order_by(PhaseResultRecord.id)
+                )
+            ).scalars().all()
+            report = await session.get(ReportRecord, conversation_id)
+
+        conversation = self._conversation_to_dict(record)
+
+        specialist_results: Dict[str, str] = {}
+        verified_results: Dict[str, Dict[str, Any]] = {}
+        for result in phase_results:
+            if result.phase == "specialist_analysis":
+                specialist_results[result.agent_type] = result.content.get("text", "")
+            elif result.phase == "verification":
+                verified_results[result.agent_type] = result.content
+
+        if specialist_results:
+            conversation["specialist_results"] = specialist_results
+        if verified_results:
+            conversation["verified_results"] = verified_results
+        if report is not None:
+            conversation["final_report"] = report.report
+
+        return conversation
+
+    async def list_conversations(
+        self,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """List conversations newest first using keyset pagination over (created_at, id)"""
+        selected = parse_fields(fields, CONVERSATION_LIST_FIELDS, DEFAULT_LIST_FIELDS)
+
+        # created_at is always read because the next cursor is built from it
+        columns = {field: CONVERSATION_LIST_FIELDS[field] for field in selected}
+        columns.setdefault("created_at", ConversationRecord.created_at)
+
+        query = (
+            select(*[column.label(field) for field, column in columns.items()])
+            .order_by(ConversationRecord.created_at.desc(), ConversationRecord.id.desc())
+            .limit(limit + 1)
+        )
+
+        if cursor:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+            try:
+                cursor_created_at = datetime.fromisoformat(cursor_created_at)
+            except ValueError:
+                raise ValidationException("Invalid pagination cursor")
+            query = query.where(
+                or_(
+                    ConversationRecord.created_at < cursor_created_at,
+                    and_(
+                        ConversationRecord.created_at == cursor_created_at,
+                        ConversationRecord.id < cursor_id,
+                    ),
+                )
+            )
+
+        async with self.session_factory() as session:
+            rows = (await session.execute(query)).mappings().all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["created_at"].isoformat(), rows[-1]["id"])
+
+        conversations = []
+        for row in rows:
+            conversation = {}
+            for field in selected:
+                value = row[field]
+                conversation[field] = value.isoformat() if isinstance(value, datetime) else value
+            conversations.append(conversation)
+
+        return {
+            "conversations": conversations,
+            "limit": limit,
+            "next_cursor": next_cursor,
+        }
+
+    @staticmethod
+    def _conversation_to_dict(record: ConversationRecord) -> Dict[str, Any]:
+        return {
+            "id": record.id,
+            "created_at": record.created_at.isoformat(),
+            "completed_at": record.completed_at.isoformat() if record.completed_at else None,
+            "prompt": record.prompt,
+            "files": record.files or [],
+            "status": record.status,
+            "error": record.error,
+            "overall_score": record.overall_score,
+            "metadata": record.metadata_ or {},
+        }
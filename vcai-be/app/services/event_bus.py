@@ -0,0 +1,126 @@
+"""
+Event bus that carries WebSocket frames between worker processes
+"""
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Called with (conversation_id, payload) for every event published by any worker
+EventHandler = Callable[[str, str], None]
+
+# Per-conversation event counter shared by every worker; outlives any single run
+SEQ_KEY_PREFIX = "vcai:ws:seq:"
+SEQ_KEY_TTL_SECONDS = 24 * 60 * 60
+
+
+class EventBus(ABC):
+    """Publishes conversation events to every worker, including the publisher"""
+
+    name = "base"
+
+    @abstractmethod
+    async def start(self, handler: EventHandler):
+        """Begin delivering published events to handler"""
+
+    @abstractmethod
+    async def publish(self, conversation_id: str, payload: str):
+        """Deliver payload to the handler of every started bus"""
+
+    async def next_seq(self, conversation_id: str) -> Optional[int]:
+        """Next event seq for the conversation across all workers, or None if seqs are per process"""
+        return None
+
+    async def close(self):
+        pass
+
+
+class InMemoryEventBus(EventBus):
+    """Single-process bus; share one instance between managers to simulate workers in tests"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._handlers: List[EventHandler] = []
+
+    async def start(self, handler: EventHandler):
+        self._handlers.append(handler)
+
+    async def publish(self, conversation_id: str, payload: str):
+        for handler in list(self._handlers):
+            handler(conversation_id, payload)
+
+    async def close(self):
+        self._handlers.clear()
+
+
+class RedisEventBus(EventBus):
+    """Redis pub/sub bus: one channel per conversation, one pattern subscription per worker"""
+
+    name = "redis"
+
+    def __init__(self, url: str = settings.REDIS_URL, channel_prefix: str = settings.EVENT_BUS_CHANNEL_PREFIX):
+        self.url = url
+        self.channel_prefix = channel_prefix
+        self._client: Optional[redis.Redis] = None
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self, handler: EventHandler):
+        self._client = redis.from_url(self.url, decode_responses=True)
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.psubscribe(f"{self.channel_prefix}*")
+        self._listener = asyncio.create_task(self._listen(handler))
+        logger.info(f"Subscribed to {self.channel_prefix}* on {self.url}")
+
+    async def _listen(self, handler: EventHandler):
+        prefix_length = len(self.channel_prefix)
+        while True:
+            try:
+                async for message in self._pubsub.listen():
+                    if message["type"] == "pmessage":
+                        handler(message["channel"][prefix_length:], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # The pubsub connection resubscribes when it is next read
+                logger.error(f"Event bus connection lost: {e}")
+                await asyncio.sleep(1)
+
+    async def publish(self, conversation_id: str, payload: str):
+        await self._client.publish(f"{self.channel_prefix}{conversation_id}", payload)
+
+    async def next_seq(self, conversation_id: str) -> Optional[int]:
+        # A web worker (cancellation) and a Celery worker (the run) publish to the same conversation
+        key = f"{SEQ_KEY_PREFIX}{conversation_id}"
+        async with self._client.pipeline(transaction=True) as pipe:
+            seq, _ = await pipe.incr(key).expire(key, SEQ_KEY_TTL_SECONDS).execute()
+        return seq
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+        if self._client is not None:
+            await self._client.aclose()
+
+
+def create_event_bus(backend: str = settings.EVENT_BUS_BACKEND) -> EventBus:
+    """Build the configured event bus backend"""
+    if backend == "memory":
+        return InMemoryEventBus()
+    if backend == "redis":
+        return RedisEventBus()
+    raise ValueError(f"Unknown event bus backend: {backend}")
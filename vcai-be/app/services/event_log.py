@@ -0,0 +1,127 @@
+"""
+Bounded per-conversation log of broadcast events for replay to late or reconnecting clients
+"""
+
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+class _ConversationLog:
+    __slots__ = ("events", "bytes", "expires_at")
+
+    def __init__(self):
+        # (seq, serialized frame) in seq order
+        self.events: Deque[Tuple[int, str]] = deque()
+        self.bytes = 0
+        # Set once the conversation completes
+        self.expires_at: Optional[float] = None
+
+
+class ConversationEventLog:
+    """Ring buffer of events per conversation with sequence numbers
+
+    Sequence numbers start at 1 and come from the event bus when it shares them
+    across workers (Redis), else from next_seq in the publishing process; every
+    worker records the frames it receives so it can replay them to its own clients.
+
+    Logs are capped per conversation (events) and in total (bytes), and are
+    freed a TTL after the conversation completes.
+    """
+
+    def __init__(
+        self,
+        max_events: int = settings.EVENT_LOG_MAX_EVENTS,
+        max_bytes: int = settings.EVENT_LOG_MAX_BYTES,
+        ttl_seconds: float = settings.EVENT_LOG_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        # Least recently appended first, for byte-cap eviction
+        self._logs: "OrderedDict[str, _ConversationLog]" = OrderedDict()
+        # Completed conversations in expiry order
+        self._expiring: "OrderedDict[str, float]" = OrderedDict()
+        self._next_seq: Dict[str, int] = {}
+        self._bytes = 0
+        self.evicted_events = 0
+
+    def next_seq(self, conversation_id: str) -> int:
+        """Allocate the next sequence number for an event this process publishes"""
+        seq = self._next_seq.get(conversation_id, 0) + 1
+        self._next_seq[conversation_id] = seq
+        return seq
+
+    def append(self, conversation_id: str, seq: int, text: str, final: bool = False):
+        """Record a frame; final starts the conversation's TTL"""
+        self._expire()
+
+        log = self._logs.get(conversation_id)
+        if log is None:
+            log = self._logs[conversation_id] = _ConversationLog()
+        self._logs.move_to_end(conversation_id)
+
+        size = len(text)
+        log.events.append((seq, text))
+        log.bytes += size
+        self._bytes += size
+
+        if len(log.events) > self.max_events:
+            self._drop_oldest(log)
+
+        # Trim the least recently active conversations first
+        while self._bytes > self.max_bytes and self._logs:
+            oldest_id, oldest = next(iter(self._logs.items()))
+            self._drop_oldest(oldest)
+            if not oldest.events:
+                self._remove(oldest_id)
+
+        if final and conversation_id in self._logs:
+            log.expires_at = self._clock() + self.ttl_seconds
+            self._expiring.pop(conversation_id, None)
+            self._expiring[conversation_id] = log.expires_at
+
+    def replay(self, conversation_id: str, after_seq: int) -> Tuple[List[str], Optional[int]]:
+        """Frames with seq > after_seq, and the first seq still held (None if nothing is)"""
+        self._expire()
+
+        log = self._logs.get(conversation_id)
+        if log is None or not log.events:
+            return [], None
+
+        first_seq = log.events[0][0]
+        return [text for seq, text in log.events if seq > after_seq], first_seq
+
+    def _drop_oldest(self, log: _ConversationLog):
+        _, text = log.events.popleft()
+        log.bytes -= len(text)
+        self._bytes -= len(text)
+        self.evicted_events += 1
+
+    def _remove(self, conversation_id: str):
+        log = self._logs.pop(conversation_id)
+        self._bytes -= log.bytes
+        self._expiring.pop(conversation_id, None)
+
+    def _expire(self):
+        now = self._clock()
+        while self._expiring:
+            conversation_id, expires_at = next(iter(self._expiring.items()))
+            if expires_at > now:
+                break
+            self._remove(conversation_id)
+            self._next_seq.pop(conversation_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "conversations": len(self._logs),
+            "events": sum(len(log.events) for log in self._logs.values()),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "expiring": len(self._expiring),
+            "evicted_events": self.evicted_events,
+        }
@@ -0,0 +1,259 @@
+"""
+Ingestion of uploaded pitch materials: streamed to disk, extracted in a process
+pool, chunked and ranked per agent within a token budget
+"""
+
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import re
+import shutil
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import aiofiles
+from fastapi import UploadFile
+
+from app.core.config import settings
+from app.core.exceptions import ValidationException
+from app.utils.tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+TEXT_CONTENT_TYPES = {"application/json", "application/xml", "application/csv"}
+TEXT_SUFFIXES = {".txt", ".md", ".csv", ".json", ".xml", ".html", ".htm"}
+
+WORD = re.compile(r"[a-z0-9]+")
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+# Terms each specialist cares about, used to rank excerpts for its prompt
+AGENT_KEYWORDS = {
+    "marketing": (
+        "market customer customers segment competitor competitors competition pricing price "
+        "revenue growth acquisition channel channels brand demand sales tam sam som users"
+    ),
+    "product": (
+        "product feature features technical technology architecture platform roadmap mvp "
+        "development scalability infrastructure integration api data model prototype ux"
+    ),
+    "legal": (
+        "legal compliance regulation regulatory privacy gdpr ccpa license licensing patent "
+        "trademark ip liability contract terms jurisdiction data protection risk"
+    ),
+}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def new_upload_dir() -> Path:
+    """A fresh directory under UPLOAD_DIR for one submission's files
+
+    Named by the server, never by the client, so uploads can't be written elsewhere.
+    """
+    return Path(settings.UPLOAD_DIR) / uuid.uuid4().hex
+
+
+def _remove_upload_dir(directory: Path):
+    root = Path(settings.UPLOAD_DIR).resolve()
+    directory = directory.resolve()
+    # Only ever a direct child of UPLOAD_DIR
+    if directory.parent != root:
+        logger.warning(f"Not removing {directory}: outside {root}")
+        return
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+async def remove_upload_dir(directory: Path):
+    """Delete a submission's upload directory and everything in it"""
+    await asyncio.to_thread(_remove_upload_dir, directory)
+
+
+async def remove_uploads(files: Optional[List[Dict]]):
+    """Delete the stored files of an analysis once it no longer needs them"""
+    for directory in {Path(file["path"]).parent for file in files or [] if file.get("path")}:
+        await remove_upload_dir(directory)
+
+
+def sweep_uploads(max_age_seconds: float) -> int:
+    """Remove upload directories older than max_age_seconds, left by runs that never finished"""
+    root = Path(settings.UPLOAD_DIR)
+    if not root.is_dir():
+        return 0
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for directory in root.iterdir():
+        if directory.is_dir() and directory.stat().st_mtime < cutoff:
+            _remove_upload_dir(directory)
+            removed += 1
+    return removed
+
+
+async def save_upload(upload: UploadFile, directory: Path) -> Dict:
+    """Stream an upload to disk in chunks, hashing it on the way"""
+    directory.mkdir(parents=True, exist_ok=True)
+    # Keep only the final path component of the client-supplied name
+    name = Path(upload.filename or "upload").name
+    path = directory / f"{uuid.uuid4().hex}-{name}"
+
+    digest = hashlib.sha256()
+    size = 0
+    async with aiofiles.open(path, "wb") as out:
+        while chunk := await upload.read(settings.UPLOAD_CHUNK_BYTES):
+            size += len(chunk)
+            if size > settings.UPLOAD_MAX_BYTES:
+                break
+            digest.update(chunk)
+            await out.write(chunk)
+
+    if size > settings.UPLOAD_MAX_BYTES:
+        path.unlink(missing_ok=True)
+        raise ValidationException(
+            f"File {name} exceeds the {settings.UPLOAD_MAX_BYTES} byte upload limit"
+        )
+
+    return {
+        "name": name,
+        "type": upload.content_type,
+        "size": size,
+        "sha256": digest.hexdigest(),
+        "path": str(path),
+    }
+
+
+def _read_text(path: str, content_type: Optional[str]) -> str:
+    suffix = Path(path).suffix.lower()
+
+    if content_type == "application/pdf" or suffix == ".pdf":
+        from pypdf import PdfReader
+
+        reader = PdfReader(path)
+        return "\n\n".join(page.extract_text() or "" for page in reader.pages)
+
+    if (content_type or "").startswith("text/") or content_type in TEXT_CONTENT_TYPES or suffix in TEXT_SUFFIXES:
+        with open(path, encoding="utf-8", errors="replace") as source:
+            return source.read(settings.INGESTION_MAX_CHARS)
+
+    return ""
+
+
+def extract_chunks(path: str, content_type: Optional[str], chunk_tokens: int, max_chars: int) -> List[str]:
+    """Extract a file's text and split it into chunks of about chunk_tokens
+
+    Runs in the ingestion process pool, so the whole document never lives in
+    the web worker; only the chunks come back.
+    """
+    try:
+        text = _read_text(path, content_type)[:max_chars]
+    except Exception as e:
+        logger.warning(f"Could not extract text from {path}: {e}")
+        return []
+
+    chunk_chars = chunk_tokens * 4
+    chunks: List[str] = []
+    current = ""
+    for paragraph in PARAGRAPH_BREAK.split(text):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        # Hard-split paragraphs that are larger than a chunk on their own
+        while len(paragraph) > chunk_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(paragraph[:chunk_chars])
+            paragraph = paragraph[chunk_chars:]
+        if current and len(current) + len(paragraph) + 1 > chunk_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: forking a process that runs LLM threads and an event loop is unsafe
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.INGESTION_PROCESS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_pool():
+    """Stop the extraction processes"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+async def extract_documents(files: Optional[List[Dict]]) -> List[Dict]:
+    """Chunks of every stored file as {"file", "index", "text"}"""
+    stored = [file for file in files or [] if file.get("path")]
+    if not stored:
+        return []
+
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(*[
+        loop.run_in_executor(
+            _get_pool(),
+            extract_chunks,
+            file["path"],
+            file.get("type"),
+            settings.INGESTION_CHUNK_TOKENS,
+            settings.INGESTION_MAX_CHARS,
+        )
+        for file in stored
+    ])
+
+    return [
+        {"file": file["name"], "index": index, "text": text}
+        for file, chunks in zip(stored, results)
+        for index, text in enumerate(chunks)
+    ]
+
+
+def _terms(text: str) -> Counter:
+    return Counter(WORD.findall(text.lower()))
+
+
+def select_excerpts(
+    chunks: List[Dict],
+    agent_type: str,
+    prompt: str,
+    token_budget: int = settings.INGESTION_TOKENS_PER_AGENT,
+) -> List[Dict]:
+    """Rank chunks for one agent and keep the best ones within token_budget
+
+    A chunk scores by how often it mentions the agent's keywords and the idea's
+    own words, normalized by length. Selected chunks are returned in document order.
+    """
+    query = set(_terms(AGENT_KEYWORDS.get(agent_type, ""))) | set(_terms(prompt))
+
+    def score(chunk: Dict) -> float:
+        terms = _terms(chunk["text"])
+        hits = sum(count for term, count in terms.items() if term in query)
+        return hits / (sum(terms.values()) ** 0.5 or 1)
+
+    ranked = sorted(
+        enumerate(chunks), key=lambda item: (-score(item[1]), item[0])
+    )
+
+    selected = []
+    used = 0
+    for position, chunk in ranked:
+        tokens = estimate_tokens(chunk["text"])
+        if used + tokens > token_budget:
+            continue
+        selected.append((position, chunk))
+        used += tokens
+
+    return [chunk for _, chunk in sorted(selected, key=lambda item: item[0])]
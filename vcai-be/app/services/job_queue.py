@@ -0,0 +1,307 @@
+"""
+Job queue with admission control for startup analyses
+"""
+
+import asyncio
+import logging
+import math
+from abc import ABC, abstractmethod
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.exceptions import ConflictException, QueueFullException
+
+logger = logging.getLogger(__name__)
+
+# Runs one job's payload to completion
+JobRunner = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+PENDING_JOBS_KEY = "vcai:jobs:pending"
+DURATION_TOTAL_KEY = "vcai:jobs:duration_total"
+DURATION_COUNT_KEY = "vcai:jobs:duration_count"
+# Set to ask whichever Celery worker runs a job to cancel it
+CANCEL_KEY_PREFIX = "vcai:jobs:cancel:"
+CANCEL_KEY_TTL_SECONDS = 24 * 60 * 60
+# Held by the Celery worker while it runs a job and refreshed as it polls for
+# cancellation, so it expires soon after the worker dies
+RUNNING_KEY_PREFIX = "vcai:jobs:running:"
+RUNNING_KEY_TTL_SECONDS = 30
+
+# Atomically admit a job unless the queue is full or already holds its ID;
+# returns its 0-based position, -1 when full or -2 for a duplicate
+ADMIT_SCRIPT = """
+if redis.call('ZSCORE', KEYS[1], ARGV[3]) then
+    return -2
+end
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[1]) then
+    return -1
+end
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[3])
+return redis.call('ZRANK', KEYS[1], ARGV[3])
+"""
+ADMIT_DUPLICATE = -2
+
+
+@dataclass
+class JobTicket:
+    """Admission receipt for a queued job"""
+    job_id: str
+    position: int  # Jobs waiting ahead of this one; 0 means it is next or already running
+
+
+def estimate_retry_after(average_duration: Optional[float], queued: int, concurrency: int) -> int:
+    """Seconds until a queue slot is likely to free up"""
+    duration = average_duration or settings.JOB_DEFAULT_DURATION_SECONDS
+    return max(1, math.ceil(duration * max(queued, 1) / max(concurrency, 1)))
+
+
+class JobQueue(ABC):
+    """Accepts jobs up to max_length waiting and runs them with bounded concurrency"""
+
+    name = "base"
+
+    def __init__(self, concurrency: int, max_length: int):
+        self.concurrency = concurrency
+        self.max_length = max_length
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @abstractmethod
+    async def submit(self, job_id: str, payload: Dict[str, Any]) -> JobTicket:
+        """Queue a job or raise QueueFullException, or ConflictException if its ID is taken"""
+
+    @abstractmethod
+    async def position(self, job_id: str) -> Optional[int]:
+        """Jobs ahead of a waiting job, or None if it is not waiting"""
+
+    @abstractmethod
+    async def cancel(self, job_id: str) -> bool:
+        """Withdraw a waiting job or stop a running one; False if this queue doesn't know it"""
+
+    @abstractmethod
+    async def stats(self) -> Dict[str, Any]:
+        """Queue length and counters for monitoring"""
+
+    def _duplicate(self, job_id: str) -> ConflictException:
+        return ConflictException(f"Job {job_id} is already queued or running")
+
+    def _queue_full(self, queued: int, average_duration: Optional[float]) -> QueueFullException:
+        return QueueFullException(
+            f"Analysis queue is full ({queued} waiting), please retry later",
+            estimate_retry_after(average_duration, queued, self.concurrency),
+        )
+
+
+class InProcessJobQueue(JobQueue):
+    """Runs jobs on worker tasks in this process; queued work does not survive a restart"""
+
+    name = "inprocess"
+
+    def __init__(
+        self,
+        runner: JobRunner,
+        concurrency: int = settings.JOB_WORKER_CONCURRENCY,
+        max_length: int = settings.JOB_QUEUE_MAX_LENGTH,
+    ):
+        super().__init__(concurrency, max_length)
+        self._runner = runner
+        # Waiting jobs in submission order; the asyncio queue wakes the workers
+        self._pending: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._running: Dict[str, asyncio.Task] = {}
+        self._workers: list = []
+
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self._duration_total = 0.0
+
+    async def start(self):
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"job-worker-{index}")
+            for index in range(self.concurrency)
+        ]
+
+    async def close(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, job_id: str, payload: Dict[str, Any]) -> JobTicket:
+        # A second entry would replace the first, which could then no longer be cancelled
+        if job_id in self._pending or job_id in self._running:
+            raise self._duplicate(job_id)
+        if len(self._pending) >= self.max_length:
+            self.rejected += 1
+            raise self._queue_full(len(self._pending), self._average_duration())
+
+        self._pending[job_id] = payload
+        self._queue.put_nowait(job_id)
+        return JobTicket(job_id, len(self._pending) - 1)
+
+    async def position(self, job_id: str) -> Optional[int]:
+        if job_id not in self._pending:
+            return None
+        return list(self._pending).index(job_id)
+
+    async def cancel(self, job_id: str) -> bool:
+        if self._pending.pop(job_id, None) is not None:
+            # Its entry stays in the asyncio queue and is skipped by the worker
+            self.cancelled += 1
+            return True
+        task = self._running.get(job_id)
+        if task is None:
+            return False
+        task.cancel()
+        return True
+
+    def _average_duration(self) -> Optional[float]:
+        if not self.completed + self.failed:
+            return None
+        return self._duration_total / (self.completed + self.failed)
+
+    async def _work(self):
+        while True:
+            job_id = await self._queue.get()
+            payload = self._pending.pop(job_id, None)
+            if payload is None:
+                continue
+
+            # Its own task, so cancelling the job leaves the worker running
+            task = asyncio.create_task(self._runner(payload), name=f"job-{job_id}")
+            self._running[job_id] = task
+            started = time.perf_counter()
+            try:
+                await task
+                self.completed += 1
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    # The worker itself is shutting down
+                    raise
+                self.cancelled += 1
+                logger.info(f"Job {job_id} cancelled")
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Job {job_id} failed: {e}")
+            finally:
+                self._duration_total += time.perf_counter() - started
+                self._running.pop(job_id, None)
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "concurrency": self.concurrency,
+            "max_length": self.max_length,
+            "queued": len(self._pending),
+            "running": len(self._running),
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "rejected": self.rejected,
+            "avg_duration_s": round(self._average_duration() or 0.0, 3),
+        }
+
+
+class CeleryJobQueue(JobQueue):
+    """Sends jobs to Celery workers; waiting jobs are tracked in a Redis sorted set
+
+    Celery acknowledges a task only after it finishes, so work survives web and
+    worker restarts. The sorted set gives admission control and queue positions
+    shared by every web worker.
+    """
+
+    name = "celery"
+
+    def __init__(
+        self,
+        url: str = settings.REDIS_URL,
+        concurrency: int = settings.JOB_WORKER_CONCURRENCY,
+        max_length: int = settings.JOB_QUEUE_MAX_LENGTH,
+    ):
+        super().__init__(concurrency, max_length)
+        self.url = url
+        self._client: Optional[redis.Redis] = None
+        self._admit = None
+
+    async def start(self):
+        self._client = redis.from_url(self.url, decode_responses=True)
+        self._admit = self._client.register_script(ADMIT_SCRIPT)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+
+    async def submit(self, job_id: str, payload: Dict[str, Any]) -> JobTicket:
+        # Imported here so the web process only loads Celery when this backend is used
+        from app.worker import run_startup_analysis
+
+        position = await self._admit(
+            keys=[PENDING_JOBS_KEY], args=[self.max_length, time.time(), job_id]
+        )
+        if position == ADMIT_DUPLICATE:
+            raise self._duplicate(job_id)
+        if position < 0:
+            queued = await self._client.zcard(PENDING_JOBS_KEY)
+            raise self._queue_full(queued, await self._average_duration())
+
+        try:
+            # Publishing to the broker is blocking I/O
+            await asyncio.to_thread(
+                run_startup_analysis.apply_async, kwargs=payload, task_id=job_id
+            )
+        except Exception:
+            await self._client.zrem(PENDING_JOBS_KEY, job_id)
+            raise
+
+        return JobTicket(job_id, position)
+
+    async def position(self, job_id: str) -> Optional[int]:
+        return await self._client.zrank(PENDING_JOBS_KEY, job_id)
+
+    async def cancel(self, job_id: str) -> bool:
+        from app.worker import celery_app
+
+        if await self._client.zrem(PENDING_JOBS_KEY, job_id):
+            # Not picked up yet: workers drop revoked task messages
+            await asyncio.to_thread(celery_app.control.revoke, job_id)
+            return True
+        if not await self._client.exists(f"{RUNNING_KEY_PREFIX}{job_id}"):
+            return False
+        # Running on some worker, which polls for this key
+        await self._client.set(f"{CANCEL_KEY_PREFIX}{job_id}", 1, ex=CANCEL_KEY_TTL_SECONDS)
+        return True
+
+    async def _average_duration(self) -> Optional[float]:
+        total, count = await self._client.mget(DURATION_TOTAL_KEY, DURATION_COUNT_KEY)
+        if not count:
+            return None
+        return float(total) / int(count)
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "concurrency": self.concurrency,
+            "max_length": self.max_length,
+            "queued": await self._client.zcard(PENDING_JOBS_KEY),
+            "avg_duration_s": round(await self._average_duration() or 0.0, 3),
+        }
+
+
+def create_job_queue(runner: JobRunner, backend: str = settings.JOB_QUEUE_BACKEND) -> JobQueue:
+    """Build the configured job queue backend; runner is only used in-process"""
+    if backend == "inprocess":
+        return InProcessJobQueue(runner)
+    if backend == "celery":
+        return CeleryJobQueue()
+    raise ValueError(f"Unknown job queue backend: {backend}")
@@ -0,0 +1,68 @@
+"""
+Async chat completion client for agent calls that run as plain coroutines
+
+AutoGen's a_initiate_chat still hands each completion to a thread, so a waiting
+call holds an OS thread. Our agent chats are single turn (system message plus one
+user message), which this client sends directly on the shared async HTTP client.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+import openai
+
+from app.services.llm_http import get_async_llm_http_client
+
+# llm_config keys passed through to chat.completions.create
+COMPLETION_PARAMS = ("model", "response_format", "temperature", "max_tokens", "top_p", "seed")
+
+
+class AsyncCompletionClient:
+    """Sends one chat completion per call for an AutoGen-style llm_config"""
+
+    def __init__(self, llm_config: Dict[str, Any]):
+        self.llm_config = llm_config
+        self._client: Optional[openai.AsyncOpenAI] = None
+        self._http_client = None
+
+    def _get_client(self) -> openai.AsyncOpenAI:
+        http_client = get_async_llm_http_client()
+        # Rebuilt if the shared client was replaced (a new event loop)
+        if self._client is None or self._http_client is not http_client:
+            self._http_client = http_client
+            self._client = openai.AsyncOpenAI(
+                api_key=self.llm_config.get("api_key"),
+                base_url=self.llm_config.get("base_url"),
+                timeout=self.llm_config.get("timeout"),
+                # Retries are ours (ResilientCaller)
+                max_retries=0,
+                http_client=http_client,
+            )
+        return self._client
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        llm_config: Optional[Dict[str, Any]] = None,
+        on_delta: Optional[Callable[[str], None]] = None,
+    ) -> Optional[str]:
+        """Return the reply text; streamed chunks are passed to on_delta as they arrive"""
+        config = llm_config or self.llm_config
+        params = {key: config[key] for key in COMPLETION_PARAMS if config.get(key) is not None}
+        client = self._get_client()
+
+        if not config.get("stream"):
+            response = await client.chat.completions.create(messages=messages, **params)
+            return response.choices[0].message.content if response.choices else None
+
+        parts: List[str] = []
+        stream = await client.chat.completions.create(messages=messages, stream=True, **params)
+        async with stream:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    if on_delta is not None:
+                        on_delta(delta)
+        return "".join(parts) if parts else None
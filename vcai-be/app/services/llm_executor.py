@@ -0,0 +1,233 @@
+"""
+Bounded executor for LLM calls (blocking or coroutine) with request and token rate limits
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import LLM_QUEUE_WAIT_SECONDS
+
+# Set in the worker thread's context; a call checks it to stop early once its caller is cancelled
+_cancel_event: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    "llm_cancel_event", default=None
+)
+
+# Set in the caller's context: how long its latest call ran once admitted
+_call_seconds: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "llm_call_seconds", default=None
+)
+
+
+class LLMCallCancelled(Exception):
+    """Raised inside a worker thread when the coroutine awaiting its call was cancelled"""
+
+
+def raise_if_cancelled():
+    """Abort the current LLM call if its caller has gone away (e.g. from a streaming callback)"""
+    event = _cancel_event.get()
+    if event is not None and event.is_set():
+        raise LLMCallCancelled("LLM call cancelled by its caller")
+
+
+def last_call_seconds() -> Optional[float]:
+    """Run time of the current task's latest call, excluding its wait for admission"""
+    return _call_seconds.get()
+
+
+class TokenBucket:
+    """Continuously refilled token bucket that hands out reservations in arrival order"""
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = float(rate_per_minute)
+        self.rate_per_second = rate_per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take amount tokens now and return how long the caller must wait before using them"""
+        self._refill()
+        # A single request larger than the bucket would otherwise never be admitted
+        self._tokens -= min(amount, self.capacity)
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self.rate_per_second
+
+    def charge(self, amount: float):
+        """Debit tokens after the fact (e.g. completion tokens), delaying later reservations"""
+        self._refill()
+        self._tokens -= amount
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return self._tokens
+
+
+class LLMExecutor:
+    """Runs blocking LLM calls on a dedicated pool sized to our quota, not to CPU count"""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_abandoned: int = settings.LLM_MAX_ABANDONED_CALLS,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_abandoned = max_abandoned
+        # Spare threads let cancelled calls run to completion outside the concurrency limit
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency + max_abandoned, thread_name_prefix="llm"
+        )
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._request_bucket = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+
+        # Queue metrics
+        self._queued = 0
+        self._running = 0
+        self._submitted = 0
+        self._cancelled = 0
+        self._abandoned = 0  # Cancelled calls whose thread has not returned yet
+        self._detached = 0  # Those of them that gave up their slot
+        self._total_wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    def _reserve(self, prompt_tokens: int) -> float:
+        delay = 0.0
+        if self._request_bucket:
+            delay = max(delay, self._request_bucket.reserve(1))
+        if self._token_bucket and prompt_tokens:
+            delay = max(delay, self._token_bucket.reserve(prompt_tokens))
+        return delay
+
+    async def _admit(self, prompt_tokens: int) -> float:
+        """Wait for rate limits and a free slot; returns the time of admission"""
+        _call_seconds.set(None)
+        started = time.monotonic()
+        self._queued += 1
+
+        try:
+            delay = self._reserve(prompt_tokens)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self._slots.acquire()
+        finally:
+            self._queued -= 1
+
+        waited = time.monotonic() - started
+        LLM_QUEUE_WAIT_SECONDS.observe(waited)
+        self._submitted += 1
+        self._total_wait_seconds += waited
+        self._max_wait_seconds = max(self._max_wait_seconds, waited)
+        self._running += 1
+        return time.monotonic()
+
+    async def run(self, func: Callable[..., Any], *args: Any, prompt_tokens: int = 0, **kwargs: Any) -> Any:
+        """Wait for rate limits and a free slot, then run func on the LLM thread pool"""
+        admitted = await self._admit(prompt_tokens)
+
+        loop = asyncio.get_running_loop()
+        cancel_event = threading.Event()
+        # Carry context variables into the worker thread like asyncio.to_thread does
+        context = contextvars.copy_context()
+        context.run(_cancel_event.set, cancel_event)
+        future = self._executor.submit(context.run, func, *args, **kwargs)
+
+        released_by_thread = False
+        try:
+            return await asyncio.wrap_future(future, loop=loop)
+        except asyncio.CancelledError:
+            # A thread can't be interrupted: ask the call to stop (streamed calls check
+            # between chunks; others only return when their HTTP request does)
+            self._cancelled += 1
+            cancel_event.set()
+            if not future.done():
+                self._abandoned += 1
+                # Free the slot now if a spare thread can absorb the orphaned call;
+                # otherwise keep it until the thread returns so threads stay bounded
+                holds_slot = self._detached >= self.max_abandoned
+                if holds_slot:
+                    released_by_thread = True
+                else:
+                    self._detached += 1
+                future.add_done_callback(lambda _: self._abandoned_returned(loop, holds_slot))
+            raise
+        finally:
+            _call_seconds.set(time.monotonic() - admitted)
+            if not released_by_thread:
+                self._release()
+
+    async def run_async(
+        self, func: Callable[..., Awaitable[Any]], *args: Any, prompt_tokens: int = 0, **kwargs: Any
+    ) -> Any:
+        """Same limits as run for a call that is a coroutine, so it needs no thread
+
+        Cancelling the caller cancels the call itself and frees its slot at once.
+        """
+        admitted = await self._admit(prompt_tokens)
+        try:
+            return await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            self._cancelled += 1
+            raise
+        finally:
+            _call_seconds.set(time.monotonic() - admitted)
+            self._release()
+
+    def _release(self):
+        self._running -= 1
+        self._slots.release()
+
+    def _abandoned_returned(self, loop: asyncio.AbstractEventLoop, holds_slot: bool):
+        def finish():
+            self._abandoned -= 1
+            if holds_slot:
+                self._release()
+            else:
+                self._detached -= 1
+
+        try:
+            loop.call_soon_threadsafe(finish)
+        except RuntimeError:
+            # Loop already closed at shutdown; nothing left to admit
+            pass
+
+    def charge_tokens(self, tokens: int):
+        """Account completion tokens once a call has returned"""
+        if self._token_bucket and tokens:
+            self._token_bucket.charge(tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, concurrency and wait time metrics"""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self._queued,
+            "running": self._running,
+            "submitted": self._submitted,
+            "cancelled": self._cancelled,
+            "abandoned": self._abandoned,
+            "detached": self._detached,
+            "avg_wait_ms": (self._total_wait_seconds / self._submitted * 1000) if self._submitted else 0.0,
+            "max_wait_ms": self._max_wait_seconds * 1000,
+            "requests_available": self._request_bucket.available if self._request_bucket else None,
+            "tokens_available": self._token_bucket.available if self._token_bucket else None,
+        }
+
+
+# Global LLM executor instance
+llm_executor = LLMExecutor(
+    settings.LLM_MAX_CONCURRENCY,
+    requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+    tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+)
@@ -0,0 +1,248 @@
+"""
+Process-wide pooled HTTP clients for LLM API traffic
+
+Every agent's OpenAI client is handed this one httpx client, so all agents share a
+keep-alive connection pool (HTTP/2 when the h2 package is installed) instead of
+each opening its own connections and TLS sessions. The async execution path has
+an equivalent AsyncClient for the event loop.
+"""
+
+import asyncio
+import importlib
+import importlib.util
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+import openai
+
+from app.core.config import settings
+from app.core.metrics import LLM_HTTP_CONNECTIONS, LLM_HTTP_REQUESTS, LLM_TLS_HANDSHAKES
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.Client] = None
+_lock = threading.Lock()
+
+# An AsyncClient's connections belong to the event loop that opened them
+_async_client: Optional[httpx.AsyncClient] = None
+_async_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# Counted alongside the Prometheus metrics for the health endpoint; hooks run on LLM threads
+_counts = {"requests": 0, "connections": 0, "tls_handshakes": 0}
+_counts_lock = threading.Lock()
+
+# The httpx package OpenAI's clients are built on; stream wrappers must use its base classes
+_httpx = importlib.import_module(openai.DefaultHttpxClient.__mro__[1].__module__.partition(".")[0])
+
+SSE_DONE = b"data: [DONE]"
+# Most bytes read after [DONE] to return a connection to the pool instead of dropping it
+DRAIN_MAX_BYTES = 64 * 1024
+
+
+def _count(name: str):
+    with _counts_lock:
+        _counts[name] += 1
+
+
+class _DoneTracker:
+    """Notices the SSE [DONE] event in a response body, even split across chunks"""
+
+    def __init__(self):
+        self.done = False
+        self._tail = b""
+
+    def see(self, chunk: bytes):
+        window = self._tail + chunk
+        self.done = self.done or SSE_DONE in window
+        self._tail = window[-len(SSE_DONE):]
+
+
+class DrainingStream(_httpx.SyncByteStream):
+    """Streamed response body that is read to its end when closed after [DONE]
+
+    OpenAI's SDK stops reading at [DONE] and closes the response with the end of the
+    chunked body still unread, so the connection would be dropped rather than reused.
+    A body closed before [DONE] (a cancelled call) is closed at once.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._chunks = None
+        self._tracker = _DoneTracker()
+
+    def __iter__(self):
+        self._chunks = iter(self._stream)
+        for chunk in self._chunks:
+            self._tracker.see(chunk)
+            yield chunk
+
+    def close(self):
+        try:
+            if self._tracker.done and self._chunks is not None:
+                drained = 0
+                for chunk in self._chunks:
+                    drained += len(chunk)
+                    if drained > DRAIN_MAX_BYTES:
+                        break
+        except Exception as e:
+            logger.debug(f"Could not drain LLM response: {e}")
+        finally:
+            self._stream.close()
+
+
+class AsyncDrainingStream(_httpx.AsyncByteStream):
+    """DrainingStream for the async client"""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._chunks = None
+        self._tracker = _DoneTracker()
+
+    async def __aiter__(self):
+        self._chunks = self._stream.__aiter__()
+        async for chunk in self._chunks:
+            self._tracker.see(chunk)
+            yield chunk
+
+    async def aclose(self):
+        try:
+            if self._tracker.done and self._chunks is not None:
+                drained = 0
+                async for chunk in self._chunks:
+                    drained += len(chunk)
+                    if drained > DRAIN_MAX_BYTES:
+                        break
+        except Exception as e:
+            logger.debug(f"Could not drain LLM response: {e}")
+        finally:
+            await self._stream.aclose()
+
+
+class SharedHTTPClient(openai.DefaultHttpxClient):
+    """OpenAI's httpx client defaults; copies of an agent's llm_config keep pointing at this client"""
+
+    def __deepcopy__(self, memo):
+        # AutoGen deep-copies llm_config for every agent, which must not clone the pool
+        return self
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if kwargs.get("stream"):
+            response.stream = DrainingStream(response.stream)
+        return response
+
+
+class SharedAsyncHTTPClient(openai.DefaultAsyncHttpxClient):
+    """Async counterpart of SharedHTTPClient"""
+
+    async def send(self, request, **kwargs):
+        response = await super().send(request, **kwargs)
+        if kwargs.get("stream"):
+            response.stream = AsyncDrainingStream(response.stream)
+        return response
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _trace(event: str, info: Dict[str, Any]):
+    # httpcore reports these only when a request has to open a new connection
+    if event == "connection.connect_tcp.complete":
+        _count("connections")
+        LLM_HTTP_CONNECTIONS.inc()
+    elif event == "connection.start_tls.complete":
+        _count("tls_handshakes")
+        LLM_TLS_HANDSHAKES.inc()
+
+
+def _on_request(request: httpx.Request):
+    request.extensions = {**request.extensions, "trace": _trace}
+
+
+def _on_response(response: httpx.Response):
+    _count("requests")
+    LLM_HTTP_REQUESTS.labels(response.http_version).inc()
+
+
+# The async transport awaits its hooks and trace callback
+async def _trace_async(event: str, info: Dict[str, Any]):
+    _trace(event, info)
+
+
+async def _on_request_async(request: httpx.Request):
+    request.extensions = {**request.extensions, "trace": _trace_async}
+
+
+async def _on_response_async(response: httpx.Response):
+    _on_response(response)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    )
+
+
+def get_llm_http_client() -> httpx.Client:
+    """The shared client, created on first use; safe to use from every LLM thread"""
+    global _client
+    with _lock:
+        if _client is None:
+            http2 = settings.LLM_HTTP2 and http2_available()
+            _client = SharedHTTPClient(
+                http2=http2,
+                limits=_limits(),
+                event_hooks={"request": [_on_request], "response": [_on_response]},
+            )
+            logger.info(f"Created shared LLM HTTP client (http2={http2})")
+        return _client
+
+
+def get_async_llm_http_client() -> httpx.AsyncClient:
+    """The shared async client for the running event loop, created on first use"""
+    global _async_client, _async_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_loop is not loop:
+        _async_client = SharedAsyncHTTPClient(
+            http2=settings.LLM_HTTP2 and http2_available(),
+            limits=_limits(),
+            event_hooks={"request": [_on_request_async], "response": [_on_response_async]},
+        )
+        _async_loop = loop
+    return _async_client
+
+
+def close_llm_http_client():
+    """Close the pooled connections at shutdown"""
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+async def aclose_llm_http_clients():
+    """Close both shared clients; call from the event loop at shutdown"""
+    global _async_client, _async_loop
+    close_llm_http_client()
+    if _async_client is not None and _async_loop is asyncio.get_running_loop():
+        await _async_client.aclose()
+    _async_client = None
+    _async_loop = None
+
+
+def stats() -> Dict[str, Any]:
+    """Requests sent and connections opened; reuse is the share of requests needing no new connection"""
+    requests = _counts["requests"]
+    return {
+        "http2": bool(_client is not None and settings.LLM_HTTP2 and http2_available()),
+        **_counts,
+        "connection_reuse_ratio": (
+            round(max(requests - _counts["connections"], 0) / requests, 3) if requests else None
+        ),
+    }
@@ -0,0 +1,154 @@
+"""
+Per-agent model routing with fallback away from failing or slow models
+"""
+
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import MODEL_CALLS, MODEL_FALLBACKS
+
+logger = logging.getLogger(__name__)
+
+
+def model_routes(
+    agent_phases: Dict[str, str],
+    agent_models: Optional[Dict[str, List[str]]] = None,
+    phase_models: Optional[Dict[str, List[str]]] = None,
+    default_model: Optional[str] = None,
+) -> Dict[str, List[str]]:
+    """Ordered models for each agent: its own entry, else its phase's, else the default model"""
+    agent_models = settings.AGENT_MODELS if agent_models is None else agent_models
+    phase_models = settings.PHASE_MODELS if phase_models is None else phase_models
+    default_model = default_model or settings.OPENAI_MODEL
+
+    for agent_type in agent_models:
+        if agent_type not in agent_phases:
+            raise ValueError(f"Models configured for unknown agent type: {agent_type}")
+    for phase in phase_models:
+        if phase not in agent_phases.values():
+            raise ValueError(f"Models configured for unknown phase: {phase}")
+
+    routes = {}
+    for agent_type, phase in agent_phases.items():
+        models = agent_models.get(agent_type) or phase_models.get(phase) or [default_model]
+        # Listing a model twice would only retry the same degraded model
+        routes[agent_type] = list(dict.fromkeys(models))
+    return routes
+
+
+class ModelHealth:
+    """Latency and outcome of a model's calls within a sliding time window"""
+
+    def __init__(self, window_seconds: float, clock: Callable[[], float]):
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self._calls: Deque[Tuple[float, float, bool]] = deque()
+
+    def record(self, seconds: float, ok: bool):
+        self._calls.append((self._clock(), seconds, ok))
+
+    def _prune(self):
+        # Old outcomes expire, so a model nobody is routed to becomes eligible again
+        cutoff = self._clock() - self.window_seconds
+        while self._calls and self._calls[0][0] < cutoff:
+            self._calls.popleft()
+
+    def summary(self) -> Tuple[int, float, Optional[float]]:
+        """Calls in the window, their error rate and nearest-rank p95 latency"""
+        self._prune()
+        if not self._calls:
+            return 0, 0.0, None
+        errors = sum(1 for _, _, ok in self._calls if not ok)
+        latencies = sorted(seconds for _, seconds, _ in self._calls)
+        rank = max(int(round(0.95 * len(latencies) + 0.5)) - 1, 0)
+        return len(self._calls), errors / len(self._calls), latencies[min(rank, len(latencies) - 1)]
+
+
+class ModelRouter:
+    """Picks each agent's model from its ordered list, passing over models that are degraded"""
+
+    def __init__(
+        self,
+        routes: Dict[str, List[str]],
+        window_seconds: float = settings.MODEL_ROUTER_WINDOW_SECONDS,
+        min_samples: int = settings.MODEL_ROUTER_MIN_SAMPLES,
+        max_error_rate: float = settings.MODEL_ROUTER_MAX_ERROR_RATE,
+        max_p95_seconds: float = settings.MODEL_ROUTER_MAX_P95_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if any(not models for models in routes.values()):
+            raise ValueError("Every agent needs at least one model")
+
+        self.routes = routes
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.max_p95_seconds = max_p95_seconds
+        # Health is per model, shared by every agent routed to it
+        self._health: Dict[str, ModelHealth] = {
+            model: ModelHealth(window_seconds, clock)
+            for models in routes.values()
+            for model in models
+        }
+        self._degraded: Dict[str, Optional[str]] = {}
+        self.fallbacks = 0
+
+    def models(self, agent_type: str) -> List[str]:
+        """The agent's models, most preferred first"""
+        return self.routes[agent_type]
+
+    def degraded(self, model: str) -> Optional[str]:
+        """Why the model is being passed over ("error_rate" or "latency"), or None"""
+        calls, error_rate, p95 = self._health[model].summary()
+        reason = None
+        if calls >= self.min_samples:
+            if error_rate > self.max_error_rate:
+                reason = "error_rate"
+            elif self.max_p95_seconds and p95 > self.max_p95_seconds:
+                reason = "latency"
+
+        if reason != self._degraded.get(model):
+            if reason:
+                logger.warning(
+                    f"Model {model} degraded ({reason}): error rate {error_rate:.0%}, p95 {p95:.1f}s over {calls} calls"
+                )
+            else:
+                logger.info(f"Model {model} is healthy again")
+            self._degraded[model] = reason
+        return reason
+
+    def choose(self, agent_type: str) -> str:
+        """The first healthy model for the agent; with all degraded, the least failing then fastest"""
+        models = self.routes[agent_type]
+        chosen = next((model for model in models if self.degraded(model) is None), None)
+        if chosen is None:
+            chosen = min(models, key=self._rank)
+
+        if chosen != models[0]:
+            self.fallbacks += 1
+            MODEL_FALLBACKS.labels(agent_type, chosen).inc()
+        return chosen
+
+    def _rank(self, model: str) -> Tuple[float, float]:
+        _, error_rate, p95 = self._health[model].summary()
+        return error_rate, p95 or 0.0
+
+    def record(self, agent_type: str, model: str, seconds: float, ok: bool):
+        """Record the outcome of a call routed to model"""
+        self._health[model].record(seconds, ok)
+        MODEL_CALLS.labels(agent_type, model, "ok" if ok else "error").inc()
+
+    def stats(self) -> Dict[str, Any]:
+        """Routes, fallback count and each model's recent health"""
+        models = {}
+        for model, health in self._health.items():
+            calls, error_rate, p95 = health.summary()
+            models[model] = {
+                "calls": calls,
+                "error_rate": round(error_rate, 3),
+                "p95_seconds": round(p95, 3) if p95 is not None else None,
+                "degraded": self.degraded(model),
+            }
+        return {"routes": self.routes, "fallbacks": self.fallbacks, "models": models}
@@ -0,0 +1,250 @@
+"""
+Parsing of the summary agent's JSON report, incrementally while it streams and in full at the end
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+AREAS = ("marketing", "product", "legal")
+LIST_FIELDS = ("key_strengths", "critical_risks", "recommendations", "next_steps")
+RECOMMENDATIONS = ("HIGH_POTENTIAL", "MODERATE_POTENTIAL", "LOW_POTENTIAL")
+
+# Scores come first so they can be shown before the narrative has finished streaming
+REPORT_JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "overall_score": {"type": "integer", "minimum": 0, "maximum": 100},
+        "metrics": {
+            "type": "object",
+            # Areas whose analysis failed are scored null
+            "properties": {
+                f"{area}_score": {"type": ["integer", "null"], "minimum": 0, "maximum": 100}
+                for area in AREAS
+            },
+            "required": [f"{area}_score" for area in AREAS],
+            "additionalProperties": False,
+        },
+        "recommendation": {"type": "string", "enum": list(RECOMMENDATIONS)},
+        "summary": {"type": "string"},
+        **{field: {"type": "array", "items": {"type": "string"}} for field in LIST_FIELDS},
+    },
+    "required": ["overall_score", "metrics", "recommendation", "summary", *LIST_FIELDS],
+    "additionalProperties": False,
+}
+
+# Fields pushed to clients as soon as the stream completes them
+PROGRESS_FIELDS = {
+    ("overall_score",),
+    ("recommendation",),
+    *{("metrics", f"{area}_score") for area in AREAS},
+}
+
+CODE_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+NUMBER = re.compile(r"\b(\d{1,3})(?:\.\d+)?\b")
+NO_SCORE = re.compile(r"\b(?:null|none|n/a)(?!\w)", re.IGNORECASE)
+BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+(.*\S)")
+LIST_HEADINGS = {
+    "key_strengths": re.compile(r"strength|opportunit", re.IGNORECASE),
+    "critical_risks": re.compile(r"risk|challenge", re.IGNORECASE),
+    "recommendations": re.compile(r"recommendation", re.IGNORECASE),
+    "next_steps": re.compile(r"next step", re.IGNORECASE),
+}
+
+
+class _Container:
+    __slots__ = ("is_object", "key", "expecting_key")
+
+    def __init__(self, is_object: bool):
+        self.is_object = is_object
+        # Current key for objects, current index for arrays
+        self.key: Any = None if is_object else 0
+        self.expecting_key = is_object
+
+
+class IncrementalReportParser:
+    """Streaming JSON scanner that reports watched scalar fields as soon as they are complete
+
+    Text before the opening brace (such as a code fence) is ignored. Strings
+    complete at their closing quote; numbers and literals at the next delimiter.
+    """
+
+    def __init__(self, fields=PROGRESS_FIELDS):
+        self.fields = set(fields)
+        self.values: Dict[Tuple, Any] = {}
+        self._stack: List[_Container] = []
+        self._string: Optional[List[str]] = None
+        self._escape = False
+        self._token = ""
+        self._done = False
+
+    def feed(self, text: str) -> Dict[str, Any]:
+        """Consume a chunk; returns the watched fields it completed as a nested dict"""
+        completed: Dict[str, Any] = {}
+        for char in text:
+            found = self._step(char)
+            if found is not None:
+                path, value = found
+                self.values[path] = value
+                target = completed
+                for key in path[:-1]:
+                    target = target.setdefault(key, {})
+                target[path[-1]] = value
+        return completed
+
+    def _step(self, char: str) -> Optional[Tuple[Tuple, Any]]:
+        if self._done:
+            return None
+
+        if self._string is not None:
+            if self._escape:
+                self._string.append(char)
+                self._escape = False
+            elif char == "\\":
+                self._string.append(char)
+                self._escape = True
+            elif char == '"':
+                raw = "".join(self._string)
+                self._string = None
+                try:
+                    return self._value(json.loads(f'"{raw}"'))
+                except ValueError:
+                    return self._value(raw)
+            else:
+                self._string.append(char)
+            return None
+
+        if not self._stack:
+            if char == "{":
+                self._stack.append(_Container(True))
+            return None
+
+        if char == '"':
+            self._string = []
+        elif char in "{[":
+            self._stack.append(_Container(char == "{"))
+        elif char in "}]":
+            found = self._finish_token()
+            self._stack.pop()
+            self._done = not self._stack
+            return found
+        elif char == ":":
+            self._stack[-1].expecting_key = False
+        elif char == ",":
+            found = self._finish_token()
+            top = self._stack[-1]
+            if top.is_object:
+                top.key = None
+                top.expecting_key = True
+            else:
+                top.key += 1
+            return found
+        elif char.isspace():
+            return self._finish_token()
+        else:
+            self._token += char
+        return None
+
+    def _finish_token(self) -> Optional[Tuple[Tuple, Any]]:
+        if not self._token:
+            return None
+        token, self._token = self._token, ""
+        try:
+            return self._value(json.loads(token))
+        except ValueError:
+            return None
+
+    def _value(self, value: Any) -> Optional[Tuple[Tuple, Any]]:
+        top = self._stack[-1]
+        if top.is_object and top.expecting_key:
+            top.key = value
+            return None
+        path = tuple(container.key for container in self._stack)
+        if path in self.fields:
+            return path, value
+        return None
+
+
+def _score(value: Any) -> Optional[int]:
+    try:
+        return max(0, min(100, int(round(float(value)))))
+    except (TypeError, ValueError):
+        return None
+
+
+def _strings(value: Any) -> List[str]:
+    if not isinstance(value, list):
+        return []
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+def extract_report_fallback(text: str) -> Dict[str, Any]:
+    """Best-effort report fields from free text or malformed JSON"""
+    report: Dict[str, Any] = {"metrics": {}, "summary": text.strip()}
+    current_list: Optional[str] = None
+
+    for line in text.splitlines():
+        lowered = line.lower()
+        if "score" in lowered:
+            after = line[lowered.index("score"):]
+            # "N/A" or "null" after the label is a null score that still claims the area
+            unscored = NUMBER.search(after) is None and NO_SCORE.search(after) is not None
+            number = None if unscored else NUMBER.search(after) or NUMBER.search(line)
+            if number or unscored:
+                value = number.group(1) if number else None
+                if "overall" in lowered and "overall_score" not in report:
+                    report["overall_score"] = value
+                for area in AREAS:
+                    if area in lowered and f"{area}_score" not in report["metrics"]:
+                        report["metrics"][f"{area}_score"] = value
+
+        bullet = BULLET.match(line)
+        if bullet:
+            if current_list:
+                report.setdefault(current_list, []).append(bullet.group(1).strip(" *\"',"))
+            continue
+
+        # Short lines naming a list start it; any other text ends it
+        heading = next(
+            (field for field, pattern in LIST_HEADINGS.items() if pattern.search(line)), None
+        )
+        if heading and len(line.strip()) < 80:
+            current_list = heading
+        elif line.strip():
+            current_list = None
+
+    return report
+
+
+def parse_report(text: str) -> Dict[str, Any]:
+    """Parse the summary agent's reply into report fields, falling back to regex extraction"""
+    try:
+        data = json.loads(CODE_FENCE.sub("", text))
+        if not isinstance(data, dict):
+            raise ValueError("report is not a JSON object")
+    except ValueError:
+        data = extract_report_fallback(text)
+
+    metrics = data.get("metrics") if isinstance(data.get("metrics"), dict) else {}
+    overall_score = _score(data.get("overall_score"))
+
+    recommendation = str(data.get("recommendation") or "").upper()
+    if recommendation not in RECOMMENDATIONS:
+        if overall_score is None:
+            recommendation = None
+        elif overall_score >= 75:
+            recommendation = "HIGH_POTENTIAL"
+        elif overall_score >= 50:
+            recommendation = "MODERATE_POTENTIAL"
+        else:
+            recommendation = "LOW_POTENTIAL"
+
+    report = {
+        "overall_score": overall_score,
+        "recommendation": recommendation,
+        "metrics": {f"{area}_score": _score(metrics.get(f"{area}_score")) for area in AREAS},
+        "summary": str(data.get("summary") or "").strip() or text.strip(),
+    }
+    for field in LIST_FIELDS:
+        report[field] = _strings(data.get(field))
+    return report
@@ -0,0 +1,202 @@
+"""
+Retries with jittered exponential backoff and latency hedging for agent calls
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import openai
+
+from app.core.config import settings
+from app.core.metrics import AGENT_HEDGES, AGENT_RETRIES
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Starts one attempt; hedge is True for the duplicate of a slow call
+Attempt = Callable[[bool], Awaitable[T]]
+
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+def retry_reason(error: BaseException) -> Optional[str]:
+    """Why an error is worth retrying ("rate_limit", "server", "timeout", "connection"), or None"""
+    if isinstance(error, openai.APIStatusError):
+        if error.status_code == 429:
+            return "rate_limit"
+        if error.status_code >= 500:
+            return "server"
+        if error.status_code in RETRYABLE_STATUS_CODES:
+            return "timeout" if error.status_code == 408 else "server"
+        return None
+    # AutoGen turns openai.APITimeoutError into the builtin TimeoutError
+    if isinstance(error, (TimeoutError, openai.APITimeoutError)):
+        return "timeout"
+    if isinstance(error, openai.APIConnectionError):
+        return "connection"
+    return None
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the server asked us to wait, from a Retry-After header"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return max(float(response.headers.get("retry-after")), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(
+    attempt: int,
+    base: float = settings.LLM_RETRY_BASE_DELAY_SECONDS,
+    cap: float = settings.LLM_RETRY_MAX_DELAY_SECONDS,
+    rng: random.Random = random,
+) -> float:
+    """Full-jitter exponential backoff: uniform between 0 and base * 2^attempt, capped"""
+    return rng.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class LatencyTracker:
+    """Recent successful call latencies per key, for hedging thresholds"""
+
+    def __init__(self, window: int, min_samples: int):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, key: str, seconds: float):
+        self._samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, key: str, pct: float) -> Optional[float]:
+        """Nearest-rank percentile, or None until min_samples calls have been seen"""
+        samples = self._samples.get(key)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+        return ordered[min(rank, len(ordered) - 1)]
+
+
+class HedgeBudget:
+    """Caps hedges to max_rate of calls: each call earns max_rate credit, each hedge spends one"""
+
+    def __init__(self, max_rate: float, burst: float):
+        self.max_rate = max_rate
+        self.burst = max(burst, 1.0)
+        self._credit = 0.0
+
+    def on_call(self):
+        self._credit = min(self._credit + self.max_rate, self.burst)
+
+    def try_spend(self) -> bool:
+        if self._credit < 1.0:
+            return False
+        self._credit -= 1.0
+        return True
+
+
+class ResilientCaller:
+    """Runs agent calls with retries on transient failures and optional hedging of slow calls"""
+
+    def __init__(
+        self,
+        attempts: int = settings.LLM_RETRY_ATTEMPTS,
+        base_delay: float = settings.LLM_RETRY_BASE_DELAY_SECONDS,
+        max_delay: float = settings.LLM_RETRY_MAX_DELAY_SECONDS,
+        hedge_enabled: bool = settings.LLM_HEDGE_ENABLED,
+        hedge_percentile: float = settings.LLM_HEDGE_PERCENTILE,
+        hedge_max_rate: float = settings.LLM_HEDGE_MAX_RATE,
+        hedge_min_samples: int = settings.LLM_HEDGE_MIN_SAMPLES,
+        latency_window: int = settings.LLM_HEDGE_WINDOW,
+        rng: Optional[random.Random] = None,
+    ):
+        self.attempts = max(attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.latencies = LatencyTracker(latency_window, hedge_min_samples)
+        self.hedge_budget = HedgeBudget(hedge_max_rate, hedge_max_rate * latency_window)
+        self._rng = rng or random.Random()
+
+        self.calls = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    async def call(self, key: str, attempt: Attempt) -> Any:
+        """Run attempt until it succeeds, retrying transient errors with backoff
+
+        key groups calls with similar latency (the agent type).
+        """
+        for number in range(self.attempts):
+            try:
+                return await self._hedged(key, attempt)
+            except Exception as e:
+                reason = retry_reason(e)
+                if reason is None or number == self.attempts - 1:
+                    raise
+                delay = max(backoff_delay(number, self.base_delay, self.max_delay, self._rng), retry_after(e) or 0.0)
+                self.retries += 1
+                AGENT_RETRIES.labels(key, reason).inc()
+                logger.warning(f"{key} call failed ({reason}: {e}); retry {number + 1} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def _timed(self, key: str, attempt: Attempt, hedge: bool) -> Any:
+        started = time.monotonic()
+        result = await attempt(hedge)
+        self.latencies.record(key, time.monotonic() - started)
+        return result
+
+    async def _hedged(self, key: str, attempt: Attempt) -> Any:
+        self.calls += 1
+        self.hedge_budget.on_call()
+        threshold = (
+            self.latencies.percentile(key, self.hedge_percentile) if self.hedge_enabled else None
+        )
+        if threshold is None:
+            return await self._timed(key, attempt, False)
+
+        primary = asyncio.ensure_future(self._timed(key, attempt, False))
+        hedge = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=threshold)
+            if done or not self.hedge_budget.try_spend():
+                return await primary
+
+            self.hedges += 1
+            hedge = asyncio.ensure_future(self._timed(key, attempt, True))
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in done if task.exception() is None), None)
+                if winner is not None:
+                    hedge_won = winner is hedge
+                    if hedge_won:
+                        self.hedge_wins += 1
+                    AGENT_HEDGES.labels(key, "won" if hedge_won else "lost").inc()
+                    return winner.result()
+            # Both failed: surface the primary's error for the retry decision
+            return primary.result()
+        finally:
+            # The loser's LLM call is told to stop and releases its slot when it returns
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Retry and hedge counts"""
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "hedging": self.hedge_enabled,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+        }
@@ -0,0 +1,120 @@
+"""
+In-process cache of agent replies keyed by a normalized idea fingerprint
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Fold case and collapse whitespace so trivially different resubmits match"""
+    return " ".join(prompt.casefold().split())
+
+
+def idea_fingerprint(prompt: str, files: Optional[List[Dict]] = None) -> str:
+    """Hash of the normalized prompt and the attached files' content hashes"""
+    file_hashes = sorted(
+        # Files without a content hash fall back to their descriptive fields
+        file.get("sha256") or f"{file.get('name')}:{file.get('type')}:{file.get('size')}"
+        for file in files or []
+    )
+    return _sha256(json.dumps([normalize_prompt(prompt), file_hashes]))
+
+
+def make_cache_key(agent_type: str, cache_input: str, system_message: str, model: str) -> str:
+    """Key for one agent reply; changing the prompt wording or model invalidates it"""
+    return _sha256(json.dumps([agent_type, cache_input, _sha256(system_message), model]))
+
+
+class ResultCache:
+    """LRU cache with a TTL and entry/byte caps"""
+
+    def __init__(
+        self,
+        max_entries: int = settings.RESULT_CACHE_MAX_ENTRIES,
+        max_bytes: int = settings.RESULT_CACHE_MAX_BYTES,
+        ttl_seconds: float = settings.RESULT_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        # key -> (expires_at, value); most recently used last
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a live entry and mark it recently used"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: str):
+        """Store a value, evicting least recently used entries past the caps"""
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (self._clock() + self.ttl_seconds, value)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, key: str):
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str):
+        _, value = self._entries.pop(key)
+        self._bytes -= len(value.encode("utf-8"))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -3,46 +3,52 @@ Specialized AutoGen service for the VcAi workflow with 5 agents
 """
 
 import asyncio
+import contextvars
 import json
+import logging
+import re
+import time
 import uuid
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Awaitable, Callable, Dict, List, Optional, Any, Tuple
 from pathlib import Path
 
 import autogen
-from autogen import ConversableAgent, UserProxyAgent, AssistantAgent
+from autogen import UserProxyAgent, AssistantAgent
+from autogen.io import IOStream
 
 from app.core.config import settings
-from app.core.exceptions import AutoGenException
+from app.core.exceptions import AutoGenException, ConflictException
+from app.core.metrics import (
+    ACTIVE_ANALYSES,
+    AGENT_CALL_SECONDS,
+    AGENT_TOKENS,
+    ANALYSIS_CANCELLED,
+    ANALYSIS_ERRORS,
+    ANALYSIS_PARTIAL,
+    ANALYSIS_PHASE_SECONDS,
+)
+from app.utils.deadlines import Deadline, gather_within
+from app.utils.prompt_budget import PromptBuilder
+from app.utils.tokens import estimate_tokens
+from app.services.agent_pool import AgentSession, AgentSessionPool, parse_session_key, session_key
+from app.services.agent_streaming import AgentMessageStreamer, DeltaIOStream
+from app.services.conversation_store import ConversationStore
+from app.services.file_ingestion import extract_documents, remove_uploads, select_excerpts
+from app.services.llm_client import AsyncCompletionClient
+from app.services.llm_executor import last_call_seconds, llm_executor
+from app.services.llm_http import get_llm_http_client
+from app.services.model_router import ModelRouter, model_routes
+from app.services.resilience import ResilientCaller
+from app.services.report_parser import CODE_FENCE, IncrementalReportParser, REPORT_JSON_SCHEMA, parse_report
+from app.services.result_cache import ResultCache, idea_fingerprint, make_cache_key
 from app.services.websocket_manager import manager as websocket_manager
 
+logger = logging.getLogger(__name__)
 
-class SpecializedAutoGenService:
-    """Service for managing the specialized 5-agent workflow"""
-    
-    def __init__(self):
-        self.conversations: Dict[str, Dict] = {}
-        self.agents: Dict[str, ConversableAgent] = {}
-        self.work_dir = Path(settings.AUTOGEN_WORK_DIR)
-        self.work_dir.mkdir(exist_ok=True)
-        
-        # Initialize default LLM config
-        self.default_llm_config = {
-            "model": settings.OPENAI_MODEL,
-            "api_key": settings.OPENAI_API_KEY,
-            "cache_seed": settings.AUTOGEN_CACHE_SEED,
-        }
-        
-        # Create specialized agents
-        self._create_specialized_agents()
-    
-    def _create_specialized_agents(self):
-        """Create the 5 specialized agents for the VcAi workflow"""
-        
-        # Marketing Agent
-        marketing_agent = AssistantAgent(
-            name="marketing_agent",
-            system_message="""You are a Marketing Strategy Expert. Your role is to analyze business ideas from a marketing perspective.
+# System messages for the 5 specialized agents
+AGENT_SYSTEM_MESSAGES = {
+    "marketing": """You are a Marketing Strategy Expert. Your role is to analyze business ideas from a marketing perspective.
 
             When evaluating a business idea, consider:
             - Target market size and demographics
@@ -56,13 +62,7 @@ class SpecializedAutoGenService:
 
             Provide detailed analysis with specific recommendations for marketing strategy, customer acquisition, and market positioning.
             Be analytical but also highlight opportunities and potential challenges.""",
-            llm_config=self.default_llm_config,
-        )
-        
-        # Product Agent
-        product_agent = AssistantAgent(
-            name="product_agent",
-            system_message="""You are a Product Development Expert. Your role is to analyze business ideas from a product and technical perspective.
+    "product": """You are a Product Development Expert. Your role is to analyze business ideas from a product and technical perspective.
 
             When evaluating a business idea, consider:
             - Technical feasibility and implementation complexity
@@ -76,13 +76,7 @@ class SpecializedAutoGenService:
 
             Provide detailed analysis with specific recommendations for product development, technical implementation, and user experience optimization.
             Be practical and focus on actionable development insights.""",
-            llm_config=self.default_llm_config,
-        )
-        
-        # Legal Agent
-        legal_agent = AssistantAgent(
-            name="legal_agent",
-            system_message="""You are a Legal and Compliance Expert. Your role is to analyze business ideas from a legal and regulatory perspective.
+    "legal": """You are a Legal and Compliance Expert. Your role is to analyze business ideas from a legal and regulatory perspective.
 
             When evaluating a business idea, consider:
             - Regulatory compliance requirements
@@ -96,13 +90,7 @@ class SpecializedAutoGenService:
 
             Provide detailed analysis with specific recommendations for legal compliance, risk mitigation, and regulatory strategy.
             Be thorough in identifying potential legal issues and provide actionable compliance guidance.""",
-            llm_config=self.default_llm_config,
-        )
-        
-        # Verifier Agent
-        verifier_agent = AssistantAgent(
-            name="verifier_agent",
-            system_message="""You are an Analysis Verification Expert. Your role is to verify and validate claims made by other agents.
+    "verifier": """You are an Analysis Verification Expert. Your role is to verify and validate claims made by other agents.
 
             When reviewing agent analysis:
             - Cross-check facts and claims against known data
@@ -115,13 +103,7 @@ class SpecializedAutoGenService:
 
             Your goal is to ensure accuracy, completeness, and reliability of all agent recommendations.
             Ask probing questions and provide constructive feedback to strengthen the analysis.""",
-            llm_config=self.default_llm_config,
-        )
-        
-        # Summary Agent
-        summary_agent = AssistantAgent(
-            name="summary_agent",
-            system_message="""You are a Business Analysis Synthesis Expert. Your role is to create comprehensive startup success reports.
+    "summary": """You are a Business Analysis Synthesis Expert. Your role is to create comprehensive startup success reports.
 
             You receive verified analysis from marketing, product, and legal experts and must:
             - Synthesize all findings into a cohesive assessment
@@ -133,8 +115,150 @@ class SpecializedAutoGenService:
             - Suggest priority actions for the entrepreneur
 
             Create a structured report that helps entrepreneurs make informed decisions about their business ideas.
-            Be objective, thorough, and provide clear guidance for moving forward.""",
-            llm_config=self.default_llm_config,
+            Be objective, thorough, and provide clear guidance for moving forward.
+
+            Respond with a single JSON object and nothing else, with keys in this order:
+            overall_score (integer 0-100), metrics (object with marketing_score, product_score and
+            legal_score, integers 0-100), recommendation (HIGH_POTENTIAL, MODERATE_POTENTIAL or
+            LOW_POTENTIAL), summary (string), key_strengths, critical_risks, recommendations and
+            next_steps (arrays of strings).""",
+}
+
+SPECIALIST_AGENT_TYPES = ["marketing", "product", "legal"]
+
+# Phase each agent works in, for PHASE_MODELS and the per-call model record
+AGENT_PHASES = {
+    "marketing": "specialist_analysis",
+    "product": "specialist_analysis",
+    "legal": "specialist_analysis",
+    "verifier": "verification",
+    "summary": "summary",
+}
+
+# Models that answered the agent chats of the current cached call, in completion order;
+# hedged attempts run in child tasks and append to the same list
+_answering_models: contextvars.ContextVar[Optional[List[str]]] = contextvars.ContextVar(
+    "answering_models", default=None
+)
+
+# Agents that also answer in JSON mode (the batched verification); those calls run on
+# separately pooled sessions whose key marks the agent type with JSON_SESSION_SUFFIX
+JSON_REPLY_AGENT_TYPES = ("verifier",)
+JSON_SESSION_SUFFIX = "+json"
+
+# "standard" verifies each specialist separately as soon as it finishes;
+# "fast" verifies all three analyses in one verifier call
+WORKFLOW_PROFILES = ("standard", "fast")
+
+# Report summary when the summary agent runs out of time
+SUMMARY_TIMEOUT_MESSAGE = (
+    "The summary could not be generated before the analysis deadline. "
+    "The verified specialist analyses are included below."
+)
+
+
+class SpecializedAutoGenService:
+    """Service for managing the specialized 5-agent workflow"""
+    
+    def __init__(
+        self, 
+        store: Optional[ConversationStore] = None,
+        result_cache: Optional[ResultCache] = None
+    ):
+        self.store = store or ConversationStore()
+        self.result_cache = result_cache
+        if self.result_cache is None and settings.RESULT_CACHE_ENABLED:
+            self.result_cache = ResultCache()
+        self.work_dir = Path(settings.AUTOGEN_WORK_DIR)
+        self.work_dir.mkdir(exist_ok=True)
+        
+        # Prompt tokens trimmed by budgeting, per running conversation and phase
+        self._tokens_saved: Dict[str, Dict[str, int]] = {}
+        
+        # Model used by each agent call, per running conversation
+        self._model_calls: Dict[str, List[Dict[str, Any]]] = {}
+        
+        # Retries and hedging around every agent call
+        self.resilience = ResilientCaller()
+        
+        # Each agent's models in order of preference, skipping degraded ones
+        self.model_router = ModelRouter(model_routes(AGENT_PHASES))
+        
+        # Initialize default LLM config
+        self.default_llm_config = {
+            "model": settings.OPENAI_MODEL,
+            "api_key": settings.OPENAI_API_KEY,
+            "cache_seed": settings.AUTOGEN_CACHE_SEED,
+            "stream": settings.STREAM_AGENT_OUTPUT,
+            "timeout": settings.LLM_REQUEST_TIMEOUT_SECONDS,
+            "http_client": get_llm_http_client(),
+            # Retries are ours (ResilientCaller), with backoff shared across the whole call
+            "max_retries": 0,
+        }
+        if settings.OPENAI_BASE_URL:
+            self.default_llm_config["base_url"] = settings.OPENAI_BASE_URL
+        
+        # "async" sends agent chats as coroutines; "thread" runs AutoGen chats on the LLM executor
+        if settings.LLM_EXECUTION_MODE not in ("thread", "async"):
+            raise ValueError(f"Unknown LLM execution mode: {settings.LLM_EXECUTION_MODE}")
+        self.completion_client = AsyncCompletionClient(self.default_llm_config)
+        
+        # Each concurrent chat gets its own proxy + agent pair, per agent type and model
+        self.session_pool = AgentSessionPool(
+            self._create_agent_session,
+            [
+                session_key(agent_type, model)
+                for agent_type in AGENT_SYSTEM_MESSAGES
+                for model in self.model_router.models(agent_type)
+            ] + [
+                session_key(agent_type + JSON_SESSION_SUFFIX, model)
+                for agent_type in JSON_REPLY_AGENT_TYPES
+                for model in self.model_router.models(agent_type)
+            ],
+            settings.AGENT_POOL_SIZE,
+        )
+        if settings.LLM_EXECUTION_MODE == "thread":
+            # Fallback models' sessions are built when first needed
+            self.session_pool.warm(
+                session_key(agent_type, self.model_router.models(agent_type)[0])
+                for agent_type in AGENT_SYSTEM_MESSAGES
+            )
+    
+    def _llm_config_for(
+        self, agent_type: str, model: Optional[str] = None, json_reply: bool = False
+    ) -> Dict[str, Any]:
+        """LLM config for an agent on model (default: the agent's preferred model)
+        
+        The summary agent is constrained to the JSON report format; json_reply
+        constrains any other agent to a JSON object.
+        """
+        
+        config = {**self.default_llm_config, "model": model or self.model_router.models(agent_type)[0]}
+        if json_reply:
+            return {**config, "response_format": {"type": "json_object"}}
+        if agent_type != "summary" or settings.SUMMARY_RESPONSE_FORMAT == "text":
+            return config
+        
+        if settings.SUMMARY_RESPONSE_FORMAT == "json_schema":
+            response_format = {
+                "type": "json_schema",
+                "json_schema": {"name": "startup_report", "schema": REPORT_JSON_SCHEMA, "strict": True},
+            }
+        else:
+            response_format = {"type": "json_object"}
+        
+        return {**config, "response_format": response_format}
+    
+    def _create_agent_session(self, key: str) -> AgentSession:
+        """Create an isolated session for one of the 5 specialized agents on one model"""
+        
+        pooled_type, model = parse_session_key(key)
+        json_reply = pooled_type.endswith(JSON_SESSION_SUFFIX)
+        agent_type = pooled_type[:-len(JSON_SESSION_SUFFIX)] if json_reply else pooled_type
+        agent = AssistantAgent(
+            name=f"{agent_type}_agent",
+            system_message=AGENT_SYSTEM_MESSAGES[agent_type],
+            llm_config=self._llm_config_for(agent_type, model, json_reply),
         )
         
         # User proxy for managing conversations
@@ -146,92 +270,112 @@ class SpecializedAutoGenService:
             max_consecutive_auto_reply=1,
         )
         
-        self.agents = {
-            "marketing": marketing_agent,
-            "product": product_agent,
-            "legal": legal_agent,
-            "verifier": verifier_agent,
-            "summary": summary_agent,
-            "user_proxy": user_proxy,
-        }
+        return AgentSession(pooled_type, agent, user_proxy, model)
     
     async def process_startup_analysis(
         self, 
         prompt: str, 
         files: Optional[List[Dict]] = None,
-        conversation_id: Optional[str] = None
+        conversation_id: Optional[str] = None,
+        force_refresh: bool = False,
+        profile: str = settings.WORKFLOW_PROFILE
     ) -> Dict[str, Any]:
-        """Process the complete startup analysis workflow"""
+        """Process the complete startup analysis workflow
         
+        force_refresh bypasses cached replies; profile is one of WORKFLOW_PROFILES.
+        Specialists still running at the deadline are cancelled and the report is
+        marked partial with the sections that are missing.
+        """
+        
+        # Phase currently running, for duration and error metrics
+        phase = "setup"
+        started = time.perf_counter()
+        deadline = Deadline(settings.ANALYSIS_DEADLINE_SECONDS)
+        # Set once this run has stored the conversation; until then its ID may belong to another run
+        created = False
+        ACTIVE_ANALYSES.inc()
         try:
-            # Generate conversation ID if not provided
-            if not conversation_id:
-                conversation_id = str(uuid.uuid4())
-            
-            # Initialize conversation
-            self.conversations[conversation_id] = {
-                "id": conversation_id,
-                "created_at": datetime.now().isoformat(),
-                "prompt": prompt,
-                "files": files or [],
-                "status": "processing",
-                "results": {},
-            }
-            
-            # Notify clients that processing has started
-            await websocket_manager.broadcast_conversation_status(
-                conversation_id, 
-                "started",
-                {"message": "Starting analysis with specialized agents..."}
-            )
-            
-            # Phase 1: Parallel analysis by specialist agents
-            await websocket_manager.broadcast_conversation_status(
-                conversation_id, 
-                "specialist_analysis",
-                {"message": "Marketing, Product, and Legal agents analyzing..."}
-            )
+            with ANALYSIS_PHASE_SECONDS.labels(phase).time():
+                # Generate conversation ID if not provided
+                if not conversation_id:
+                    conversation_id = str(uuid.uuid4())
+                
+                if profile not in WORKFLOW_PROFILES:
+                    raise ValueError(f"Unknown workflow profile: {profile}")
+                
+                # Initialize conversation
+                await self.store.create_conversation(
+                    conversation_id, prompt, files, {"workflow_profile": profile}
+                )
+                created = True
+                
+                # Notify clients that processing has started
+                await websocket_manager.broadcast_conversation_status(
+                    conversation_id, 
+                    "started",
+                    {"message": "Starting analysis with specialized agents..."}
+                )
             
-            specialist_results = await self._run_specialist_analysis(
-                prompt, files, conversation_id
-            )
-            
-            # Phase 2: Verification conversations
-            await websocket_manager.broadcast_conversation_status(
-                conversation_id, 
-                "verification",
-                {"message": "Verifier agent reviewing all analyses..."}
-            )
-            
-            verified_results = await self._run_verification_phase(
-                specialist_results, conversation_id
-            )
+            # Phases 1 + 2: parallel specialist analysis, each verified as soon as it is done
+            phase = "specialist_analysis"
+            with ANALYSIS_PHASE_SECONDS.labels(phase).time():
+                await websocket_manager.broadcast_conversation_status(
+                    conversation_id, 
+                    "specialist_analysis",
+                    {"message": "Marketing, Product, and Legal agents analyzing..."}
+                )
+                
+                specialist_results, verified_results = await self._run_specialist_pipelines(
+                    prompt, files, conversation_id, force_refresh, profile, deadline
+                )
+                missing_sections = [
+                    agent_type for agent_type in SPECIALIST_AGENT_TYPES if agent_type not in verified_results
+                ]
+                if not verified_results:
+                    raise AutoGenException("No specialist analysis finished before the deadline")
             
             # Phase 3: Summary generation
-            await websocket_manager.broadcast_conversation_status(
-                conversation_id, 
-                "summary_generation",
-                {"message": "Summary agent generating final report..."}
-            )
+            phase = "summary_generation"
+            with ANALYSIS_PHASE_SECONDS.labels(phase).time():
+                await websocket_manager.broadcast_conversation_status(
+                    conversation_id, 
+                    "summary_generation",
+                    {"message": "Summary agent generating final report..."}
+                )
+                
+                try:
+                    final_report = await asyncio.wait_for(
+                        self._generate_summary_report(
+                            verified_results, conversation_id, force_refresh, missing_sections
+                        ),
+                        deadline.timeout(settings.SUMMARY_PHASE_TIMEOUT_SECONDS),
+                    )
+                except asyncio.TimeoutError:
+                    final_report = await self._publish_summary_fallback(
+                        verified_results, conversation_id, missing_sections + ["summary"]
+                    )
             
-            final_report = await self._generate_summary_report(
-                verified_results, conversation_id
-            )
-            
-            # Update conversation with final results
-            self.conversations[conversation_id].update({
-                "status": "completed",
-                "specialist_results": specialist_results,
-                "verified_results": verified_results,
-                "final_report": final_report,
-                "completed_at": datetime.now().isoformat(),
-            })
+            # Phase results are already buffered; store the report and close the run
+            phase = "persist"
+            with ANALYSIS_PHASE_SECONDS.labels(phase).time():
+                tokens_saved = self._tokens_saved.pop(conversation_id, {})
+                model_calls = self._model_calls.pop(conversation_id, [])
+                await self.store.update_metadata(
+                    conversation_id, {"prompt_tokens_saved": tokens_saved, "model_calls": model_calls}
+                )
+                await self.store.complete_conversation(conversation_id, final_report)
+            ANALYSIS_PHASE_SECONDS.labels("total").observe(time.perf_counter() - started)
             
             # Notify completion
+            if final_report["partial"]:
+                ANALYSIS_PARTIAL.inc()
+                message = f"Analysis complete without: {', '.join(final_report['missing_sections'])}"
+            else:
+                message = "Analysis complete!"
             await websocket_manager.broadcast_conversation_status(
                 conversation_id, 
                 "completed",
-                {"message": "Analysis complete!", "report": final_report}
+                {"message": message, "report": final_report}
             )
             
             return {
@@ -241,54 +385,205 @@ class SpecializedAutoGenService:
                 "metadata": {
                     "specialist_results": specialist_results,
                     "verified_results": verified_results,
+                    "prompt_tokens_saved": tokens_saved,
+                    "model_calls": model_calls,
+                    "workflow_profile": profile,
                 }
             }
             
+        except asyncio.CancelledError:
+            ANALYSIS_CANCELLED.labels(phase).inc()
+            if created:
+                self._tokens_saved.pop(conversation_id, None)
+                self._model_calls.pop(conversation_id, None)
+                await self.record_cancellation(conversation_id)
+            raise
         except Exception as e:
+            ANALYSIS_ERRORS.labels(phase).inc()
+            if not created:
+                # Never touch a conversation this run did not create (a reused ID)
+                if isinstance(e, ConflictException):
+                    raise
+                raise AutoGenException(f"Failed to process startup analysis: {str(e)}")
+            self._tokens_saved.pop(conversation_id, None)
+            self._model_calls.pop(conversation_id, None)
+            try:
+                await self.store.update_status(conversation_id, "error", str(e))
+            except Exception as store_error:
+                logger.error(f"Could not record failure of {conversation_id}: {store_error}")
+            
             await websocket_manager.broadcast_conversation_status(
                 conversation_id, 
                 "error",
                 {"message": f"Analysis failed: {str(e)}"}
             )
             raise AutoGenException(f"Failed to process startup analysis: {str(e)}")
+        finally:
+            ACTIVE_ANALYSES.dec()
+            # Attachments are only read while the analysis runs
+            await remove_uploads(files)
     
-    async def _run_specialist_analysis(
+    async def record_cancellation(self, conversation_id: str, message: str = "Analysis cancelled"):
+        """Mark a conversation cancelled and tell its clients"""
+        try:
+            await self.store.update_status(conversation_id, "cancelled")
+        except Exception as store_error:
+            logger.error(f"Could not record cancellation of {conversation_id}: {store_error}")
+        
+        await websocket_manager.broadcast_conversation_status(
+            conversation_id, 
+            "cancelled",
+            {"message": message}
+        )
+    
+    async def record_withdrawal(self, conversation_id: str):
+        """Store a cancelled conversation for an analysis withdrawn from the queue before it started"""
+        try:
+            await self.store.create_conversation(
+                conversation_id, "", status="cancelled", metadata={"cancelled_before_start": True}
+            )
+        except ConflictException:
+            # Its run had already started and stores its own outcome
+            logger.info(f"Conversation {conversation_id} was stored before its withdrawal")
+        except Exception as store_error:
+            logger.error(f"Could not record withdrawal of {conversation_id}: {store_error}")
+        
+        await websocket_manager.broadcast_conversation_status(
+            conversation_id, 
+            "cancelled",
+            {"message": "Analysis cancelled before it started"}
+        )
+    
+    async def _run_specialist_pipelines(
         self, 
         prompt: str, 
         files: Optional[List[Dict]], 
-        conversation_id: str
-    ) -> Dict[str, str]:
-        """Run parallel analysis by marketing, product, and legal agents"""
+        conversation_id: str,
+        force_refresh: bool = False,
+        profile: str = "standard",
+        deadline: Optional[Deadline] = None
+    ) -> Tuple[Dict[str, str], Dict[str, Dict[str, str]]]:
+        """Run marketing, product, and legal in parallel, each followed by its own verification
         
-        # Prepare the analysis prompt with file context
-        analysis_prompt = self._prepare_analysis_prompt(prompt, files)
-        
-        # Run analyses in parallel
-        tasks = []
-        for agent_type in ["marketing", "product", "legal"]:
-            task = self._run_agent_analysis(agent_type, analysis_prompt, conversation_id)
-            tasks.append(task)
+        The fast profile waits for all three and verifies them in a single verifier call.
+        Only specialists verified within the phase timeout are returned; the rest are cancelled.
+        """
         
-        # Wait for all specialist analyses to complete
-        results = await asyncio.gather(*tasks)
+        timeout = deadline.timeout(settings.SPECIALIST_PHASE_TIMEOUT_SECONDS) if deadline else None
+        phase_started = time.monotonic()
         
-        return {
-            "marketing": results[0],
-            "product": results[1],
-            "legal": results[2],
+        # Extract attachments once, then give each specialist the excerpts relevant to it
+        chunks = await extract_documents(files)
+        analysis_prompts = {
+            agent_type: self._prepare_analysis_prompt(
+                prompt, files, select_excerpts(chunks, agent_type, prompt)
+            )
+            for agent_type in SPECIALIST_AGENT_TYPES
         }
+        
+        # Resubmits that only differ in whitespace or case share specialist replies
+        fingerprint = idea_fingerprint(prompt, files)
+        
+        if profile == "fast":
+            analyses = await gather_within({
+                agent_type: self._run_agent_analysis(
+                    agent_type, analysis_prompts[agent_type], conversation_id, fingerprint, force_refresh
+                )
+                for agent_type in SPECIALIST_AGENT_TYPES
+            }, timeout)
+            specialist_results = {
+                agent_type: analyses[agent_type] for agent_type in SPECIALIST_AGENT_TYPES if agent_type in analyses
+            }
+            if not specialist_results:
+                return {}, {}
+            for agent_type, analysis in specialist_results.items():
+                self.store.record_phase_result(
+                    conversation_id, "specialist_analysis", agent_type, {"text": analysis}
+                )
+            
+            await websocket_manager.broadcast_conversation_status(
+                conversation_id, 
+                "verification",
+                {"message": "Verifier agent reviewing all analyses in one pass..."}
+            )
+            if timeout is not None:
+                timeout = max(timeout - (time.monotonic() - phase_started), 0.0)
+            try:
+                verified_results = await asyncio.wait_for(
+                    self._run_batched_verification(specialist_results, conversation_id, force_refresh),
+                    timeout,
+                )
+            except asyncio.TimeoutError:
+                # One call verifies every analysis, so none of them are verified
+                return specialist_results, {}
+            for agent_type, verification in verified_results.items():
+                self.store.record_phase_result(conversation_id, "verification", agent_type, verification)
+            
+            return specialist_results, verified_results
+        
+        # Set by whichever specialist reaches verification first
+        verification_started = asyncio.Event()
+        
+        # No barrier between phases: a verification only waits for its own specialist
+        results = await gather_within({
+            agent_type: self._run_specialist_pipeline(
+                agent_type, analysis_prompts[agent_type], conversation_id, verification_started,
+                fingerprint, force_refresh
+            )
+            for agent_type in SPECIALIST_AGENT_TYPES
+        }, timeout)
+        
+        specialist_results = {}
+        verified_results = {}
+        for agent_type in SPECIALIST_AGENT_TYPES:
+            if agent_type in results:
+                specialist_results[agent_type], verified_results[agent_type] = results[agent_type]
+        
+        return specialist_results, verified_results
+    
+    async def _run_specialist_pipeline(
+        self, 
+        agent_type: str, 
+        analysis_prompt: str, 
+        conversation_id: str,
+        verification_started: asyncio.Event,
+        fingerprint: Optional[str] = None,
+        force_refresh: bool = False
+    ) -> Tuple[str, Dict[str, str]]:
+        """Run one specialist's analysis and then verify it"""
+        
+        analysis = await self._run_agent_analysis(
+            agent_type, analysis_prompt, conversation_id, fingerprint, force_refresh
+        )
+        self.store.record_phase_result(
+            conversation_id, "specialist_analysis", agent_type, {"text": analysis}
+        )
+        
+        if not verification_started.is_set():
+            verification_started.set()
+            await websocket_manager.broadcast_conversation_status(
+                conversation_id, 
+                "verification",
+                {"message": "Verifier agent reviewing analyses as they complete..."}
+            )
+        
+        verification = await self._run_verification_conversation(
+            agent_type, analysis, conversation_id, force_refresh
+        )
+        self.store.record_phase_result(conversation_id, "verification", agent_type, verification)
+        
+        return analysis, verification
     
     async def _run_agent_analysis(
         self, 
         agent_type: str, 
         prompt: str, 
-        conversation_id: str
+        conversation_id: str,
+        fingerprint: Optional[str] = None,
+        force_refresh: bool = False
     ) -> str:
         """Run analysis by a specific agent"""
         
-        agent = self.agents[agent_type]
-        user_proxy = self.agents["user_proxy"]
-        
         # Notify typing
         await websocket_manager.broadcast_typing_indicator(
             conversation_id, agent_type, True
@@ -296,24 +591,12 @@ class SpecializedAutoGenService:
         
         try:
             # Start conversation
-            response = await asyncio.to_thread(
-                user_proxy.initiate_chat,
-                agent,
-                message=prompt,
-                max_turns=1,
-                silent=True,
+            agent_response = await self._run_cached_agent_chat(
+                agent_type, prompt, "No response generated",
+                conversation_id, {"message_type": "specialist_analysis"},
+                cache_input=fingerprint, force_refresh=force_refresh
             )
             
-            # Extract the agent's response
-            if hasattr(user_proxy, 'chat_messages') and agent.name in user_proxy.chat_messages:
-                messages = user_proxy.chat_messages[agent.name]
-                if messages:
-                    agent_response = messages[-1].get("content", "No response generated")
-                else:
-                    agent_response = "No response generated"
-            else:
-                agent_response = "No response generated"
-            
             # Stop typing indicator
             await websocket_manager.broadcast_typing_indicator(
                 conversation_id, agent_type, False
@@ -332,78 +615,45 @@ class SpecializedAutoGenService:
             )
             raise AutoGenException(f"Agent {agent_type} analysis failed: {str(e)}")
     
-    async def _run_verification_phase(
-        self, 
-        specialist_results: Dict[str, str], 
-        conversation_id: str
-    ) -> Dict[str, Dict[str, str]]:
-        """Run verification conversations between each specialist and verifier"""
-        
-        verified_results = {}
-        
-        for agent_type, analysis in specialist_results.items():
-            # Create verification conversation
-            verification_conversation = await self._run_verification_conversation(
-                agent_type, analysis, conversation_id
-            )
-            verified_results[agent_type] = verification_conversation
-        
-        return verified_results
-    
     async def _run_verification_conversation(
         self, 
         specialist_type: str, 
         analysis: str, 
-        conversation_id: str
+        conversation_id: str,
+        force_refresh: bool = False
     ) -> Dict[str, str]:
         """Run a verification conversation between specialist and verifier"""
         
-        specialist_agent = self.agents[specialist_type]
-        verifier_agent = self.agents["verifier"]
-        
         # Prepare verification prompt
-        verification_prompt = f"""
-        Please review and verify this {specialist_type} analysis:
-        
-        {analysis}
-        
-        Verify the accuracy of claims, validate recommendations, and provide feedback.
-        """
+        verification_prompt = self._prepare_verification_prompt(
+            specialist_type, analysis, conversation_id
+        )
         
         # Notify verification starting
         await websocket_manager.broadcast_agent_message(
             conversation_id, 
             "verifier", 
             f"Starting verification of {specialist_type} analysis...",
-            "verification_start"
+            "verification_start",
+            {"specialist_type": specialist_type}
         )
         
         # Typing indicator
         await websocket_manager.broadcast_typing_indicator(
-            conversation_id, "verifier", True
+            conversation_id, "verifier", True, {"specialist_type": specialist_type}
         )
         
         try:
             # Run verification conversation
-            user_proxy = self.agents["user_proxy"]
-            response = await asyncio.to_thread(
-                user_proxy.initiate_chat,
-                verifier_agent,
-                message=verification_prompt,
-                max_turns=1,
-                silent=True,
+            verifier_response = await self._run_cached_agent_chat(
+                "verifier", verification_prompt, "Verification completed",
+                conversation_id, {"message_type": "verification_result", "specialist_type": specialist_type},
+                force_refresh=force_refresh
             )
             
-            # Extract verifier response
-            verifier_response = "Verification completed"
-            if hasattr(user_proxy, 'chat_messages') and verifier_agent.name in user_proxy.chat_messages:
-                messages = user_proxy.chat_messages[verifier_agent.name]
-                if messages:
-                    verifier_response = messages[-1].get("content", "Verification completed")
-            
             # Stop typing
             await websocket_manager.broadcast_typing_indicator(
-                conversation_id, "verifier", False
+                conversation_id, "verifier", False, {"specialist_type": specialist_type}
             )
             
             # Broadcast verification result
@@ -423,58 +673,116 @@ class SpecializedAutoGenService:
             
         except Exception as e:
             await websocket_manager.broadcast_typing_indicator(
-                conversation_id, "verifier", False
+                conversation_id, "verifier", False, {"specialist_type": specialist_type}
             )
             raise AutoGenException(f"Verification failed for {specialist_type}: {str(e)}")
     
+    async def _run_batched_verification(
+        self, 
+        specialist_results: Dict[str, str], 
+        conversation_id: str,
+        force_refresh: bool = False
+    ) -> Dict[str, Dict[str, str]]:
+        """Verify every specialist analysis in one verifier call, split back per specialist"""
+        
+        verification_prompt = self._prepare_batched_verification_prompt(
+            specialist_results, conversation_id
+        )
+        specialist_types = list(specialist_results)
+        
+        await websocket_manager.broadcast_typing_indicator(
+            conversation_id, "verifier", True, {"specialist_types": specialist_types}
+        )
+        
+        try:
+            verifier_response = await self._run_cached_agent_chat(
+                "verifier", verification_prompt, "Verification completed",
+                conversation_id, {"message_type": "verification_result", "specialist_types": specialist_types},
+                force_refresh=force_refresh, json_reply=True
+            )
+            
+            await websocket_manager.broadcast_typing_indicator(
+                conversation_id, "verifier", False, {"specialist_types": specialist_types}
+            )
+            
+            reviews = self._split_batched_verification(verifier_response, specialist_types)
+            verified_results = {}
+            for specialist_type, analysis in specialist_results.items():
+                # Same events and result shape as one verification per specialist
+                await websocket_manager.broadcast_agent_message(
+                    conversation_id, 
+                    "verifier", 
+                    reviews[specialist_type],
+                    "verification_result",
+                    {"specialist_type": specialist_type}
+                )
+                verified_results[specialist_type] = {
+                    "original_analysis": analysis,
+                    "verification_result": reviews[specialist_type],
+                    "status": "verified"
+                }
+            
+            return verified_results
+            
+        except Exception as e:
+            await websocket_manager.broadcast_typing_indicator(
+                conversation_id, "verifier", False, {"specialist_types": specialist_types}
+            )
+            raise AutoGenException(f"Batched verification failed: {str(e)}")
+    
     async def _generate_summary_report(
         self, 
         verified_results: Dict[str, Dict[str, str]], 
-        conversation_id: str
+        conversation_id: str,
+        force_refresh: bool = False,
+        missing_sections: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """Generate final summary report using the summary agent"""
         
-        summary_agent = self.agents["summary"]
-        user_proxy = self.agents["user_proxy"]
-        
         # Prepare summary prompt with all verified results
-        summary_prompt = self._prepare_summary_prompt(verified_results)
+        summary_prompt = self._prepare_summary_prompt(verified_results, conversation_id, missing_sections)
         
         # Typing indicator
         await websocket_manager.broadcast_typing_indicator(
             conversation_id, "summary", True
         )
         
+        # Scores are pushed as soon as they stream in, ahead of the narrative sections
+        parser = IncrementalReportParser()
+        
+        async def publish_progress(delta: str):
+            fields = parser.feed(delta)
+            if fields:
+                await websocket_manager.broadcast_report_progress(conversation_id, fields)
+        
+        async def restart_progress():
+            # A retried summary streams from its first character again
+            nonlocal parser
+            parser = IncrementalReportParser()
+        
         try:
             # Generate summary
-            response = await asyncio.to_thread(
-                user_proxy.initiate_chat,
-                summary_agent,
-                message=summary_prompt,
-                max_turns=1,
-                silent=True,
+            summary_response = await self._run_cached_agent_chat(
+                "summary", summary_prompt, "Summary generated",
+                conversation_id, {"message_type": "final_report"},
+                force_refresh=force_refresh, on_delta=publish_progress, on_reset=restart_progress
             )
             
-            # Extract summary response
-            summary_response = "Summary generated"
-            if hasattr(user_proxy, 'chat_messages') and summary_agent.name in user_proxy.chat_messages:
-                messages = user_proxy.chat_messages[summary_agent.name]
-                if messages:
-                    summary_response = messages[-1].get("content", "Summary generated")
-            
             # Stop typing
             await websocket_manager.broadcast_typing_indicator(
                 conversation_id, "summary", False
             )
             
             # Parse and structure the summary
-            structured_report = self._structure_summary_report(summary_response, verified_results)
+            structured_report = self._structure_summary_report(
+                summary_response, verified_results, missing_sections
+            )
             
             # Broadcast final report
             await websocket_manager.broadcast_agent_message(
                 conversation_id, 
                 "summary", 
-                summary_response,
+                structured_report["summary"],
                 "final_report",
                 {"structured_report": structured_report}
             )
@@ -487,7 +795,259 @@ class SpecializedAutoGenService:
             )
             raise AutoGenException(f"Summary generation failed: {str(e)}")
     
-    def _prepare_analysis_prompt(self, prompt: str, files: Optional[List[Dict]]) -> str:
+    async def _publish_summary_fallback(
+        self, 
+        verified_results: Dict[str, Dict[str, str]], 
+        conversation_id: str,
+        missing_sections: List[str]
+    ) -> Dict[str, Any]:
+        """Report from the verified analyses alone, used when the summary agent times out"""
+        
+        await websocket_manager.broadcast_typing_indicator(
+            conversation_id, "summary", False
+        )
+        
+        structured_report = self._structure_summary_report(
+            SUMMARY_TIMEOUT_MESSAGE, verified_results, missing_sections
+        )
+        await websocket_manager.broadcast_agent_message(
+            conversation_id, 
+            "summary", 
+            structured_report["summary"],
+            "final_report",
+            {"structured_report": structured_report}
+        )
+        
+        return structured_report
+    
+    async def _run_cached_agent_chat(
+        self, 
+        agent_type: str, 
+        message: str, 
+        default_response: str,
+        conversation_id: Optional[str] = None,
+        stream_metadata: Optional[Dict[str, Any]] = None,
+        cache_input: Optional[str] = None,
+        force_refresh: bool = False,
+        on_delta: Optional[Callable[[str], Awaitable[None]]] = None,
+        json_reply: bool = False,
+        on_reset: Optional[Callable[[], Awaitable[None]]] = None
+    ) -> str:
+        """Run an agent chat through the result cache
+        
+        cache_input identifies the input when the message itself is too specific (the
+        specialists use the idea fingerprint); otherwise the message text is the input.
+        Downstream phases key on their full message, so a cached chain stays consistent.
+        """
+        
+        if self.result_cache is None:
+            return await self._run_resilient_agent_chat(
+                agent_type, message, default_response, conversation_id, stream_metadata, on_delta, json_reply,
+                on_reset
+            )
+        
+        preferred_model = self.model_router.models(agent_type)[0]
+        cache_key = make_cache_key(
+            agent_type,
+            cache_input or message,
+            AGENT_SYSTEM_MESSAGES[agent_type],
+            preferred_model,
+        )
+        
+        if not force_refresh:
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        answering_models: List[str] = []
+        token = _answering_models.set(answering_models)
+        try:
+            reply = await self._run_resilient_agent_chat(
+                agent_type, message, default_response, conversation_id, stream_metadata, on_delta, json_reply,
+                on_reset
+            )
+        finally:
+            _answering_models.reset(token)
+        
+        # Placeholder replies mean the agent produced nothing worth reusing, and a
+        # fallback model's reply must not be served as the preferred model's
+        answered_by = answering_models[0] if answering_models else preferred_model
+        if reply != default_response and answered_by == preferred_model:
+            self.result_cache.set(cache_key, reply)
+        
+        return reply
+    
+    async def _run_resilient_agent_chat(
+        self, 
+        agent_type: str, 
+        message: str, 
+        default_response: str,
+        conversation_id: Optional[str] = None,
+        stream_metadata: Optional[Dict[str, Any]] = None,
+        on_delta: Optional[Callable[[str], Awaitable[None]]] = None,
+        json_reply: bool = False,
+        on_reset: Optional[Callable[[], Awaitable[None]]] = None
+    ) -> str:
+        """Run an agent chat with retries on transient errors and hedging of slow calls
+        
+        Only the first attempt at a time streams to clients; a hedge runs silently.
+        Before a retry streams, clients get an agent_message_reset frame and on_reset
+        is awaited, since the failed attempt's deltas were already sent.
+        """
+        
+        streamed_attempts = 0
+        
+        async def attempt(hedge: bool) -> str:
+            nonlocal streamed_attempts
+            if hedge:
+                return await self._run_agent_chat(
+                    agent_type, message, default_response, conversation_id, stream_metadata,
+                    stream_to_clients=False, json_reply=json_reply
+                )
+            if streamed_attempts and settings.STREAM_AGENT_OUTPUT and conversation_id:
+                await websocket_manager.broadcast_agent_message_reset(
+                    conversation_id, agent_type, streamed_attempts + 1, stream_metadata
+                )
+                if on_reset is not None:
+                    await on_reset()
+            streamed_attempts += 1
+            return await self._run_agent_chat(
+                agent_type, message, default_response, conversation_id, stream_metadata, on_delta,
+                json_reply=json_reply
+            )
+        
+        return await self.resilience.call(agent_type, attempt)
+    
+    async def _run_agent_chat(
+        self, 
+        agent_type: str, 
+        message: str, 
+        default_response: str,
+        conversation_id: Optional[str] = None,
+        stream_metadata: Optional[Dict[str, Any]] = None,
+        on_delta: Optional[Callable[[str], Awaitable[None]]] = None,
+        stream_to_clients: bool = True,
+        json_reply: bool = False
+    ) -> str:
+        """Run a single-turn chat on the model the router picks and return the agent's reply
+        
+        json_reply asks the model for a JSON object (response_format) rather than free text.
+        """
+        
+        streamer = None
+        if settings.STREAM_AGENT_OUTPUT and conversation_id and stream_to_clients:
+            streamer = AgentMessageStreamer(
+                conversation_id, agent_type, stream_metadata, on_delta=on_delta
+            )
+        
+        model = self.model_router.choose(agent_type)
+        try:
+            if settings.LLM_EXECUTION_MODE == "async":
+                reply = await self._run_agent_completion(
+                    agent_type, model, message, default_response, streamer, json_reply
+                )
+            else:
+                reply = await self._run_session_chat(
+                    agent_type, model, message, default_response, streamer, json_reply
+                )
+        except Exception:
+            self._record_model_call(conversation_id, agent_type, model, False)
+            raise
+        
+        self._record_model_call(conversation_id, agent_type, model, True)
+        answering_models = _answering_models.get()
+        if answering_models is not None:
+            answering_models.append(model)
+        return reply
+    
+    async def _run_session_chat(
+        self, 
+        agent_type: str, 
+        model: str,
+        message: str, 
+        default_response: str,
+        streamer: Optional[AgentMessageStreamer] = None,
+        json_reply: bool = False
+    ) -> str:
+        """Run a single-turn AutoGen chat on a pooled session, in an LLM executor thread"""
+        
+        iostream = None
+        if streamer:
+            iostream = streamer.iostream()
+        elif settings.STREAM_AGENT_OUTPUT:
+            # Streamed completions are still printed; discard them instead of logging to stdout
+            iostream = DeltaIOStream(lambda delta: None)
+        
+        pooled_type = agent_type + JSON_SESSION_SUFFIX if json_reply else agent_type
+        async with self.session_pool.session(session_key(pooled_type, model)) as session:
+            prompt_tokens = estimate_tokens(session.agent.system_message) + estimate_tokens(message)
+            AGENT_TOKENS.labels(agent_type, "in").inc(prompt_tokens)
+            try:
+                # AutoGen prints streamed chunks to the default IOStream; the executor
+                # copies this context into the worker thread
+                with AGENT_CALL_SECONDS.labels(agent_type).time(), \
+                        IOStream.set_default(iostream):
+                    await llm_executor.run(
+                        session.user_proxy.initiate_chat,
+                        session.agent,
+                        message=message,
+                        max_turns=1,
+                        silent=True,
+                        prompt_tokens=prompt_tokens,
+                    )
+            finally:
+                if streamer:
+                    await streamer.aclose()
+            
+            # chat_messages is keyed by the agent object; the last entry is its reply
+            messages = session.user_proxy.chat_messages.get(session.agent)
+            reply = messages[-1].get("content") if messages else None
+            completion_tokens = estimate_tokens(reply)
+            AGENT_TOKENS.labels(agent_type, "out").inc(completion_tokens)
+            llm_executor.charge_tokens(completion_tokens)
+            return reply or default_response
+    
+    async def _run_agent_completion(
+        self, 
+        agent_type: str, 
+        model: str,
+        message: str, 
+        default_response: str,
+        streamer: Optional[AgentMessageStreamer] = None,
+        json_reply: bool = False
+    ) -> str:
+        """Run a single-turn chat as a coroutine, holding no thread while the model generates"""
+        
+        system_message = AGENT_SYSTEM_MESSAGES[agent_type]
+        prompt_tokens = estimate_tokens(system_message) + estimate_tokens(message)
+        AGENT_TOKENS.labels(agent_type, "in").inc(prompt_tokens)
+        try:
+            with AGENT_CALL_SECONDS.labels(agent_type).time():
+                reply = await llm_executor.run_async(
+                    self.completion_client.complete,
+                    [
+                        {"role": "system", "content": system_message},
+                        {"role": "user", "content": message},
+                    ],
+                    self._llm_config_for(agent_type, model, json_reply),
+                    on_delta=streamer.feed if streamer else None,
+                    prompt_tokens=prompt_tokens,
+                )
+        finally:
+            if streamer:
+                await streamer.aclose()
+        
+        completion_tokens = estimate_tokens(reply)
+        AGENT_TOKENS.labels(agent_type, "out").inc(completion_tokens)
+        llm_executor.charge_tokens(completion_tokens)
+        return reply or default_response
+    
+    def _prepare_analysis_prompt(
+        self, 
+        prompt: str, 
+        files: Optional[List[Dict]], 
+        excerpts: Optional[List[Dict]] = None
+    ) -> str:
         """Prepare the analysis prompt with file context"""
         
         analysis_prompt = f"""
@@ -501,27 +1061,137 @@ class SpecializedAutoGenService:
             for file in files:
                 analysis_prompt += f"- {file.get('name', 'Unknown file')}: {file.get('type', 'Unknown type')}\n"
         
+        if excerpts:
+            analysis_prompt += "\n\nRelevant excerpts from attached files:\n"
+            for excerpt in excerpts:
+                analysis_prompt += f"\n[{excerpt['file']}, part {excerpt['index'] + 1}]\n{excerpt['text']}\n"
+        
         analysis_prompt += "\n\nProvide a comprehensive analysis with specific recommendations and actionable insights."
         
         return analysis_prompt
     
-    def _prepare_summary_prompt(self, verified_results: Dict[str, Dict[str, str]]) -> str:
-        """Prepare the summary prompt with all verified results"""
+    def _prepare_verification_prompt(
+        self, 
+        specialist_type: str, 
+        analysis: str, 
+        conversation_id: Optional[str] = None
+    ) -> str:
+        """Prepare the verification prompt, trimming the analysis to the verification budget"""
         
-        summary_prompt = """
-        Create a comprehensive startup success report based on the following verified analyses:
+        builder = PromptBuilder(settings.VERIFICATION_PROMPT_MAX_TOKENS)
+        builder.add(f"""
+        Please review and verify this {specialist_type} analysis:
+        
+        """)
+        builder.add_section(analysis)
+        builder.add("""
+        
+        Verify the accuracy of claims, validate recommendations, and provide feedback.
+        """)
+        
+        verification_prompt = builder.build()
+        self._record_tokens_saved(conversation_id, "verification", builder.tokens_saved)
+        return verification_prompt
+    
+    def _prepare_batched_verification_prompt(
+        self, 
+        specialist_results: Dict[str, str], 
+        conversation_id: Optional[str] = None
+    ) -> str:
+        """Prepare one verification prompt covering every specialist analysis"""
+        
+        builder = PromptBuilder(settings.VERIFICATION_PROMPT_MAX_TOKENS * len(specialist_results))
+        builder.add("""
+        Please review and verify these analyses of the same business idea:
+        """)
+        
+        for agent_type, analysis in specialist_results.items():
+            builder.add(f"\n{agent_type.upper()} ANALYSIS:\n")
+            builder.add_section(analysis)
+            builder.add("\n")
+        
+        keys = ", ".join(f'"{agent_type}"' for agent_type in specialist_results)
+        builder.add(f"""
         
+        Verify the accuracy of claims, validate recommendations, and provide feedback for each analysis.
+        Respond with a single JSON object with the keys {keys}, each holding your verification
+        of that analysis as a string that starts with your verdict.
+        """)
+        
+        verification_prompt = builder.build()
+        self._record_tokens_saved(conversation_id, "verification", builder.tokens_saved)
+        return verification_prompt
+    
+    @staticmethod
+    def _split_batched_verification(text: str, specialist_types: List[str]) -> Dict[str, str]:
+        """Per-specialist reviews from a batched verifier reply
+        
+        Expects a JSON object keyed by specialist; falls back to headings naming each
+        specialist, and to the whole reply for any specialist that cannot be found.
         """
         
+        reviews: Dict[str, str] = {}
+        try:
+            data = json.loads(CODE_FENCE.sub("", text))
+        except ValueError:
+            data = None
+        
+        if isinstance(data, dict):
+            for specialist_type in specialist_types:
+                review = data.get(specialist_type)
+                if isinstance(review, dict):
+                    review = "\n".join(str(value) for value in review.values())
+                if review:
+                    reviews[specialist_type] = str(review).strip()
+        else:
+            # "## Marketing", "MARKETING ANALYSIS:" or "**Legal**:" open a section
+            names = "|".join(re.escape(specialist_type) for specialist_type in specialist_types)
+            heading = re.compile(
+                rf"^[#*\s]*({names})\b(?:\s+analysis)?\**(?::\**|[ \t]*$)",
+                re.IGNORECASE | re.MULTILINE,
+            )
+            matches = list(heading.finditer(text))
+            for match, following in zip(matches, matches[1:] + [None]):
+                specialist_type = match.group(1).lower()
+                body = text[match.end():following.start() if following else len(text)].strip()
+                if body and specialist_type not in reviews:
+                    reviews[specialist_type] = body
+        
+        return {
+            specialist_type: reviews.get(specialist_type) or text
+            for specialist_type in specialist_types
+        }
+    
+    def _prepare_summary_prompt(
+        self, 
+        verified_results: Dict[str, Dict[str, str]], 
+        conversation_id: Optional[str] = None,
+        missing_sections: Optional[List[str]] = None
+    ) -> str:
+        """Prepare the summary prompt with all verified results, within the summary budget"""
+        
+        builder = PromptBuilder(settings.SUMMARY_PROMPT_MAX_TOKENS)
+        builder.add("""
+        Create a comprehensive startup success report based on the following verified analyses:
+        
+        """)
+        
         for agent_type, result in verified_results.items():
-            summary_prompt += f"\n{agent_type.upper()} ANALYSIS:\n"
-            summary_prompt += f"Original Analysis: {result['original_analysis']}\n"
-            summary_prompt += f"Verification Result: {result['verification_result']}\n"
-            summary_prompt += "\n" + "="*50 + "\n"
+            builder.add(f"\n{agent_type.upper()} ANALYSIS:\nOriginal Analysis: ")
+            builder.add_section(result['original_analysis'])
+            builder.add("\nVerification Result: ")
+            builder.add_section(result['verification_result'])
+            builder.add("\n\n" + "="*50 + "\n")
         
-        summary_prompt += """
+        if missing_sections:
+            builder.add(
+                f"\nThe {', '.join(missing_sections)} analyses did not finish in time. "
+                "Leave their scores null and base the report on the analyses above.\n"
+            )
         
-        Generate a structured report with:
+        builder.add("""
+        
+        Generate the JSON report with:
         1. Overall success score (0-100)
         2. Individual scores for marketing, product, legal aspects
         3. Key strengths and opportunities
@@ -530,70 +1200,68 @@ class SpecializedAutoGenService:
         6. Next steps for the entrepreneur
         
         Make the report actionable and professional.
-        """
+        """)
         
+        summary_prompt = builder.build()
+        self._record_tokens_saved(conversation_id, "summary", builder.tokens_saved)
         return summary_prompt
     
+    def _record_model_call(
+        self, 
+        conversation_id: Optional[str], 
+        agent_type: str, 
+        model: str, 
+        ok: bool
+    ):
+        # Latency of the model itself: local queueing would make every model look slow
+        seconds = last_call_seconds()
+        if seconds is None:
+            # Failed before reaching the model (no free session); says nothing about it
+            return
+        self.model_router.record(agent_type, model, seconds, ok)
+        if not conversation_id:
+            return
+        self._model_calls.setdefault(conversation_id, []).append({
+            "agent_type": agent_type,
+            "phase": AGENT_PHASES[agent_type],
+            "model": model,
+            "fallback": model != self.model_router.models(agent_type)[0],
+            "seconds": round(seconds, 3),
+            "status": "completed" if ok else "error",
+        })
+    
+    def _record_tokens_saved(self, conversation_id: Optional[str], phase: str, tokens: int):
+        if not conversation_id or not tokens:
+            return
+        saved = self._tokens_saved.setdefault(conversation_id, {})
+        saved[phase] = saved.get(phase, 0) + tokens
+        logger.info(f"Trimmed {tokens} prompt tokens from {phase} of {conversation_id}")
+    
     def _structure_summary_report(
         self, 
         summary_text: str, 
-        verified_results: Dict[str, Dict[str, str]]
+        verified_results: Dict[str, Dict[str, str]],
+        missing_sections: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """Structure the summary response into a formatted report"""
         
-        # This is a simplified structuring - in a real implementation,
-        # you'd parse the summary_text more intelligently
         return {
-            "overall_score": 75,  # Would be extracted from summary_text
-            "recommendation": "MODERATE_POTENTIAL",
-            "metrics": {
-                "marketing_score": 78,
-                "product_score": 72,
-                "legal_score": 75,
-            },
-            "summary": summary_text,
-            "key_strengths": [
-                "Strong market opportunity identified",
-                "Technically feasible product development",
-                "Manageable legal compliance requirements"
-            ],
-            "critical_risks": [
-                "Competitive market landscape",
-                "Technical complexity considerations",
-                "Regulatory compliance timeline"
-            ],
-            "recommendations": [
-                "Conduct deeper market validation",
-                "Develop detailed technical roadmap",
-                "Consult with legal experts for compliance strategy"
-            ],
-            "next_steps": [
-                "Create business plan and financial projections",
-                "Build prototype and test with early users",
-                "Establish legal framework and compliance procedures"
-            ],
+            **parse_report(summary_text),
             "verified_analyses": verified_results,
+            "partial": bool(missing_sections),
+            "missing_sections": list(missing_sections or []),
             "report_generated_at": datetime.now().isoformat()
         }
     
     async def get_conversation(self, conversation_id: str) -> Optional[Dict]:
         """Get conversation by ID"""
-        return self.conversations.get(conversation_id)
+        return await self.store.get_conversation(conversation_id)
     
-    async def list_conversations(self, limit: int = 10, offset: int = 0) -> Dict:
-        """List conversations with pagination"""
-        conversations = list(self.conversations.values())
-        total = len(conversations)
-        
-        # Sort by creation date (newest first)
-        conversations.sort(key=lambda x: x["created_at"], reverse=True)
-        
-        # Apply pagination
-        paginated = conversations[offset:offset + limit]
-        
-        return {
-            "conversations": paginated,
-            "total": total,
-            "limit": limit,
-            "offset": offset,
-        }
+    async def list_conversations(
+        self, 
+        limit: int = 10, 
+        cursor: Optional[str] = None, 
+        fields: Optional[str] = None
+    ) -> Dict:
+        """List conversations with cursor pagination and field projection"""
+        return await self.store.list_conversations(limit=limit, cursor=cursor, fields=fields)
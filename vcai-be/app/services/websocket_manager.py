@@ -4,76 +4,353 @@ WebSocket connection manager for real-time communication
 
 import asyncio
 import json
-from typing import Dict, List, Optional, Any
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Any, Set, Tuple
 from fastapi import WebSocket, WebSocketDisconnect
 import logging
 
+from app.core.config import settings
+from app.core.metrics import WS_BROADCAST_FANOUT, WS_CONNECTIONS, WS_SEND_SECONDS
+from app.services.event_bus import EventBus, create_event_bus
+from app.services.event_log import ConversationEventLog
+
 logger = logging.getLogger(__name__)
 
+# Frames that may be discarded for a client that cannot keep up
+DROPPABLE_MESSAGE_TYPES = {"typing_indicator"}
+
+# Statuses after which a conversation emits no more events
+FINAL_STATUSES = {"completed", "error", "cancelled"}
+
+# "Try Again Later": the client fell too far behind and should reconnect
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class ClientConnection:
+    """A client's socket with a bounded outbound queue drained by its own writer task"""
+    
+    def __init__(
+        self,
+        client_id: str,
+        websocket: WebSocket,
+        on_send_failure: Callable[[str, WebSocket], None],
+        max_queue_size: int = settings.WS_SEND_QUEUE_SIZE,
+        send_timeout: float = settings.WS_SEND_TIMEOUT_SECONDS,
+    ):
+        self.client_id = client_id
+        self.websocket = websocket
+        self.max_queue_size = max_queue_size
+        self.send_timeout = send_timeout
+        self._on_send_failure = on_send_failure
+        # (serialized frame, droppable) in send order
+        self.queue: Deque[Tuple[str, bool]] = deque()
+        self._ready = asyncio.Event()
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.closed = False
+        self.writer = asyncio.create_task(self._write_loop())
+        WS_CONNECTIONS.inc()
+    
+    def enqueue(self, text: str, droppable: bool = False, force: bool = False) -> bool:
+        """Queue a frame; returns False when the client is too slow to keep
+        
+        force bypasses the cap, for replaying history to a client that just joined
+        """
+        if len(self.queue) >= self.max_queue_size and not force:
+            if droppable:
+                self.frames_dropped += 1
+                return True
+            
+            # Make room by discarding the oldest droppable frame still queued
+            for index, (_, queued_droppable) in enumerate(self.queue):
+                if queued_droppable:
+                    del self.queue[index]
+                    self.frames_dropped += 1
+                    break
+            else:
+                return False
+        
+        self.queue.append((text, droppable))
+        self._ready.set()
+        return True
+    
+    async def _write_loop(self):
+        while True:
+            if not self.queue:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            
+            text, _ = self.queue.popleft()
+            try:
+                started = time.perf_counter()
+                await asyncio.wait_for(self.websocket.send_text(text), self.send_timeout)
+                WS_SEND_SECONDS.observe(time.perf_counter() - started)
+                self.frames_sent += 1
+            except Exception as e:
+                logger.error(f"Error sending message to {self.client_id}: {e}")
+                self._on_send_failure(self.client_id, self.websocket)
+                return
+    
+    def close(self):
+        """Stop the writer; queued frames are discarded"""
+        if self.closed:
+            return
+        self.closed = True
+        self.writer.cancel()
+        self.queue.clear()
+        WS_CONNECTIONS.dec()
+
 
 class ConnectionManager:
     """Manages WebSocket connections and message broadcasting"""
     
-    def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
-        self.conversation_connections: Dict[str, List[str]] = {}
+    def __init__(
+        self,
+        max_queue_size: int = settings.WS_SEND_QUEUE_SIZE,
+        send_timeout: float = settings.WS_SEND_TIMEOUT_SECONDS,
+        event_bus: Optional[EventBus] = None,
+        event_log: Optional[ConversationEventLog] = None,
+    ):
+        self.max_queue_size = max_queue_size
+        self.send_timeout = send_timeout
+        # Until the bus is started, broadcasts are delivered to local sockets only
+        self.event_bus = event_bus
+        self._event_bus_started = False
+        self.event_log = event_log or ConversationEventLog()
+        self.active_connections: Dict[str, ClientConnection] = {}
+        # Room -> clients and the reverse index client -> rooms, kept in step
+        self.conversation_connections: Dict[str, Set[str]] = {}
+        self.client_conversations: Dict[str, Set[str]] = {}
+        
+        # Totals including clients that have since disconnected
+        self.frames_broadcast = 0
+        self.slow_consumer_disconnects = 0
+        self._closed_frames_sent = 0
+        self._closed_frames_dropped = 0
+    
+    async def start(self):
+        """Subscribe to events published by every worker"""
+        if self.event_bus is not None and not self._event_bus_started:
+            await self.event_bus.start(self._on_event)
+            self._event_bus_started = True
+    
+    async def close(self):
+        """Stop receiving events and drop every local connection"""
+        if self.event_bus is not None and self._event_bus_started:
+            await self.event_bus.close()
+            self._event_bus_started = False
+        for client_id in list(self.active_connections):
+            self.disconnect(client_id)
     
     async def connect(self, websocket: WebSocket, client_id: str):
         """Accept a new WebSocket connection"""
         await websocket.accept()
-        self.active_connections[client_id] = websocket
+        if client_id in self.active_connections:
+            self._close_connection(self.active_connections.pop(client_id))
+        self.active_connections[client_id] = ClientConnection(
+            client_id, websocket, self.disconnect, self.max_queue_size, self.send_timeout
+        )
         logger.info(f"Client {client_id} connected via WebSocket")
     
-    def disconnect(self, client_id: str):
-        """Remove a WebSocket connection"""
-        if client_id in self.active_connections:
+    def disconnect(self, client_id: str, websocket: Optional[WebSocket] = None):
+        """Remove a WebSocket connection
+        
+        Passing the websocket makes this a no-op if the client has since reconnected
+        """
+        connection = self.active_connections.get(client_id)
+        if websocket is not None and connection is not None and connection.websocket is not websocket:
+            return
+        
+        if connection is not None:
             del self.active_connections[client_id]
+            self._close_connection(connection)
             logger.info(f"Client {client_id} disconnected from WebSocket")
         
-        # Remove from conversation connections
-        for conversation_id, clients in self.conversation_connections.items():
-            if client_id in clients:
-                clients.remove(client_id)
-                if not clients:
-                    del self.conversation_connections[conversation_id]
-                break
+        # Leave every room the client had joined
+        for conversation_id in self.client_conversations.pop(client_id, set()):
+            self._remove_from_room(client_id, conversation_id)
     
-    def join_conversation(self, client_id: str, conversation_id: str):
-        """Add client to a conversation room"""
-        if conversation_id not in self.conversation_connections:
-            self.conversation_connections[conversation_id] = []
+    def _close_connection(self, connection: ClientConnection):
+        connection.close()
+        self._closed_frames_sent += connection.frames_sent
+        self._closed_frames_dropped += connection.frames_dropped
+    
+    def join_conversation(self, client_id: str, conversation_id: str, last_seq: Optional[int] = None):
+        """Add client to a conversation room; a client may be in several rooms
+        
+        With last_seq, logged events after it are queued before any live event
+        """
+        clients = self.conversation_connections.setdefault(conversation_id, set())
         
-        if client_id not in self.conversation_connections[conversation_id]:
-            self.conversation_connections[conversation_id].append(client_id)
+        if client_id not in clients:
+            clients.add(client_id)
+            self.client_conversations.setdefault(client_id, set()).add(conversation_id)
             logger.info(f"Client {client_id} joined conversation {conversation_id}")
+        
+        if last_seq is not None:
+            self._replay(client_id, conversation_id, last_seq)
+    
+    def _replay(self, client_id: str, conversation_id: str, last_seq: int):
+        # Runs in the same loop step as the join, so live events can only follow it
+        connection = self.active_connections.get(client_id)
+        if connection is None:
+            return
+        
+        frames, first_seq = self.event_log.replay(conversation_id, last_seq)
+        if first_seq is not None and first_seq > last_seq + 1:
+            # Older events were evicted; the client should reload the conversation
+            connection.enqueue(json.dumps({
+                "type": "replay_gap",
+                "conversation_id": conversation_id,
+                "missing_from_seq": last_seq + 1,
+                "missing_to_seq": first_seq - 1,
+            }), force=True)
+        for text in frames:
+            connection.enqueue(text, force=True)
+    
+    def leave_conversation(self, client_id: str, conversation_id: str):
+        """Remove client from one conversation room"""
+        rooms = self.client_conversations.get(client_id)
+        if rooms is None or conversation_id not in rooms:
+            return
+        
+        rooms.discard(conversation_id)
+        if not rooms:
+            del self.client_conversations[client_id]
+        self._remove_from_room(client_id, conversation_id)
+        logger.info(f"Client {client_id} left conversation {conversation_id}")
+    
+    def _remove_from_room(self, client_id: str, conversation_id: str):
+        clients = self.conversation_connections.get(conversation_id)
+        if clients is None:
+            return
+        clients.discard(client_id)
+        if not clients:
+            del self.conversation_connections[conversation_id]
+    
+    def _enqueue(self, client_id: str, text: str, droppable: bool) -> bool:
+        """Queue a frame for one client, disconnecting it if it cannot keep up"""
+        connection = self.active_connections.get(client_id)
+        if connection is None:
+            return False
+        
+        if connection.enqueue(text, droppable):
+            return True
+        
+        logger.warning(
+            f"Disconnecting slow client {client_id}: "
+            f"{len(connection.queue)} frames queued"
+        )
+        self.slow_consumer_disconnects += 1
+        self.disconnect(client_id)
+        asyncio.create_task(self._close_slow_consumer(connection.websocket))
+        return False
+    
+    @staticmethod
+    async def _close_slow_consumer(websocket: WebSocket):
+        try:
+            await websocket.close(code=SLOW_CONSUMER_CLOSE_CODE, reason="Client too slow")
+        except Exception:
+            # The socket may already be gone
+            pass
     
     async def send_personal_message(self, message: Dict[str, Any], client_id: str):
         """Send a message to a specific client"""
-        if client_id in self.active_connections:
+        self._enqueue(
+            client_id,
+            json.dumps(message),
+            message.get("type") in DROPPABLE_MESSAGE_TYPES,
+        )
+    
+    async def broadcast_to_conversation(self, message: Dict[str, Any], conversation_id: str):
+        """Broadcast a message to all clients in a conversation, on every worker
+        
+        The message is serialized once and queued for every client; slow clients
+        never hold up the caller or each other. Every event except droppable ones
+        gets the conversation's next seq and is logged for replay.
+        """
+        droppable = message.get("type") in DROPPABLE_MESSAGE_TYPES
+        seq = 0
+        if not droppable:
+            seq = await self._next_seq(conversation_id)
+            message = {**message, "seq": seq}
+        final = message.get("type") == "conversation_status" and message.get("status") in FINAL_STATUSES
+        text = json.dumps(message)
+        self.frames_broadcast += 1
+        
+        if self._event_bus_started:
             try:
-                await self.active_connections[client_id].send_text(json.dumps(message))
+                await self.event_bus.publish(
+                    conversation_id, f"{seq}:{int(droppable)}{int(final)}:{text}"
+                )
+                return
             except Exception as e:
-                logger.error(f"Error sending message to {client_id}: {e}")
-                self.disconnect(client_id)
+                logger.error(f"Event bus publish failed, delivering locally only: {e}")
+        
+        self._deliver_local(conversation_id, text, droppable, seq, final)
     
-    async def broadcast_to_conversation(self, message: Dict[str, Any], conversation_id: str):
-        """Broadcast a message to all clients in a conversation"""
-        if conversation_id in self.conversation_connections:
-            disconnected_clients = []
-            
-            for client_id in self.conversation_connections[conversation_id]:
-                if client_id in self.active_connections:
-                    try:
-                        await self.active_connections[client_id].send_text(json.dumps(message))
-                    except Exception as e:
-                        logger.error(f"Error broadcasting to {client_id}: {e}")
-                        disconnected_clients.append(client_id)
-                else:
-                    disconnected_clients.append(client_id)
-            
-            # Clean up disconnected clients
-            for client_id in disconnected_clients:
-                self.disconnect(client_id)
+    async def _next_seq(self, conversation_id: str) -> int:
+        """Seq from the event bus when it shares them across workers, else from this process"""
+        if self._event_bus_started:
+            try:
+                seq = await self.event_bus.next_seq(conversation_id)
+                if seq is not None:
+                    return seq
+            except Exception as e:
+                logger.error(f"Event bus seq allocation failed, numbering locally: {e}")
+        return self.event_log.next_seq(conversation_id)
+    
+    def _on_event(self, conversation_id: str, payload: str):
+        """Event bus callback; payloads are <seq>:<droppable><final>:<frame>"""
+        seq, flags, text = payload.split(":", 2)
+        self._deliver_local(conversation_id, text, flags[0] == "1", int(seq), flags[1] == "1")
+    
+    def _deliver_local(
+        self, 
+        conversation_id: str, 
+        text: str, 
+        droppable: bool, 
+        seq: int = 0, 
+        final: bool = False
+    ):
+        """Log a frame and queue it for the clients of a room connected to this worker"""
+        if seq:
+            self.event_log.append(conversation_id, seq, text, final)
+        
+        if conversation_id not in self.conversation_connections:
+            WS_BROADCAST_FANOUT.observe(0)
+            return
+        
+        WS_BROADCAST_FANOUT.observe(len(self.conversation_connections[conversation_id]))
+        disconnected_clients = []
+        
+        for client_id in list(self.conversation_connections[conversation_id]):
+            if not self._enqueue(client_id, text, droppable):
+                disconnected_clients.append(client_id)
+        
+        # Clean up disconnected clients
+        for client_id in disconnected_clients:
+            self.disconnect(client_id)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and delivery counters for monitoring"""
+        depths = [len(connection.queue) for connection in self.active_connections.values()]
+        connections = self.active_connections.values()
+        return {
+            "event_bus": self.event_bus.name if self._event_bus_started else "local",
+            "connections": len(depths),
+            "conversations": len(self.conversation_connections),
+            "max_queue_size": self.max_queue_size,
+            "queued_frames": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "frames_broadcast": self.frames_broadcast,
+            "frames_sent": self._closed_frames_sent + sum(c.frames_sent for c in connections),
+            "frames_dropped": self._closed_frames_dropped + sum(c.frames_dropped for c in connections),
+            "slow_consumer_disconnects": self.slow_consumer_disconnects,
+            "event_log": self.event_log.stats(),
+        }
     
     async def broadcast_agent_message(
         self, 
@@ -95,11 +372,68 @@ class ConnectionManager:
         
         await self.broadcast_to_conversation(message_data, conversation_id)
     
+    async def broadcast_agent_message_delta(
+        self, 
+        conversation_id: str, 
+        agent_type: str, 
+        delta: str, 
+        delta_index: int,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """Broadcast a streamed fragment of an agent message; delta_index counts within the message"""
+        message_data = {
+            "type": "agent_message_delta",
+            "conversation_id": conversation_id,
+            "agent_type": agent_type,
+            "delta": delta,
+            "delta_index": delta_index,
+            "timestamp": asyncio.get_event_loop().time(),
+            "metadata": metadata or {}
+        }
+        
+        await self.broadcast_to_conversation(message_data, conversation_id)
+    
+    async def broadcast_agent_message_reset(
+        self, 
+        conversation_id: str, 
+        agent_type: str, 
+        attempt: int,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """Tell clients to drop an agent message's deltas; attempt (from 1) streams next from delta_index 0"""
+        message_data = {
+            "type": "agent_message_reset",
+            "conversation_id": conversation_id,
+            "agent_type": agent_type,
+            "attempt": attempt,
+            "timestamp": asyncio.get_event_loop().time(),
+            "metadata": metadata or {}
+        }
+        
+        await self.broadcast_to_conversation(message_data, conversation_id)
+    
+    async def broadcast_report_progress(
+        self, 
+        conversation_id: str, 
+        fields: Dict[str, Any]
+    ):
+        """Broadcast report fields (such as scores) as soon as the streaming summary completes them"""
+        message_data = {
+            "type": "report_progress",
+            "conversation_id": conversation_id,
+            "agent_type": "summary",
+            "fields": fields,
+            "timestamp": asyncio.get_event_loop().time(),
+        }
+        
+        await self.broadcast_to_conversation(message_data, conversation_id)
+    
     async def broadcast_typing_indicator(
         self, 
         conversation_id: str, 
         agent_type: str, 
-        is_typing: bool
+        is_typing: bool,
+        metadata: Optional[Dict[str, Any]] = None
     ):
         """Broadcast typing indicator for an agent"""
         message_data = {
@@ -107,7 +441,8 @@ class ConnectionManager:
             "conversation_id": conversation_id,
             "agent_type": agent_type,
             "is_typing": is_typing,
-            "timestamp": asyncio.get_event_loop().time()
+            "timestamp": asyncio.get_event_loop().time(),
+            "metadata": metadata or {}
         }
         
         await self.broadcast_to_conversation(message_data, conversation_id)
@@ -131,4 +466,4 @@ class ConnectionManager:
 
 
 # Global connection manager instance
-manager = ConnectionManager()
+manager = ConnectionManager(event_bus=create_event_bus())
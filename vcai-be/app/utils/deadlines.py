@@ -0,0 +1,48 @@
+"""
+Wall-clock deadlines for long-running analyses
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Dict, Optional
+
+
+class Deadline:
+    """Absolute time limit for one analysis, shared by its per-phase timeouts"""
+
+    def __init__(self, seconds: float):
+        # 0 or less means no deadline
+        self.expires_at = time.monotonic() + seconds if seconds > 0 else None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, never negative; None without a deadline"""
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def timeout(self, phase_seconds: float = 0) -> Optional[float]:
+        """Timeout for a phase: its own limit or the time left, whichever is sooner"""
+        limits = [limit for limit in (self.remaining(), phase_seconds or None) if limit is not None]
+        return min(limits) if limits else None
+
+
+async def gather_within(awaitables: Dict[str, Awaitable[Any]], timeout: Optional[float]) -> Dict[str, Any]:
+    """Run named awaitables concurrently and return the results of those done within timeout
+
+    The rest are cancelled and awaited, so their LLM calls are released before this
+    returns. The first exception raised by any of them cancels the others and propagates.
+    """
+    tasks = {name: asyncio.ensure_future(awaitable) for name, awaitable in awaitables.items()}
+    try:
+        done, _ = await asyncio.wait(
+            tasks.values(), timeout=timeout, return_when=asyncio.FIRST_EXCEPTION
+        )
+    finally:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    for task in done:
+        if task.exception() is not None:
+            raise task.exception()
+    return {name: task.result() for name, task in tasks.items() if task in done}
@@ -0,0 +1,51 @@
+"""
+Keyset pagination cursors and field projection for list endpoints
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.exceptions import ValidationException
+
+
+def encode_cursor(created_at: str, record_id: str) -> str:
+    """Opaque cursor pointing just past (created_at, id)"""
+    raw = json.dumps([created_at, record_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Inverse of encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, record_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(created_at), str(record_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise ValidationException("Invalid pagination cursor")
+
+
+def parse_fields(
+    fields: Optional[str],
+    allowed: Iterable[str],
+    default: Sequence[str],
+) -> List[str]:
+    """Turn a comma separated fields= parameter into a validated list"""
+    if not fields:
+        return list(default)
+
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise ValidationException(f"Unknown fields: {', '.join(unknown)}")
+
+    # The id is needed to build the next cursor and to fetch full records
+    if "id" not in requested:
+        requested.insert(0, "id")
+    return requested
+
+
+def project(record: Dict[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+    """Keep only the requested fields of a record"""
+    return {field: record.get(field) for field in fields}
@@ -0,0 +1,126 @@
+"""
+Token-budgeted prompt assembly
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+from app.utils.tokens import estimate_tokens
+
+OMISSION_MARKER = "[...]"
+
+# Lines that carry a section's structure: markdown/numbered headings, ALL CAPS or "Label:" lines
+HEADING = re.compile(
+    r"^\s*(#{1,6}\s|\*\*[^*]+\*\*:?\s*$|\d+[.)]\s+\S|[A-Z][A-Z0-9 &/-]{2,}:?\s*$|[^.!?]{1,80}:\s*$)"
+)
+# Lines with the conclusions a downstream agent needs most
+KEY_CONTENT = re.compile(
+    r"score|rating|\b\d{1,3}\s*(/\s*100|%)|recommend|next step|risk|verdict|conclusion",
+    re.IGNORECASE,
+)
+
+
+def _line_priority(line: str) -> int:
+    if HEADING.match(line):
+        return 0
+    if KEY_CONTENT.search(line):
+        return 1
+    return 2
+
+
+def trim_to_budget(text: str, budget: int) -> str:
+    """Shrink text to about budget tokens, keeping headings, then scores and
+    recommendations, then the remaining lines in document order
+
+    Kept lines stay in their original order and every gap is marked with
+    OMISSION_MARKER. The result only depends on the text and the budget.
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+
+    lines = [line.rstrip() for line in text.splitlines() if line.strip()]
+    marker_tokens = estimate_tokens(OMISSION_MARKER)
+
+    kept = set()
+    used = 0
+    for index in sorted(range(len(lines)), key=lambda i: (_line_priority(lines[i]), i)):
+        # Each kept line may open one gap, so reserve a marker with it
+        cost = estimate_tokens(lines[index]) + marker_tokens
+        if used + cost > budget:
+            continue
+        kept.add(index)
+        used += cost
+
+    if not kept:
+        return text[: max(budget, 0) * 4]
+
+    trimmed: List[str] = []
+    previous = -1
+    for index in sorted(kept):
+        if index != previous + 1:
+            trimmed.append(OMISSION_MARKER)
+        trimmed.append(lines[index])
+        previous = index
+    if previous != len(lines) - 1:
+        trimmed.append(OMISSION_MARKER)
+    return "\n".join(trimmed)
+
+
+class PromptBuilder:
+    """Assembles a prompt from fixed text and trimmable sections within a token budget
+
+    Fixed text is always kept. The remaining budget is split evenly across the
+    sections; sections smaller than their share keep their full text and hand
+    the rest to the larger ones, which are trimmed with trim_to_budget.
+    """
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        # (text, trimmable, max_tokens)
+        self._parts: List[Tuple[str, bool, Optional[int]]] = []
+        self.original_tokens = 0
+        self.prompt_tokens = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(self.original_tokens - self.prompt_tokens, 0)
+
+    def add(self, text: str) -> "PromptBuilder":
+        """Add text that is never trimmed"""
+        self._parts.append((text, False, None))
+        return self
+
+    def add_section(self, text: str, max_tokens: Optional[int] = None) -> "PromptBuilder":
+        """Add text that may be trimmed, optionally capped at max_tokens on its own"""
+        self._parts.append((text, True, max_tokens))
+        return self
+
+    def build(self) -> str:
+        self.original_tokens = sum(estimate_tokens(text) for text, _, _ in self._parts)
+
+        fixed_tokens = sum(estimate_tokens(text) for text, trimmable, _ in self._parts if not trimmable)
+        budgets = self._allocate(max(self.budget - fixed_tokens, 0))
+
+        rendered = []
+        for index, (text, trimmable, _) in enumerate(self._parts):
+            rendered.append(trim_to_budget(text, budgets[index]) if trimmable else text)
+
+        prompt = "".join(rendered)
+        self.prompt_tokens = estimate_tokens(prompt)
+        return prompt
+
+    def _allocate(self, available: int) -> dict:
+        """Per-section budgets by water-filling: small sections are satisfied first"""
+        needs = {
+            index: min(estimate_tokens(text), max_tokens if max_tokens is not None else available)
+            for index, (text, trimmable, max_tokens) in enumerate(self._parts)
+            if trimmable
+        }
+
+        budgets = {}
+        remaining = available
+        for count, index in enumerate(sorted(needs, key=lambda i: (needs[i], i))):
+            share = remaining // (len(needs) - count)
+            budgets[index] = min(needs[index], share)
+            remaining -= budgets[index]
+        return budgets
@@ -0,0 +1,10 @@
+"""
+Token counting helpers
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate (~4 characters per token for English text)"""
+    if not text:
+        return 0
+    return (len(text) + 3) // 4
@@ -0,0 +1,153 @@
+"""
+Celery worker for startup analyses
+
+Run with:
+    celery -A app.worker worker --concurrency=$JOB_WORKER_CONCURRENCY
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+import redis
+from celery import Celery
+
+from app.core.config import settings
+from app.core.exceptions import AutoGenException
+from app.services.job_queue import (
+    CANCEL_KEY_PREFIX,
+    DURATION_COUNT_KEY,
+    DURATION_TOTAL_KEY,
+    PENDING_JOBS_KEY,
+    RUNNING_KEY_PREFIX,
+    RUNNING_KEY_TTL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+celery_app = Celery("vcai", broker=settings.REDIS_URL)
+celery_app.conf.update(
+    # Acknowledge after the run so a lost worker's job is redelivered
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    # One job at a time per process keeps queue positions honest
+    worker_prefetch_multiplier=1,
+    worker_concurrency=settings.JOB_WORKER_CONCURRENCY,
+    task_ignore_result=True,
+)
+
+# Each worker process keeps one event loop and one service for all its jobs
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_service = None
+_redis: Optional[redis.Redis] = None
+
+
+def _run(coroutine):
+    global _loop
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop.run_until_complete(coroutine)
+
+
+async def _get_service():
+    global _service
+    if _service is None:
+        from app.services.specialized_autogen_service import SpecializedAutoGenService
+        from app.services.websocket_manager import manager as websocket_manager
+
+        _service = SpecializedAutoGenService()
+        await _service.store.init()
+        # Events reach browsers through the web workers subscribed to the bus
+        await websocket_manager.start()
+    return _service
+
+
+def _get_redis() -> redis.Redis:
+    global _redis
+    if _redis is None:
+        _redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _redis
+
+
+async def _cancel_when_requested(conversation_id: str, analysis: asyncio.Task):
+    """Cancel the analysis once a web worker sets its cancel key; keeps the running key alive until then"""
+    client = _get_redis()
+    key = f"{CANCEL_KEY_PREFIX}{conversation_id}"
+    running_key = f"{RUNNING_KEY_PREFIX}{conversation_id}"
+    while not analysis.done():
+        if await asyncio.to_thread(client.exists, key):
+            analysis.cancel()
+            return
+        await asyncio.to_thread(client.expire, running_key, RUNNING_KEY_TTL_SECONDS)
+        await asyncio.sleep(settings.JOB_CANCEL_POLL_SECONDS)
+
+
+async def _analyze(conversation_id: str, **kwargs):
+    service = await _get_service()
+    existing = await service.get_conversation(conversation_id)
+    if existing is not None:
+        if existing["status"] != "processing":
+            # Finished by an earlier delivery, or withdrawn before this one started
+            logger.info(f"Skipping delivery of analysis {conversation_id}: already {existing['status']}")
+            return
+        # Redelivered after the worker running it was lost: start the run over
+        logger.warning(f"Restarting analysis {conversation_id} left processing by a lost worker")
+        await service.store.delete_conversation(conversation_id)
+
+    analysis = asyncio.ensure_future(
+        service.process_startup_analysis(conversation_id=conversation_id, **kwargs)
+    )
+    watcher = asyncio.ensure_future(_cancel_when_requested(conversation_id, analysis))
+    try:
+        await analysis
+    except asyncio.CancelledError:
+        # Recorded on the conversation and broadcast by the service
+        logger.info(f"Analysis {conversation_id} cancelled")
+    finally:
+        watcher.cancel()
+
+
+@celery_app.task(name="vcai.run_startup_analysis")
+def run_startup_analysis(
+    conversation_id: str,
+    prompt: str,
+    files: Optional[List[Dict]] = None,
+    force_refresh: bool = False,
+    profile: str = settings.WORKFLOW_PROFILE,
+):
+    """Run one startup analysis to completion
+    
+    A message redelivered after its worker was lost restarts the run; one
+    delivered again while a live worker runs it, or after it finished, is dropped.
+    """
+    client = _get_redis()
+    running_key = f"{RUNNING_KEY_PREFIX}{conversation_id}"
+    # In one step, so a cancel sees the job as either waiting or running
+    pipeline = client.pipeline(transaction=True)
+    pipeline.zrem(PENDING_JOBS_KEY, conversation_id)
+    pipeline.set(running_key, 1, nx=True, ex=RUNNING_KEY_TTL_SECONDS)
+    _, acquired = pipeline.execute()
+    if not acquired:
+        logger.warning(f"Analysis {conversation_id} is already running on another worker")
+        return
+
+    started = time.perf_counter()
+    try:
+        _run(_analyze(
+            conversation_id,
+            prompt=prompt,
+            files=files,
+            force_refresh=force_refresh,
+            profile=profile,
+        ))
+    except AutoGenException as e:
+        # Already recorded on the conversation and broadcast; retrying would repeat the cost
+        logger.error(f"Analysis {conversation_id} failed: {e}")
+    finally:
+        pipeline = client.pipeline()
+        pipeline.delete(running_key)
+        pipeline.incrbyfloat(DURATION_TOTAL_KEY, time.perf_counter() - started)
+        pipeline.incr(DURATION_COUNT_KEY)
+        pipeline.execute()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Compare the thread and async LLM execution modes at high agent-call concurrency
+
+Each (mode, concurrency) pair runs in its own process against the stand-in LLM
+server and reports throughput, latency, peak RSS growth and peak thread count:
+
+    python scripts/bench_execution_modes.py --concurrency 50 200 1000 --output modes.json
+
+The executor and HTTP pool are sized to the concurrency under test, as they would
+be to serve that many calls at once. In thread mode every in-flight call also
+needs its own pooled AutoGen session, which is built before timing starts.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+MODES = ("thread", "async")
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return round(ordered[min(rank, len(ordered) - 1)], 4)
+
+
+class ProcessSampler:
+    """Samples this process's RSS and thread count on a background thread"""
+
+    def __init__(self, interval: float = 0.02):
+        import psutil
+
+        self._process = psutil.Process()
+        self._interval = interval
+        self._stop = threading.Event()
+        self.peak_rss = 0
+        self.peak_threads = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_rss = max(self.peak_rss, self._process.memory_info().rss)
+            self.peak_threads = max(self.peak_threads, self._process.num_threads())
+            self._stop.wait(self._interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+async def run_worker(args) -> Dict:
+    """One measurement; settings come from the environment set by the parent"""
+    import psutil
+
+    from app.services.agent_pool import AgentSessionPool, session_key
+    from app.services.specialized_autogen_service import SpecializedAutoGenService
+
+    setup_started = time.perf_counter()
+    service = SpecializedAutoGenService()
+    # Every call must reach the server: no AutoGen disk cache
+    service.default_llm_config["cache_seed"] = None
+    if args.mode == "thread":
+        key = session_key("marketing", service.model_router.models("marketing")[0])
+        service.session_pool = AgentSessionPool(service._create_agent_session, [key], args.concurrency)
+        service.session_pool.warm()
+    setup_seconds = time.perf_counter() - setup_started
+
+    process = psutil.Process()
+    baseline_rss = process.memory_info().rss
+    baseline_threads = process.num_threads()
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+
+    async def call(index: int):
+        started = time.perf_counter()
+        try:
+            await service._run_agent_chat("marketing", f"Startup idea {index}: {args.prompt}", "none")
+            latencies.append(time.perf_counter() - started)
+        except Exception as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+
+    with ProcessSampler() as sampler:
+        started = time.perf_counter()
+        await asyncio.gather(*[call(index) for index in range(args.concurrency * args.waves)])
+        wall = time.perf_counter() - started
+
+    return {
+        "mode": args.mode,
+        "concurrency": args.concurrency,
+        "calls": args.concurrency * args.waves,
+        "errors": errors,
+        "setup_seconds": round(setup_seconds, 3),
+        "wall_seconds": round(wall, 3),
+        "throughput_per_second": round(len(latencies) / wall, 2) if wall else 0.0,
+        "latency_seconds": {"p50": percentile(latencies, 50), "p99": percentile(latencies, 99)},
+        "baseline_rss_mb": round(baseline_rss / 2**20, 1),
+        "peak_rss_growth_mb": round(max(sampler.peak_rss - baseline_rss, 0) / 2**20, 1),
+        "baseline_threads": baseline_threads,
+        "peak_threads": sampler.peak_threads,
+    }
+
+
+def measure(mode: str, concurrency: int, base_url: str, args) -> Dict:
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY") or "sk-mock",
+        "OPENAI_BASE_URL": base_url,
+        "LLM_EXECUTION_MODE": mode,
+        "LLM_MAX_CONCURRENCY": str(concurrency),
+        "LLM_REQUESTS_PER_MINUTE": "0",
+        "LLM_TOKENS_PER_MINUTE": "0",
+        "LLM_HTTP_MAX_CONNECTIONS": str(concurrency),
+        "LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS": str(concurrency),
+        "LLM_RETRY_ATTEMPTS": "1",
+        "STREAM_AGENT_OUTPUT": str(args.stream),
+        "AGENT_POOL_SIZE": "1",
+        "PYTHONPATH": str(ROOT),
+    }
+    command = [
+        sys.executable, __file__, "--worker", "--mode", mode,
+        "--concurrency", str(concurrency), "--waves", str(args.waves),
+    ]
+    output = subprocess.run(command, env=env, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def start_mock_server(args) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [
+            sys.executable, str(ROOT / "scripts" / "mock_llm_server.py"),
+            "--port", str(args.mock_port),
+            "--ttft-p50-ms", str(args.ttft_p50_ms), "--ttft-p99-ms", str(args.ttft_p50_ms * 2),
+            "--tokens-per-second", str(args.tokens_per_second),
+            "--output-tokens", str(args.output_tokens),
+        ],
+        cwd=ROOT,
+    )
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{args.mock_port}/v1/models", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("mock LLM server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--waves", type=int, default=2, help="calls per run = concurrency * waves")
+    parser.add_argument("--base-url", default=None, help="LLM API to call; by default a mock server is started")
+    parser.add_argument("--mock-port", type=int, default=8109)
+    parser.add_argument("--ttft-p50-ms", type=float, default=1000.0)
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--output-tokens", type=int, default=50)
+    parser.add_argument("--stream", action="store_true", help="stream completions (thread mode needs tiktoken data)")
+    parser.add_argument("--output", default=None, help="write the JSON result here as well as to stdout")
+    # Internal: run one measurement in this process
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--prompt", default="an app that matches home cooks with office workers", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        args.concurrency = args.concurrency[0]
+        print(json.dumps(asyncio.run(run_worker(args))))
+        return
+
+    server = None if args.base_url else start_mock_server(args)
+    base_url = args.base_url or f"http://127.0.0.1:{args.mock_port}/v1"
+    try:
+        results = [
+            measure(mode, concurrency, base_url, args)
+            for concurrency in args.concurrency
+            for mode in args.modes
+        ]
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    text = json.dumps({"base_url": base_url, "waves": args.waves, "results": results}, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+End-to-end load benchmark: N concurrent users each POST /api/v1/chat/analyze-startup
+and follow the conversation over the WebSocket until final_report
+
+Prints a JSON result (throughput, latency percentiles, time to first event and
+token, per-phase durations, server RSS) so runs can be compared. Against the
+stand-in LLM server:
+
+    python scripts/mock_llm_server.py --port 8100
+    OPENAI_BASE_URL=http://localhost:8100/v1 OPENAI_API_KEY=sk-mock uvicorn app.main:app --port 8000
+    python scripts/bench_load.py --users 50 --ramp-seconds 10 --label baseline --output before.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+import websockets
+
+PROMPT = (
+    "A mobile app that uses AI to recommend local restaurants based on dietary preferences, "
+    "budget and location, learning each user's taste over time and integrating with delivery services."
+)
+
+# First agent output: a streamed delta, or the whole analysis when streaming is off
+AGENT_OUTPUT_TYPES = {"agent_message_delta", "specialist_analysis", "agent_message"}
+
+# Statuses the workflow broadcasts, in order; each phase runs until the next one starts
+PHASE_STATUSES = ["started", "specialist_analysis", "verification", "summary_generation", "completed"]
+
+
+@dataclass
+class RunResult:
+    """Timings of one user's analysis, in seconds from the POST"""
+    user: int
+    ok: bool = False
+    http_status: Optional[int] = None
+    error: Optional[str] = None
+    accepted: Optional[float] = None
+    first_event: Optional[float] = None
+    first_token: Optional[float] = None
+    final_report: Optional[float] = None
+    statuses: Dict[str, float] = field(default_factory=dict)
+    events: int = 0
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def describe(values: List[float]) -> Dict[str, Optional[float]]:
+    def rounded(value: Optional[float]) -> Optional[float]:
+        return round(value, 4) if value is not None else None
+
+    return {
+        "count": len(values),
+        "mean": rounded(sum(values) / len(values)) if values else None,
+        "p50": rounded(percentile(values, 50)),
+        "p95": rounded(percentile(values, 95)),
+        "p99": rounded(percentile(values, 99)),
+        "max": rounded(max(values)) if values else None,
+    }
+
+
+def phase_durations(result: RunResult) -> Dict[str, float]:
+    """Time spent in each phase: queue wait, then status to next status, then report delivery"""
+    durations = {}
+    seen = [(status, result.statuses[status]) for status in PHASE_STATUSES if status in result.statuses]
+    if result.accepted is not None and seen:
+        durations["queue"] = seen[0][1] - result.accepted
+    for (status, started), (_, ended) in zip(seen, seen[1:]):
+        durations[status] = ended - started
+    return durations
+
+
+async def run_user(
+    user: int,
+    base_url: str,
+    ws_url: str,
+    prompt: str,
+    timeout: float,
+    http: httpx.AsyncClient,
+) -> RunResult:
+    result = RunResult(user=user)
+    conversation_id = str(uuid.uuid4())
+    uri = f"{ws_url}/api/v1/ws?conversation_id={conversation_id}&last_seq=0"
+
+    try:
+        async with websockets.connect(uri, max_size=None) as websocket:
+            # Subscribe before submitting so every event is observed live
+            json.loads(await asyncio.wait_for(websocket.recv(), timeout))
+
+            started = time.perf_counter()
+            response = await http.post(
+                f"{base_url}/api/v1/chat/analyze-startup",
+                data={"prompt": prompt, "conversation_id": conversation_id},
+            )
+            result.http_status = response.status_code
+            result.accepted = time.perf_counter() - started
+            if response.status_code != 200:
+                result.error = f"HTTP {response.status_code}"
+                return result
+
+            deadline = started + timeout
+            while True:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    result.error = "timeout"
+                    return result
+                message = json.loads(await asyncio.wait_for(websocket.recv(), remaining))
+                elapsed = time.perf_counter() - started
+                message_type = message.get("type")
+                result.events += 1
+
+                if result.first_event is None:
+                    result.first_event = elapsed
+                if result.first_token is None and message_type in AGENT_OUTPUT_TYPES:
+                    result.first_token = elapsed
+
+                if message_type == "conversation_status":
+                    status = message.get("status")
+                    result.statuses.setdefault(status, elapsed)
+                    if status == "error":
+                        result.error = message.get("metadata", {}).get("message", "analysis failed")
+                        return result
+                    if status == "completed":
+                        result.ok = result.final_report is not None
+                        return result
+                elif message_type == "final_report":
+                    result.final_report = elapsed
+    except Exception as e:
+        result.error = result.error or f"{type(e).__name__}: {e}"
+    return result
+
+
+async def sample_server(http: httpx.AsyncClient, base_url: str, interval: float, samples: List[Dict], stop: asyncio.Event):
+    """Poll the detailed health endpoint for each worker's RSS until stopped"""
+    while not stop.is_set():
+        try:
+            response = await http.get(f"{base_url}/api/v1/health/detailed")
+            process = response.json().get("process") or {}
+            if process:
+                samples.append({"t": time.perf_counter(), **process})
+        except Exception:
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+def summarize_rss(samples: List[Dict]) -> Dict:
+    by_pid: Dict[int, List[int]] = {}
+    for sample in samples:
+        by_pid.setdefault(sample["pid"], []).append(sample["rss_bytes"])
+    return {
+        "samples": len(samples),
+        "workers": {
+            str(pid): {"start_mb": round(values[0] / 2**20, 1), "peak_mb": round(max(values) / 2**20, 1), "end_mb": round(values[-1] / 2**20, 1)}
+            for pid, values in by_pid.items()
+        },
+        "peak_mb": round(max((sample["rss_bytes"] for sample in samples), default=0) / 2**20, 1),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+async def run(args) -> Dict:
+    base_url = args.base_url.rstrip("/")
+    ws_url = args.ws_url or base_url.replace("http", "ws", 1)
+    limits = httpx.Limits(max_connections=args.users + 4, max_keepalive_connections=args.users + 4)
+
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as http:
+        rss_samples: List[Dict] = []
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_server(http, base_url, args.sample_interval, rss_samples, stop))
+
+        async def user(index: int) -> List[RunResult]:
+            await asyncio.sleep(index * args.ramp_seconds / max(args.users, 1))
+            results = []
+            for iteration in range(args.iterations):
+                prompt = PROMPT if args.shared_prompt else f"{PROMPT} (load test user {index} run {iteration})"
+                results.append(await run_user(index, base_url, ws_url, prompt, args.timeout, http))
+            return results
+
+        started = time.perf_counter()
+        per_user = await asyncio.gather(*[user(index) for index in range(args.users)])
+        wall = time.perf_counter() - started
+
+        stop.set()
+        await sampler
+
+    results = [result for runs in per_user for result in runs]
+    ok = [result for result in results if result.ok]
+    phases: Dict[str, List[float]] = {}
+    for result in ok:
+        for phase, duration in phase_durations(result).items():
+            phases.setdefault(phase, []).append(duration)
+
+    errors: Dict[str, int] = {}
+    for result in results:
+        if not result.ok:
+            key = result.error or "incomplete"
+            errors[key] = errors.get(key, 0) + 1
+
+    report = {
+        "label": args.label,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "host": platform.node(),
+        "config": {
+            "base_url": base_url,
+            "users": args.users,
+            "ramp_seconds": args.ramp_seconds,
+            "iterations": args.iterations,
+            "shared_prompt": args.shared_prompt,
+            "timeout": args.timeout,
+        },
+        "runs": len(results),
+        "completed": len(ok),
+        "rejected_429": sum(result.http_status == 429 for result in results),
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_per_minute": round(len(ok) / wall * 60, 2) if wall else 0.0,
+        "latency_seconds": {
+            "accepted": describe([result.accepted for result in results if result.accepted is not None]),
+            "first_event": describe([result.first_event for result in ok]),
+            "first_token": describe([result.first_token for result in ok if result.first_token is not None]),
+            "end_to_end": describe([result.final_report for result in ok]),
+        },
+        "phase_seconds": {phase: describe(values) for phase, values in phases.items()},
+        "events_per_run": describe([float(result.events) for result in ok]),
+        "server_rss": summarize_rss(rss_samples),
+    }
+    if args.include_runs:
+        report["run_details"] = [asdict(result) for result in results]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--ws-url", default=None, help="defaults to --base-url with a ws scheme")
+    parser.add_argument("--users", type=int, default=10, help="concurrent users")
+    parser.add_argument("--ramp-seconds", type=float, default=5.0, help="spread user start times over this window")
+    parser.add_argument("--iterations", type=int, default=1, help="analyses per user, run back to back")
+    parser.add_argument("--timeout", type=float, default=600.0, help="per-analysis timeout in seconds")
+    parser.add_argument("--shared-prompt", action="store_true", help="send the same idea from every user (exercises the result cache)")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="seconds between server RSS samples")
+    parser.add_argument("--label", default=None, help="name for this run in the JSON output")
+    parser.add_argument("--output", default=None, help="write the JSON result here as well as to stdout")
+    parser.add_argument("--include-runs", action="store_true", help="include per-run timings")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
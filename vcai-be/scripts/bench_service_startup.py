@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request overhead of building SpecializedAutoGenService per request
+versus resolving the application-scoped instance built in the lifespan hook
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# Agents refuse to build without a key; no request leaves the process in this benchmark
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.services.specialized_autogen_service import SpecializedAutoGenService  # noqa: E402
+
+
+def _summarize(label: str, samples_ms: list) -> None:
+    samples_ms = sorted(samples_ms)
+    p95 = samples_ms[int(len(samples_ms) * 0.95) - 1]
+    print(
+        f"{label:<40} mean={statistics.mean(samples_ms):8.3f} ms  "
+        f"p50={statistics.median(samples_ms):8.3f} ms  p95={p95:8.3f} ms"
+    )
+
+
+def bench_construction(iterations: int) -> list:
+    """Old behaviour: every handler built its own service"""
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        SpecializedAutoGenService()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def bench_status_endpoint(client: TestClient, iterations: int, per_request_service: bool) -> list:
+    """Round-trip the status endpoint, optionally paying the old construction cost"""
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        if per_request_service:
+            SpecializedAutoGenService()
+        client.get("/api/v1/chat/conversations/benchmark/status")
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    # Pay import and first-construction costs outside the measurement
+    SpecializedAutoGenService()
+
+    _summarize("service construction", bench_construction(args.iterations))
+
+    with TestClient(app, base_url="http://localhost") as client:
+        before = bench_status_endpoint(client, args.iterations, per_request_service=True)
+        after = bench_status_endpoint(client, args.iterations, per_request_service=False)
+
+    _summarize("status request (service per request)", before)
+    _summarize("status request (lifespan service)", after)
+    print(f"speedup: {statistics.mean(before) / statistics.mean(after):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
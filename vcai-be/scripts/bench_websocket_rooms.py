@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark ConnectionManager room bookkeeping with many connections and rooms,
+against the previous list-based rooms with a full scan on disconnect
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.services.websocket_manager import ConnectionManager  # noqa: E402
+
+
+class NullWebSocket:
+    """Accepts and discards every frame"""
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        pass
+
+    async def close(self, code: int = 1000, reason: str = None):
+        pass
+
+
+class ListRooms:
+    """The room bookkeeping ConnectionManager used before the reverse index"""
+
+    def __init__(self):
+        self.conversation_connections: Dict[str, List[str]] = {}
+
+    def join_conversation(self, client_id: str, conversation_id: str):
+        if conversation_id not in self.conversation_connections:
+            self.conversation_connections[conversation_id] = []
+        if client_id not in self.conversation_connections[conversation_id]:
+            self.conversation_connections[conversation_id].append(client_id)
+
+    def disconnect(self, client_id: str):
+        for conversation_id, clients in self.conversation_connections.items():
+            if client_id in clients:
+                clients.remove(client_id)
+                if not clients:
+                    del self.conversation_connections[conversation_id]
+                break
+
+
+def _timed(label: str, count: int, func) -> None:
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<42} total={elapsed * 1000:9.1f} ms  per op={elapsed / count * 1e6:8.2f} us")
+
+
+def _memberships(connections: int, rooms: int, rooms_per_client: int, seed: int):
+    rng = random.Random(seed)
+    return {
+        f"client-{i}": rng.sample([f"room-{r}" for r in range(rooms)], rooms_per_client)
+        for i in range(connections)
+    }
+
+
+def bench_list_rooms(memberships) -> None:
+    rooms = ListRooms()
+
+    def join():
+        for client_id, conversation_ids in memberships.items():
+            for conversation_id in conversation_ids:
+                rooms.join_conversation(client_id, conversation_id)
+
+    def disconnect():
+        for client_id in memberships:
+            rooms.disconnect(client_id)
+
+    joins = sum(len(conversation_ids) for conversation_ids in memberships.values())
+    _timed("lists: join", joins, join)
+    _timed("lists: disconnect", len(memberships), disconnect)
+    leaked = sum(len(clients) for clients in rooms.conversation_connections.values())
+    print(f"{'lists: memberships leaked':<42} {leaked}")
+
+
+async def bench_connection_manager(memberships) -> None:
+    manager = ConnectionManager()
+    for client_id in memberships:
+        await manager.connect(NullWebSocket(), client_id)
+
+    def join():
+        for client_id, conversation_ids in memberships.items():
+            for conversation_id in conversation_ids:
+                manager.join_conversation(client_id, conversation_id)
+
+    joins = sum(len(conversation_ids) for conversation_ids in memberships.values())
+    _timed("sets: join", joins, join)
+
+    rooms = list(manager.conversation_connections)
+    started = time.perf_counter()
+    for conversation_id in rooms:
+        await manager.broadcast_conversation_status(conversation_id, "benchmark")
+    elapsed = time.perf_counter() - started
+    print(f"{'sets: broadcast to every room':<42} total={elapsed * 1000:9.1f} ms  "
+          f"per room={elapsed / len(rooms) * 1e6:8.2f} us")
+
+    # Let writers drain before tearing down
+    while manager.stats()["queued_frames"]:
+        await asyncio.sleep(0)
+
+    _timed("sets: disconnect", len(memberships), lambda: [
+        manager.disconnect(client_id) for client_id in memberships
+    ])
+    leaked = sum(len(clients) for clients in manager.conversation_connections.values())
+    print(f"{'sets: memberships leaked':<42} {leaked}")
+    await asyncio.sleep(0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--connections", type=int, default=10_000)
+    parser.add_argument("--rooms", type=int, default=1_000)
+    parser.add_argument("--rooms-per-client", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    memberships = _memberships(args.connections, args.rooms, args.rooms_per_client, args.seed)
+    print(f"{args.connections} connections, {args.rooms} rooms, "
+          f"{args.rooms_per_client} rooms per client")
+
+    bench_list_rooms(memberships)
+    asyncio.run(bench_connection_manager(memberships))
+
+
+if __name__ == "__main__":
+    main()
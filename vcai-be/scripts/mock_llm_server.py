@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+OpenAI-compatible stand-in chat completions server for load tests and offline runs
+
+Replies are deterministic and derived from the prompt; latency and failures are
+drawn from configurable distributions. Point the backend at it with:
+
+    python scripts/mock_llm_server.py --port 8100 --ttft-p50-ms 400 --tokens-per-second 60
+    OPENAI_BASE_URL=http://localhost:8100/v1 OPENAI_API_KEY=sk-mock python scripts/start_dev.py
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass, fields
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+WORDS = (
+    "market customers growth pricing channel revenue product platform feature roadmap "
+    "compliance privacy license risk team traction demand retention margin partners "
+    "launch pilot scale data model users segment strategy validation timeline budget"
+).split()
+
+# z-score of the 99th percentile, used to fit a lognormal to p50/p99
+Z_99 = 2.326
+
+
+@dataclass
+class MockLLMConfig:
+    """Latency, failure and output size knobs for the stand-in server"""
+    ttft_p50_ms: float = 300.0
+    ttft_p99_ms: float = 1500.0
+    tokens_per_second: float = 50.0
+    output_tokens: int = 300
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    retry_after_seconds: int = 1
+    seed: Optional[int] = None
+
+
+def lognormal_ms(rng: random.Random, p50: float, p99: float) -> float:
+    """Sample a latency whose median and 99th percentile match p50 and p99"""
+    if p50 <= 0:
+        return 0.0
+    sigma = math.log(max(p99, p50) / p50) / Z_99
+    return rng.lognormvariate(math.log(p50), sigma)
+
+
+def prompt_seed(messages: List[Dict[str, Any]]) -> int:
+    """Stable seed derived from the conversation so identical prompts get identical replies"""
+    digest = hashlib.sha256(json.dumps(messages, sort_keys=True).encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def wants_json(body: Dict[str, Any]) -> bool:
+    response_format = body.get("response_format") or {}
+    return response_format.get("type") in ("json_object", "json_schema")
+
+
+def generate_reply(body: Dict[str, Any], output_tokens: int) -> str:
+    """Deterministic reply of about output_tokens tokens (one word each)"""
+    messages = body.get("messages") or []
+    rng = random.Random(prompt_seed(messages))
+    words = [rng.choice(WORDS) for _ in range(max(output_tokens, 1))]
+
+    if not wants_json(body):
+        lines = [" ".join(words[start:start + 12]).capitalize() + "." for start in range(0, len(words), 12)]
+        return "\n".join(lines)
+
+    # Shaped like the summary report so downstream parsing works against the mock
+    def items(count: int) -> List[str]:
+        return [" ".join(rng.choice(WORDS) for _ in range(6)).capitalize() for _ in range(count)]
+
+    return json.dumps({
+        "overall_score": rng.randint(40, 95),
+        "metrics": {area: rng.randint(40, 95) for area in ("marketing_score", "product_score", "legal_score")},
+        "recommendation": rng.choice(["HIGH_POTENTIAL", "MODERATE_POTENTIAL", "LOW_POTENTIAL"]),
+        "summary": " ".join(words),
+        "key_strengths": items(3),
+        "critical_risks": items(3),
+        "recommendations": items(3),
+        "next_steps": items(3),
+    })
+
+
+def split_tokens(text: str) -> List[str]:
+    """Split a reply into word-sized stream chunks that join back to the original text"""
+    chunks: List[str] = []
+    start = 0
+    for index, char in enumerate(text):
+        if char in " \n" and index > start:
+            chunks.append(text[start:index])
+            start = index
+    chunks.append(text[start:])
+    return [chunk for chunk in chunks if chunk]
+
+
+def usage(body: Dict[str, Any], reply: str) -> Dict[str, int]:
+    prompt_tokens = sum(len(str(message.get("content") or "")) for message in body.get("messages") or []) // 4
+    completion_tokens = len(split_tokens(reply))
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def create_app(config: MockLLMConfig) -> FastAPI:
+    app = FastAPI(title="Mock OpenAI chat completions")
+    rng = random.Random(config.seed)
+    app.state.config = config
+    app.state.requests = 0
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "vcai"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+
+        roll = rng.random()
+        if roll < config.rate_429:
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached (injected)", "type": "rate_limit_error", "code": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"Retry-After": str(config.retry_after_seconds)},
+            )
+        if roll < config.rate_429 + config.rate_5xx:
+            status_code = rng.choice([500, 502, 503])
+            return JSONResponse(
+                {"error": {"message": "Upstream failure (injected)", "type": "server_error", "code": None}},
+                status_code=status_code,
+            )
+
+        reply = generate_reply(body, config.output_tokens)
+        ttft = lognormal_ms(rng, config.ttft_p50_ms, config.ttft_p99_ms) / 1000
+        token_delay = 1 / config.tokens_per_second if config.tokens_per_second > 0 else 0.0
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        model = body.get("model", "mock")
+        created = int(time.time())
+
+        if not body.get("stream"):
+            await asyncio.sleep(ttft + token_delay * len(split_tokens(reply)))
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": reply},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage(body, reply),
+            }
+
+        async def events() -> AsyncIterator[str]:
+            def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+                payload = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                }
+                return f"data: {json.dumps(payload)}\n\n"
+
+            await asyncio.sleep(ttft)
+            yield chunk({"role": "assistant", "content": ""})
+            for token in split_tokens(reply):
+                yield chunk({"content": token})
+                await asyncio.sleep(token_delay)
+            yield chunk({}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    defaults = MockLLMConfig()
+    for field in fields(MockLLMConfig):
+        parser.add_argument(
+            f"--{field.name.replace('_', '-')}",
+            type=int if field.name == "seed" else type(getattr(defaults, field.name)),
+            default=getattr(defaults, field.name),
+        )
+    args = parser.parse_args()
+
+    config = MockLLMConfig(**{field.name: getattr(args, field.name) for field in fields(MockLLMConfig)})
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
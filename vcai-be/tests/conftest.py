@@ -0,0 +1,11 @@
+"""
+Shared test configuration
+"""
+
+import os
+import tempfile
+
+# Agents refuse to build without an API key; tests never reach OpenAI
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("AGENT_POOL_SIZE", "1")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/vcai-test.db")
@@ -0,0 +1,133 @@
+"""
+Unit tests for the agent session pool
+"""
+
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.services.agent_pool import AgentSession, AgentSessionPool, parse_session_key, session_key
+
+
+class FakeAgent:
+    def __init__(self):
+        self.resets = 0
+
+    def reset(self):
+        self.resets += 1
+
+
+def make_session(key: str) -> AgentSession:
+    agent_type, model = parse_session_key(key)
+    return AgentSession(agent_type, FakeAgent(), FakeAgent(), model)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_checkouts_get_isolated_sessions():
+    """Test that concurrent chats never share a session"""
+    pool = AgentSessionPool(make_session, ["marketing"], size=2)
+    pool.warm()
+
+    first = await pool.checkout("marketing")
+    second = await pool.checkout("marketing")
+
+    assert first is not second
+    assert first.user_proxy is not second.user_proxy
+
+
+@pytest.mark.asyncio
+async def test_checkout_waits_when_pool_exhausted_and_resets_on_return():
+    """Test that checkout blocks at the size limit and checkin resets the session"""
+    pool = AgentSessionPool(make_session, ["verifier"], size=1)
+    session = await pool.checkout("verifier")
+
+    waiter = asyncio.create_task(pool.checkout("verifier"))
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+    assert pool.stats()["waiting"] == 1
+
+    pool.checkin(session)
+    reused = await asyncio.wait_for(waiter, timeout=1)
+
+    assert reused is session
+    assert session.user_proxy.resets == 1
+    assert session.agent.resets == 1
+    assert pool.stats()["checkouts"] == 2
+    assert pool.stats()["max_wait_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_pooled_per_model():
+    """Test that an agent's models have separate sessions and only the warmed ones are prebuilt"""
+    preferred, fallback = session_key("verifier", "gpt-4o-mini"), session_key("verifier", "ft:gpt-4o:org:v1")
+    pool = AgentSessionPool(make_session, [preferred, fallback], size=1)
+    pool.warm([preferred])
+
+    assert pool.stats()["created"] == {preferred: 1, fallback: 0}
+
+    session = await pool.checkout(fallback)
+    assert (session.agent_type, session.model) == ("verifier", "ft:gpt-4o:org:v1")
+    pool.checkin(session)
+    assert await pool.checkout(fallback) is session
+
+
+@pytest.mark.asyncio
+async def test_waiter_gets_a_new_session_when_a_returned_one_fails_to_reset():
+    """Test that a session dropped at checkin frees its slot for a coroutine already waiting"""
+    pool = AgentSessionPool(make_session, ["legal"], size=1)
+    broken = await pool.checkout("legal")
+    waiter = asyncio.create_task(pool.checkout("legal"))
+    await asyncio.sleep(0.01)
+
+    def fail():
+        raise RuntimeError("reset failed")
+
+    broken.agent.reset = fail
+    pool.checkin(broken)
+    replacement = await asyncio.wait_for(waiter, timeout=1)
+
+    assert replacement is not broken
+    assert pool.stats()["created"] == {"legal": 1}
+
+
+@pytest.mark.asyncio
+async def test_waiter_is_served_when_a_cancelled_chat_discards_its_session():
+    """Test that discarding the only session of a full pool does not strand the next waiter"""
+    pool = AgentSessionPool(make_session, ["marketing"], size=1)
+    chat_started = asyncio.Event()
+
+    async def chat():
+        async with pool.session("marketing"):
+            chat_started.set()
+            await asyncio.sleep(10)
+
+    running = asyncio.create_task(chat())
+    await chat_started.wait()
+    waiter = asyncio.create_task(pool.checkout("marketing"))
+    await asyncio.sleep(0.01)
+
+    running.cancel()
+    session = await asyncio.wait_for(waiter, timeout=1)
+
+    assert session.agent_type == "marketing"
+    assert pool.stats()["created"] == {"marketing": 1}
+    assert pool.stats()["in_use"] == {"marketing": 1}
+
+
+@pytest.mark.asyncio
+async def test_checkout_wait_is_exported_to_prometheus():
+    """Test that every checkout's wait lands in the pool wait histogram by agent type"""
+    labels = {"agent_type": "pool_metrics"}
+    sample = lambda name: REGISTRY.get_sample_value(f"vcai_agent_pool_wait_seconds_{name}", labels) or 0.0
+    count, total = sample("count"), sample("sum")
+    pool = AgentSessionPool(make_session, [session_key("pool_metrics", "gpt-4o-mini")], size=1)
+    session = await pool.checkout("pool_metrics:gpt-4o-mini")
+
+    waiter = asyncio.create_task(pool.checkout("pool_metrics:gpt-4o-mini"))
+    await asyncio.sleep(0.01)
+    pool.checkin(session)
+    await asyncio.wait_for(waiter, timeout=1)
+
+    assert sample("count") == count + 2
+    assert sample("sum") - total > 0.005
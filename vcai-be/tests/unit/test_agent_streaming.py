@@ -0,0 +1,53 @@
+"""
+Unit tests for agent output streaming
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.agent_streaming import AgentMessageStreamer, DeltaIOStream
+from app.services.websocket_manager import manager
+
+
+@pytest.fixture
+def events(monkeypatch):
+    captured = []
+
+    async def capture(message, conversation_id):
+        captured.append(message)
+
+    monkeypatch.setattr(manager, "broadcast_to_conversation", capture)
+    return captured
+
+
+def test_iostream_forwards_only_streamed_text():
+    """Test that terminal colour codes and decoration prints are dropped"""
+    deltas = []
+    stream = DeltaIOStream(deltas.append)
+
+    stream.print("\033[32m", end="")
+    stream.print("Hello", end="", flush=True)
+    stream.print(" world", end="", flush=True)
+    stream.print("\033[0m\n")
+
+    assert deltas == ["Hello", " world"]
+
+
+@pytest.mark.asyncio
+async def test_streamer_coalesces_deltas_into_sequenced_frames(events):
+    """Test that small deltas are merged and every frame carries the next delta index"""
+    streamer = AgentMessageStreamer("conv-1", "marketing", {"message_type": "specialist_analysis"}, 0.02)
+
+    for word in ["Market ", "size ", "is "]:
+        streamer.feed(word)
+    await asyncio.sleep(0.05)
+    streamer.feed_threadsafe("large.")
+    await asyncio.sleep(0)
+    await streamer.aclose()
+
+    assert [event["delta_index"] for event in events] == [0, 1]
+    assert events[0]["delta"] == "Market size is "
+    assert "".join(event["delta"] for event in events) == "Market size is large."
+    assert all(event["type"] == "agent_message_delta" for event in events)
+    assert events[0]["metadata"]["message_type"] == "specialist_analysis"
@@ -0,0 +1,182 @@
+"""
+Unit tests for chat endpoints
+"""
+
+import asyncio
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.services.job_queue import InProcessJobQueue
+
+
+def test_service_is_shared_across_requests():
+    """Test that the lifespan service backs every chat endpoint"""
+    with TestClient(app, base_url="http://localhost") as client:
+        service = app.state.autogen_service
+        client.portal.call(service.store.create_conversation, "conv-1", "An idea")
+
+        response = client.get("/api/v1/chat/conversations/conv-1/status")
+        assert response.status_code == 200
+        assert response.json()["status"] == "processing"
+        assert app.state.autogen_service is service
+
+
+def test_unknown_conversation_returns_404():
+    """Test that a missing conversation is reported as not found"""
+    with TestClient(app, base_url="http://localhost") as client:
+        response = client.get("/api/v1/chat/conversations/missing/status")
+        assert response.status_code == 404
+
+
+def test_invalid_cursor_returns_400():
+    """Test that a malformed pagination cursor is rejected"""
+    with TestClient(app, base_url="http://localhost") as client:
+        response = client.get("/api/v1/chat/conversations", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
+
+def test_offset_pagination_returns_400():
+    """Test that the removed offset parameter is rejected instead of ignored"""
+    with TestClient(app, base_url="http://localhost") as client:
+        response = client.get("/api/v1/chat/conversations", params={"offset": 10})
+        assert response.status_code == 400
+        assert "cursor" in response.json()["message"]
+
+
+def test_known_conversation_id_returns_409():
+    """Test that an analysis cannot be queued under an existing conversation's ID"""
+    with TestClient(app, base_url="http://localhost") as client:
+        service = app.state.autogen_service
+        client.portal.call(service.store.create_conversation, "dup-1", "An idea")
+
+        response = client.post(
+            "/api/v1/chat/analyze-startup", data={"prompt": "Another idea", "conversation_id": "dup-1"}
+        )
+        assert response.status_code == 409
+        assert client.portal.call(app.state.job_queue.position, "dup-1") is None
+
+        status = client.get("/api/v1/chat/conversations/dup-1/status")
+        assert status.json()["status"] == "processing"
+
+
+def test_full_queue_returns_429_with_retry_after():
+    """Test that submissions beyond the queue limit are rejected with Retry-After"""
+    with TestClient(app, base_url="http://localhost") as client:
+        release = asyncio.Event()
+
+        async def runner(job):
+            await release.wait()
+
+        queue = InProcessJobQueue(runner, concurrency=1, max_length=1)
+        client.portal.call(queue.start)
+        app.state.job_queue = queue
+
+        responses = [
+            client.post("/api/v1/chat/analyze-startup", data={"prompt": f"idea {i}"})
+            for i in range(3)
+        ]
+
+        assert [response.status_code for response in responses] == [200, 200, 429]
+        assert int(responses[2].headers["Retry-After"]) >= 1
+
+        waiting = responses[1].json()
+        assert waiting["queue_position"] == 0
+        status = client.get(f"/api/v1/chat/conversations/{waiting['conversation_id']}/status")
+        assert status.json()["status"] == "queued"
+
+        client.portal.call(release.set)
+        client.portal.call(queue.close)
+
+
+def test_metrics_endpoint_exposes_prometheus_text():
+    """Test that /metrics serves the workflow metrics in the exposition format"""
+    with TestClient(app, base_url="http://localhost") as client:
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE vcai_analysis_phase_seconds histogram" in response.text
+    assert "# TYPE vcai_llm_queue_wait_seconds histogram" in response.text
+
+
+def test_unknown_profile_returns_400():
+    """Test that only the known workflow profiles are accepted"""
+    with TestClient(app, base_url="http://localhost") as client:
+        response = client.post(
+            "/api/v1/chat/analyze-startup", data={"prompt": "An idea", "profile": "turbo"}
+        )
+
+    assert response.status_code == 400
+    assert "fast" in response.json()["message"]
+
+
+def test_delete_cancels_a_queued_analysis():
+    """Test that DELETE withdraws a waiting analysis and 404s for unknown ones"""
+    with TestClient(app, base_url="http://localhost") as client:
+        release = asyncio.Event()
+
+        async def runner(job):
+            await release.wait()
+
+        queue = InProcessJobQueue(runner, concurrency=1, max_length=5)
+        client.portal.call(queue.start)
+        app.state.job_queue = queue
+
+        client.post("/api/v1/chat/analyze-startup", data={"prompt": "idea 1"})
+        waiting = client.post("/api/v1/chat/analyze-startup", data={"prompt": "idea 2"}).json()
+
+        response = client.delete(f"/api/v1/chat/conversations/{waiting['conversation_id']}")
+        assert response.status_code == 200
+        assert response.json()["status"] == "cancelled"
+        assert client.portal.call(queue.position, waiting["conversation_id"]) is None
+        status = client.get(f"/api/v1/chat/conversations/{waiting['conversation_id']}/status")
+        assert status.status_code == 200
+        assert status.json()["status"] == "cancelled"
+        assert client.delete(f"/api/v1/chat/conversations/{waiting['conversation_id']}").status_code == 409
+
+        assert client.delete("/api/v1/chat/conversations/missing").status_code == 404
+
+        client.portal.call(release.set)
+        client.portal.call(queue.close)
+
+
+def test_uploads_stay_under_upload_dir_and_are_removed_on_rejection(tmp_path, monkeypatch):
+    """Test that a path-like conversation_id can't place uploads and a rejected submission leaves none"""
+    upload_root = tmp_path / "uploads"
+    escaped = tmp_path / "escaped"
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(upload_root))
+    monkeypatch.setattr(settings, "UPLOAD_MAX_BYTES", 16)
+    with TestClient(app, base_url="http://localhost") as client:
+        jobs = []
+
+        async def runner(job):
+            jobs.append(job)
+
+        queue = InProcessJobQueue(runner, concurrency=1, max_length=10)
+        client.portal.call(queue.start)
+        app.state.job_queue = queue
+
+        response = client.post(
+            "/api/v1/chat/analyze-startup",
+            data={"prompt": "idea", "conversation_id": str(escaped)},
+            files={"files": ("deck.txt", b"small deck", "text/plain")},
+        )
+        assert response.status_code == 200
+        client.portal.call(queue.close)
+        saved = Path(jobs[0]["files"][0]["path"])
+        assert saved.parent.parent == upload_root
+        assert not escaped.exists()
+
+        rejected = client.post(
+            "/api/v1/chat/analyze-startup",
+            data={"prompt": "idea"},
+            files=[
+                ("files", ("first.txt", b"fits", "text/plain")),
+                ("files", ("huge.txt", b"x" * 64, "text/plain")),
+            ],
+        )
+        assert rejected.status_code == 413
+        assert [path for path in upload_root.iterdir() if path != saved.parent] == []
@@ -0,0 +1,93 @@
+"""
+Unit tests for the conversation store
+"""
+
+import pytest
+import pytest_asyncio
+
+from app.core.exceptions import ValidationException
+from app.db.session import get_async_database_url
+from app.services.conversation_store import ConversationStore
+
+
+@pytest_asyncio.fixture
+async def store(tmp_path):
+    store = ConversationStore(f"sqlite:///{tmp_path}/vcai.db", flush_interval=60, batch_size=3)
+    await store.init()
+    yield store
+    await store.close()
+
+
+def test_database_urls_use_async_drivers():
+    """Test that configured URLs are mapped to async drivers"""
+    assert get_async_database_url("sqlite:///./vcai.db") == "sqlite+aiosqlite:///./vcai.db"
+    assert get_async_database_url("postgresql://u:p@db:5432/vcai") == "postgresql+asyncpg://u:p@db:5432/vcai"
+    assert get_async_database_url("postgresql+psycopg2://u:p@db/vcai") == "postgresql+asyncpg://u:p@db/vcai"
+
+
+@pytest.mark.asyncio
+async def test_phase_results_are_buffered_until_flush(store):
+    """Test that phase results are written in batches"""
+    await store.create_conversation("conv-1", "An idea")
+    store.record_phase_result("conv-1", "specialist_analysis", "marketing", {"text": "m"})
+
+    assert len(store._pending_phase_results) == 1
+
+    conversation = await store.get_conversation("conv-1")
+
+    assert store._pending_phase_results == []
+    assert conversation["specialist_results"] == {"marketing": "m"}
+
+
+@pytest.mark.asyncio
+async def test_list_conversations_newest_first(store):
+    """Test that listing returns the newest conversations first"""
+    for conversation_id in ["a", "b", "c"]:
+        await store.create_conversation(conversation_id, f"idea {conversation_id}")
+    await store.complete_conversation("b", {"overall_score": 80})
+
+    listing = await store.list_conversations(limit=2)
+
+    assert [conversation["id"] for conversation in listing["conversations"]] == ["c", "b"]
+    assert listing["conversations"][1]["status"] == "completed"
+    assert listing["conversations"][1]["overall_score"] == 80
+
+    next_page = await store.list_conversations(limit=2, cursor=listing["next_cursor"])
+
+    assert [conversation["id"] for conversation in next_page["conversations"]] == ["a"]
+    assert next_page["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_list_conversations_projects_fields(store):
+    """Test that only the requested fields are returned"""
+    await store.create_conversation("a", "idea a")
+
+    listing = await store.list_conversations(fields="status")
+
+    assert listing["conversations"] == [{"id": "a", "status": "processing"}]
+
+    with pytest.raises(ValidationException):
+        await store.list_conversations(fields="password")
+
+
+@pytest.mark.asyncio
+async def test_close_waits_for_background_flushes(tmp_path):
+    """Test that flushes started by a full batch are tracked and finished before close returns"""
+    url = f"sqlite:///{tmp_path}/vcai.db"
+    store = ConversationStore(url, flush_interval=60, batch_size=3)
+    await store.init()
+    await store.create_conversation("conv-1", "An idea")
+    for agent_type in ["marketing", "product", "legal"]:
+        store.record_phase_result("conv-1", "specialist_analysis", agent_type, {"text": agent_type})
+
+    # The delayed flush and the full-batch flush
+    assert len(store._background_flushes) == 2
+
+    await store.close()
+
+    assert store._background_flushes == set()
+    reopened = ConversationStore(url)
+    conversation = await reopened.get_conversation("conv-1")
+    await reopened.close()
+    assert set(conversation["specialist_results"]) == {"marketing", "product", "legal"}
@@ -0,0 +1,58 @@
+"""
+Unit tests for the conversation event log
+"""
+
+from app.services.event_log import ConversationEventLog
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_replay_after_sequence():
+    """Test that replay returns only events newer than last_seq"""
+    log = ConversationEventLog(max_events=10, max_bytes=1024, ttl_seconds=60)
+    for _ in range(3):
+        seq = log.next_seq("conv-1")
+        log.append("conv-1", seq, f"event {seq}")
+
+    assert log.replay("conv-1", 0) == (["event 1", "event 2", "event 3"], 1)
+    assert log.replay("conv-1", 2) == (["event 3"], 1)
+    assert log.replay("missing", 0) == ([], None)
+
+
+def test_caps_evict_oldest_events():
+    """Test the per-conversation event cap and the total byte cap"""
+    log = ConversationEventLog(max_events=2, max_bytes=10, ttl_seconds=60)
+    for seq in range(1, 4):
+        log.append("conv-1", seq, f"a{seq}")
+
+    assert log.replay("conv-1", 0) == (["a2", "a3"], 2)
+
+    for seq in range(1, 5):
+        log.append("conv-2", seq, f"bbb{seq}")
+
+    # conv-1 was least recently active, so it is trimmed away first
+    assert log.replay("conv-1", 0) == (["a3"], 3)
+    assert log.replay("conv-2", 0) == (["bbb3", "bbb4"], 3)
+    assert log.stats()["bytes"] == 10
+
+
+def test_log_is_freed_after_completion_ttl():
+    """Test that a completed conversation's log expires"""
+    clock = FakeClock()
+    log = ConversationEventLog(max_events=10, max_bytes=1024, ttl_seconds=60, clock=clock)
+    log.append("conv-1", log.next_seq("conv-1"), "started")
+    log.append("conv-1", log.next_seq("conv-1"), "completed", final=True)
+
+    clock.now = 59
+    assert len(log.replay("conv-1", 0)[0]) == 2
+
+    clock.now = 61
+    assert log.replay("conv-1", 0) == ([], None)
+    assert log.stats()["conversations"] == 0
+    assert log.next_seq("conv-1") == 1
@@ -0,0 +1,117 @@
+"""
+Unit tests for upload ingestion
+"""
+
+import io
+from pathlib import Path
+
+import pytest
+from starlette.datastructures import Headers, UploadFile
+
+from app.core.config import settings
+from app.core.exceptions import ValidationException
+from app.services import file_ingestion
+from app.services.file_ingestion import extract_chunks, extract_documents, save_upload, select_excerpts
+
+
+def make_upload(data: bytes, filename: str = "deck.txt", content_type: str = "text/plain") -> UploadFile:
+    return UploadFile(
+        io.BytesIO(data), filename=filename, headers=Headers({"content-type": content_type})
+    )
+
+
+@pytest.mark.asyncio
+async def test_save_upload_streams_to_disk_and_hashes(tmp_path, monkeypatch):
+    """Test that uploads are written in chunks with their size and digest"""
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_BYTES", 4)
+    data = b"market sizing and pricing"
+
+    info = await save_upload(make_upload(data, filename="../../deck.txt"), tmp_path)
+
+    assert info["name"] == "deck.txt"
+    assert info["size"] == len(data)
+    assert info["type"] == "text/plain"
+    assert len(info["sha256"]) == 64
+    saved = Path(info["path"])
+    assert saved.parent == tmp_path
+    assert saved.read_bytes() == data
+
+
+@pytest.mark.asyncio
+async def test_save_upload_rejects_oversized_files(tmp_path, monkeypatch):
+    """Test that the size cap stops the stream and removes the partial file"""
+    monkeypatch.setattr(settings, "UPLOAD_MAX_BYTES", 10)
+
+    with pytest.raises(ValidationException):
+        await save_upload(make_upload(b"x" * 64), tmp_path)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_extract_chunks_splits_on_paragraphs(tmp_path):
+    """Test that paragraphs are packed into chunks no larger than the budget"""
+    path = tmp_path / "notes.txt"
+    path.write_text("first paragraph\n\nsecond paragraph\n\n" + "y" * 50)
+
+    chunks = extract_chunks(str(path), "text/plain", chunk_tokens=10, max_chars=10_000)
+
+    assert chunks[0] == "first paragraph\nsecond paragraph"
+    assert all(len(chunk) <= 40 for chunk in chunks)
+    assert "".join(chunks[1:]) == "y" * 50
+
+
+def test_extract_chunks_skips_binary_files(tmp_path):
+    """Test that unsupported types yield no text"""
+    path = tmp_path / "logo.png"
+    path.write_bytes(b"\x89PNG")
+
+    assert extract_chunks(str(path), "image/png", chunk_tokens=10, max_chars=10_000) == []
+
+
+def test_select_excerpts_ranks_per_agent_within_budget():
+    """Test that each specialist gets its most relevant chunks in document order"""
+    chunks = [
+        {"file": "deck.txt", "index": 0, "text": "Our team met at university."},
+        {"file": "deck.txt", "index": 1, "text": "GDPR compliance and privacy regulation for user data."},
+        {"file": "deck.txt", "index": 2, "text": "Pricing targets a growing market of small customers."},
+        {"file": "deck.txt", "index": 3, "text": "Competitors lack our pricing and sales channel reach."},
+    ]
+
+    marketing = select_excerpts(chunks, "marketing", "a bakery app", token_budget=30)
+    legal = select_excerpts(chunks, "legal", "a bakery app", token_budget=15)
+
+    assert [chunk["index"] for chunk in marketing] == [2, 3]
+    assert [chunk["index"] for chunk in legal] == [1]
+
+
+@pytest.mark.asyncio
+async def test_extract_documents_runs_in_process_pool(tmp_path):
+    """Test that stored files are chunked by the worker processes"""
+    path = tmp_path / "deck.md"
+    path.write_text("# Deck\n\nPricing and market")
+
+    try:
+        chunks = await extract_documents([
+            {"name": "deck.md", "type": "text/markdown", "path": str(path)},
+            {"name": "inline.txt", "type": "text/plain"},
+        ])
+    finally:
+        file_ingestion.shutdown_pool()
+
+    assert chunks == [{"file": "deck.md", "index": 0, "text": "# Deck\nPricing and market"}]
+
+
+@pytest.mark.asyncio
+async def test_uploads_are_removed_only_inside_the_upload_dir(tmp_path, monkeypatch):
+    """Test that cleanup deletes a run's directory and never touches paths outside UPLOAD_DIR"""
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    directory = file_ingestion.new_upload_dir()
+    info = await save_upload(make_upload(b"deck"), directory)
+    outside = tmp_path / "elsewhere"
+    outside.mkdir()
+    (outside / "keep.txt").write_text("keep")
+
+    await file_ingestion.remove_uploads([info, {"name": "keep.txt", "path": str(outside / "keep.txt")}])
+
+    assert not directory.exists()
+    assert (outside / "keep.txt").exists()
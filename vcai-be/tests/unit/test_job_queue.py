@@ -0,0 +1,137 @@
+"""
+Unit tests for the in-process job queue
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.exceptions import ConflictException, QueueFullException
+from app.services.job_queue import InProcessJobQueue, JobQueue
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_and_positions():
+    """Test that at most `concurrency` jobs run and waiting jobs report their position"""
+    release = asyncio.Event()
+    running = []
+
+    async def runner(job):
+        running.append(job["id"])
+        await release.wait()
+
+    queue = InProcessJobQueue(runner, concurrency=2, max_length=5)
+    await queue.start()
+    try:
+        for job_id in ["a", "b", "c", "d"]:
+            await queue.submit(job_id, {"id": job_id})
+        await asyncio.sleep(0.01)
+
+        assert running == ["a", "b"]
+        assert await queue.position("c") == 0
+        assert await queue.position("d") == 1
+        assert await queue.position("a") is None
+
+        release.set()
+        await asyncio.sleep(0.01)
+        stats = await queue.stats()
+        assert stats["completed"] == 4
+        assert stats["queued"] == 0
+    finally:
+        await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_with_retry_after():
+    """Test admission control once max_length jobs are waiting"""
+    release = asyncio.Event()
+
+    async def runner(job):
+        await release.wait()
+
+    queue = InProcessJobQueue(runner, concurrency=1, max_length=1)
+    await queue.start()
+    try:
+        await queue.submit("running", {})
+        await asyncio.sleep(0.01)
+        ticket = await queue.submit("waiting", {})
+        assert ticket.position == 0
+
+        with pytest.raises(QueueFullException) as error:
+            await queue.submit("rejected", {})
+
+        assert error.value.status_code == 429
+        assert error.value.retry_after >= 1
+        assert (await queue.stats())["rejected"] == 1
+    finally:
+        release.set()
+        await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_duplicate_job_id_is_rejected_while_queued_or_running():
+    """Test that a second job cannot take the ID of one that is waiting or running"""
+    release = asyncio.Event()
+
+    async def runner(job):
+        await release.wait()
+
+    queue = InProcessJobQueue(runner, concurrency=1, max_length=5)
+    await queue.start()
+    try:
+        await queue.submit("running", {})
+        await asyncio.sleep(0.01)
+        await queue.submit("waiting", {})
+
+        for job_id in ["running", "waiting"]:
+            with pytest.raises(ConflictException) as error:
+                await queue.submit(job_id, {"replacement": True})
+            assert error.value.status_code == 409
+
+        assert await queue.position("waiting") == 0
+        assert await queue.cancel("running")
+        await asyncio.sleep(0.01)
+        assert (await queue.stats())["cancelled"] == 1
+    finally:
+        release.set()
+        await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_cancel_withdraws_waiting_jobs_and_stops_running_ones():
+    """Test that cancelled jobs free their worker for the next job"""
+    started = []
+
+    async def runner(job):
+        started.append(job["id"])
+        await asyncio.sleep(10)
+
+    queue = InProcessJobQueue(runner, concurrency=1, max_length=5)
+    await queue.start()
+    try:
+        for job_id in ["a", "b", "c"]:
+            await queue.submit(job_id, {"id": job_id})
+        await asyncio.sleep(0.01)
+
+        assert await queue.cancel("b") is True
+        assert await queue.cancel("a") is True
+        await asyncio.sleep(0.01)
+
+        assert started == ["a", "c"]
+        assert await queue.cancel("unknown") is False
+        stats = await queue.stats()
+        assert stats["cancelled"] == 2
+        assert stats["running"] == 1
+    finally:
+        await queue.close()
+
+
+def test_job_queue_missing_a_method_fails_when_created():
+    """Test that an incomplete backend is rejected up front rather than mid-request"""
+
+    class SubmitOnlyQueue(JobQueue):
+        async def submit(self, job_id, payload):
+            pass
+
+    with pytest.raises(TypeError):
+        SubmitOnlyQueue(concurrency=1, max_length=1)
@@ -0,0 +1,130 @@
+"""
+Unit tests for the LLM executor
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.llm_executor import LLMExecutor, TokenBucket, raise_if_cancelled
+
+
+def test_token_bucket_delays_once_exhausted():
+    """Test that reservations beyond the bucket capacity must wait for refill"""
+    bucket = TokenBucket(rate_per_minute=60)  # one token per second
+
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+
+
+@pytest.mark.asyncio
+async def test_executor_bounds_concurrency_and_reports_queue_depth():
+    """Test that no more than max_concurrency calls run at once"""
+    executor = LLMExecutor(max_concurrency=2)
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def blocking_call():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return "done"
+
+    tasks = [asyncio.create_task(executor.run(blocking_call)) for _ in range(6)]
+    await asyncio.sleep(0.01)
+    assert executor.stats()["queue_depth"] == 4
+
+    results = await asyncio.gather(*tasks)
+
+    assert results == ["done"] * 6
+    assert peak == 2
+    assert executor.stats()["submitted"] == 6
+    assert executor.stats()["max_wait_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_executor_applies_request_rate_limit():
+    """Test that calls over the requests/min budget are spaced out"""
+    executor = LLMExecutor(max_concurrency=4, requests_per_minute=600)  # 10 per second
+    executor._request_bucket.reserve(600)
+
+    started = time.monotonic()
+    await executor.run(lambda: None)
+
+    assert time.monotonic() - started >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_cancelled_non_streaming_call_frees_its_slot_while_its_thread_finishes():
+    """Test that a call that never checks for cancellation does not hold its slot until it returns"""
+    executor = LLMExecutor(max_concurrency=1, max_abandoned=1)
+    started, respond = threading.Event(), threading.Event()
+
+    def blocking_call():
+        started.set()
+        respond.wait(5)
+        return "late"
+
+    task = asyncio.create_task(executor.run(blocking_call))
+    await asyncio.to_thread(started.wait, 1)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert await asyncio.wait_for(executor.run(lambda: "next"), 1) == "next"
+    stats = executor.stats()
+    assert stats["running"] == 0
+    assert stats["abandoned"] == 1 and stats["detached"] == 1
+
+    respond.set()
+    await asyncio.sleep(0.05)
+    assert executor.stats()["abandoned"] == 0
+    assert executor.stats()["detached"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_call_is_told_to_stop_and_holds_its_slot_until_it_returns():
+    """Test that without spare threads a cancelled call keeps its slot, so the pool is not overcommitted"""
+    executor = LLMExecutor(max_concurrency=1, max_abandoned=0)
+    started = threading.Event()
+
+    def streaming_call():
+        started.set()
+        while True:
+            time.sleep(0.01)
+            raise_if_cancelled()
+
+    task = asyncio.create_task(executor.run(streaming_call))
+    await asyncio.to_thread(started.wait, 1)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert executor.stats()["cancelled"] == 1
+    assert await asyncio.wait_for(executor.run(lambda: "next"), 1) == "next"
+    assert executor.stats()["running"] == 0
+    assert executor.stats()["abandoned"] == 0
+
+
+@pytest.mark.asyncio
+async def test_async_calls_share_the_limits_and_free_the_slot_when_cancelled():
+    """Test that coroutine calls are bounded like thread calls and release on cancel"""
+    executor = LLMExecutor(max_concurrency=1)
+
+    task = asyncio.create_task(executor.run_async(asyncio.sleep, 10))
+    await asyncio.sleep(0.01)
+    waiting = asyncio.create_task(executor.run_async(asyncio.sleep, 0, result="next"))
+    await asyncio.sleep(0.01)
+    assert executor.stats()["queue_depth"] == 1
+
+    task.cancel()
+    assert await asyncio.wait_for(waiting, 1) == "next"
+    assert executor.stats()["running"] == 0
+    assert executor.stats()["cancelled"] == 1
@@ -0,0 +1,92 @@
+"""
+Unit tests for the shared LLM HTTP client
+"""
+
+import copy
+import socket
+import threading
+import time
+
+import openai
+import pytest
+import uvicorn
+
+from app.services import llm_http
+from app.services.autogen_service import AutoGenService
+from app.services.llm_client import AsyncCompletionClient
+from app.services.specialized_autogen_service import SpecializedAutoGenService
+from scripts.mock_llm_server import MockLLMConfig, create_app
+
+MESSAGES = [{"role": "user", "content": "A bakery app"}]
+
+
+@pytest.fixture(scope="module")
+def mock_llm_url():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    config = MockLLMConfig(ttft_p50_ms=0, ttft_p99_ms=0, tokens_per_second=0, output_tokens=20, seed=1)
+    server = uvicorn.Server(uvicorn.Config(create_app(config), port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}/v1"
+    server.should_exit = True
+    thread.join()
+
+
+def test_all_agents_share_one_http_client():
+    """Test that both services and every agent config copy use the same pooled client"""
+    client = llm_http.get_llm_http_client()
+    specialized = SpecializedAutoGenService()
+    general = AutoGenService()
+
+    assert copy.deepcopy(client) is client
+    assert specialized.default_llm_config["http_client"] is client
+    assert general.default_llm_config["http_client"] is client
+    assert specialized._llm_config_for("summary")["http_client"] is client
+
+
+def test_new_connections_and_requests_are_counted():
+    """Test that the trace and response hooks record connection reuse"""
+    before = llm_http.stats()
+
+    llm_http._trace("connection.connect_tcp.complete", {})
+    for _ in range(4):
+        llm_http._on_response(type("Response", (), {"http_version": "HTTP/2"})())
+
+    after = llm_http.stats()
+    assert after["connections"] == before["connections"] + 1
+    assert after["requests"] == before["requests"] + 4
+    assert after["connection_reuse_ratio"] is not None
+
+
+def test_streamed_calls_reuse_connections(mock_llm_url):
+    """Test that a stream read to [DONE] hands its connection back to the pool"""
+    client = openai.OpenAI(
+        api_key="sk-mock", base_url=mock_llm_url, max_retries=0, http_client=llm_http.get_llm_http_client()
+    )
+    before = llm_http.stats()
+
+    for _ in range(3):
+        stream = client.chat.completions.create(model="mock", messages=MESSAGES, stream=True)
+        assert "".join(chunk.choices[0].delta.content or "" for chunk in stream if chunk.choices)
+
+    after = llm_http.stats()
+    assert after["requests"] - before["requests"] == 3
+    assert after["connections"] - before["connections"] <= 1
+
+
+@pytest.mark.asyncio
+async def test_async_streamed_calls_reuse_connections(mock_llm_url):
+    """Test connection reuse for streamed completions on the async execution path"""
+    client = AsyncCompletionClient({"api_key": "sk-mock", "base_url": mock_llm_url, "model": "mock", "stream": True})
+    before = llm_http.stats()
+
+    for _ in range(3):
+        assert await client.complete(MESSAGES)
+
+    after = llm_http.stats()
+    assert after["requests"] - before["requests"] == 3
+    assert after["connections"] - before["connections"] == 1
@@ -0,0 +1,87 @@
+"""
+Unit tests for the stand-in OpenAI server used in load tests
+"""
+
+import json
+import random
+
+from fastapi.testclient import TestClient
+
+from scripts.mock_llm_server import MockLLMConfig, create_app, lognormal_ms
+
+FAST = dict(ttft_p50_ms=0, ttft_p99_ms=0, tokens_per_second=0, output_tokens=20, seed=1)
+
+
+def completion(client: TestClient, content: str, **body):
+    return client.post(
+        "/v1/chat/completions",
+        json={"model": "mock", "messages": [{"role": "user", "content": content}], **body},
+    )
+
+
+def completion_until(client: TestClient, status_code: int):
+    while True:
+        response = completion(client, "idea")
+        if response.status_code == status_code:
+            return response
+
+
+def test_replies_are_deterministic_per_prompt():
+    """Test that the same prompt always gets the same reply and different prompts differ"""
+    client = TestClient(create_app(MockLLMConfig(**FAST)))
+
+    first = completion(client, "A bakery app").json()
+    again = completion(client, "A bakery app").json()
+    other = completion(client, "A fintech app").json()
+
+    reply = first["choices"][0]["message"]["content"]
+    assert reply == again["choices"][0]["message"]["content"]
+    assert reply != other["choices"][0]["message"]["content"]
+    assert first["usage"]["completion_tokens"] == 20
+
+
+def test_streamed_chunks_join_to_the_full_reply():
+    """Test that SSE chunks end with [DONE] and carry the non-streamed text"""
+    client = TestClient(create_app(MockLLMConfig(**FAST)))
+    full = completion(client, "A bakery app").json()["choices"][0]["message"]["content"]
+
+    response = completion(client, "A bakery app", stream=True)
+    lines = [line for line in response.text.split("\n\n") if line]
+    chunks = [json.loads(line[len("data: "):]) for line in lines[:-1]]
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert lines[-1] == "data: [DONE]"
+    assert "".join(chunk["choices"][0]["delta"].get("content", "") for chunk in chunks) == full
+    assert chunks[-1]["choices"][0]["finish_reason"] == "stop"
+
+
+def test_json_mode_returns_a_report():
+    """Test that json_object requests get a summary-shaped JSON reply"""
+    client = TestClient(create_app(MockLLMConfig(**FAST)))
+
+    reply = completion(client, "Summarize", response_format={"type": "json_object"}).json()
+    report = json.loads(reply["choices"][0]["message"]["content"])
+
+    assert 0 <= report["overall_score"] <= 100
+    assert set(report["metrics"]) == {"marketing_score", "product_score", "legal_score"}
+
+
+def test_errors_are_injected_at_the_configured_rates():
+    """Test that 429s carry Retry-After and 5xx responses are returned"""
+    client = TestClient(create_app(MockLLMConfig(**{**FAST, "rate_429": 0.3, "rate_5xx": 0.3})))
+
+    statuses = [completion(client, "idea").status_code for _ in range(200)]
+    throttled = completion_until(client, 429)
+
+    assert 40 < statuses.count(429) < 80
+    assert 40 < sum(status >= 500 for status in statuses) < 80
+    assert throttled.headers["Retry-After"] == "1"
+
+
+def test_latency_distribution_matches_percentiles():
+    """Test that sampled TTFTs have the configured median and 99th percentile"""
+    rng = random.Random(7)
+    samples = sorted(lognormal_ms(rng, 200, 1000) for _ in range(20000))
+
+    assert 185 < samples[10000] < 215
+    assert 900 < samples[19800] < 1100
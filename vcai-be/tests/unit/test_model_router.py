@@ -0,0 +1,81 @@
+"""
+Unit tests for per-agent model routing
+"""
+
+import pytest
+
+from app.services.model_router import ModelRouter, model_routes
+
+PHASES = {"marketing": "specialist_analysis", "verifier": "verification", "summary": "summary"}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_router(clock, **kwargs):
+    routes = {"verifier": ["small", "large"], "summary": ["large"]}
+    options = {"window_seconds": 60, "min_samples": 4, "max_error_rate": 0.25, "max_p95_seconds": 10.0}
+    return ModelRouter(routes, clock=clock, **{**options, **kwargs})
+
+
+def test_agent_models_win_over_phase_models_and_the_default():
+    """Test how each agent's ordered model list is resolved"""
+    routes = model_routes(
+        PHASES,
+        agent_models={"verifier": ["mini", "big", "mini"]},
+        phase_models={"verification": ["other"], "specialist_analysis": ["analyst"]},
+        default_model="default",
+    )
+
+    assert routes == {"marketing": ["analyst"], "verifier": ["mini", "big"], "summary": ["default"]}
+    with pytest.raises(ValueError):
+        model_routes(PHASES, agent_models={"typist": ["mini"]}, phase_models={}, default_model="default")
+
+
+def test_failing_model_is_passed_over_until_its_errors_age_out():
+    """Test fallback on error rate and recovery once the window has moved on"""
+    clock = FakeClock()
+    router = make_router(clock)
+
+    for _ in range(3):
+        router.record("verifier", "small", 1.0, ok=False)
+    # Too few calls to judge the model yet
+    assert router.choose("verifier") == "small"
+
+    router.record("verifier", "small", 1.0, ok=False)
+    assert router.degraded("small") == "error_rate"
+    assert router.choose("verifier") == "large"
+    assert router.stats()["fallbacks"] == 1
+
+    clock.now = 61
+    assert router.choose("verifier") == "small"
+
+
+def test_slow_model_is_passed_over():
+    """Test fallback when a model's p95 latency is over the limit"""
+    router = make_router(FakeClock())
+
+    for seconds in (2.0, 3.0, 4.0, 30.0):
+        router.record("verifier", "small", seconds, ok=True)
+
+    assert router.degraded("small") == "latency"
+    assert router.choose("verifier") == "large"
+    assert router.stats()["models"]["small"]["p95_seconds"] == 30.0
+
+
+def test_least_degraded_model_is_used_when_all_are_degraded():
+    """Test that the router still picks a model when none is healthy"""
+    router = make_router(FakeClock())
+
+    for _ in range(4):
+        router.record("verifier", "small", 1.0, ok=False)
+    for ok in (False, False, True, True):
+        router.record("summary", "large", 1.0, ok=ok)
+
+    assert router.choose("verifier") == "large"
+    assert router.choose("summary") == "large"
@@ -0,0 +1,62 @@
+"""
+Unit tests for token-budgeted prompt assembly
+"""
+
+from app.utils.prompt_budget import OMISSION_MARKER, PromptBuilder, trim_to_budget
+from app.utils.tokens import estimate_tokens
+
+ANALYSIS = "\n".join([
+    "## Market",
+    "The bakery segment has grown steadily and local demand looks healthy overall.",
+    "Background on how the founders met and the early history of the company.",
+    "Score: 78/100",
+    "A long aside about adjacent markets that the team may consider some day.",
+    "## Recommendations",
+    "- Recommend a pilot with three neighbourhood bakeries before fundraising.",
+    "Closing remarks that repeat earlier points in slightly different words.",
+])
+
+
+def test_text_within_budget_is_unchanged():
+    """Test that short text passes through untouched"""
+    assert trim_to_budget(ANALYSIS, 1000) == ANALYSIS
+
+
+def test_trimming_keeps_headings_scores_and_recommendations():
+    """Test that structure and conclusions survive before filler lines"""
+    trimmed = trim_to_budget(ANALYSIS, 50)
+
+    assert estimate_tokens(trimmed) <= 50
+    assert trimmed.splitlines() == [
+        "## Market",
+        OMISSION_MARKER,
+        "Score: 78/100",
+        OMISSION_MARKER,
+        "## Recommendations",
+        "- Recommend a pilot with three neighbourhood bakeries before fundraising.",
+        OMISSION_MARKER,
+    ]
+    assert trim_to_budget(ANALYSIS, 50) == trimmed
+
+
+def test_builder_gives_unused_share_to_larger_sections():
+    """Test that small sections stay whole and fixed text is never trimmed"""
+    builder = PromptBuilder(80)
+    builder.add("HEADER\n").add_section("short note\n").add_section(ANALYSIS).add("\nFOOTER")
+
+    prompt = builder.build()
+
+    assert prompt.startswith("HEADER\nshort note\n## Market")
+    assert prompt.endswith("\nFOOTER")
+    assert "Score: 78/100" in prompt
+    assert builder.prompt_tokens <= 80
+    assert builder.tokens_saved == builder.original_tokens - builder.prompt_tokens > 0
+
+
+def test_section_cap_applies_even_under_budget():
+    """Test that max_tokens bounds a section regardless of the overall budget"""
+    builder = PromptBuilder(10_000)
+    builder.add_section(ANALYSIS, max_tokens=20)
+
+    assert estimate_tokens(builder.build()) <= 20
+    assert builder.tokens_saved > 0
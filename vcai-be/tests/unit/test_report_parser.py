@@ -0,0 +1,100 @@
+"""
+Unit tests for summary report parsing
+"""
+
+import json
+
+from app.services.report_parser import REPORT_JSON_SCHEMA, IncrementalReportParser, parse_report
+
+REPORT = {
+    "overall_score": 82,
+    "metrics": {"marketing_score": 80, "product_score": 70, "legal_score": 90},
+    "recommendation": "HIGH_POTENTIAL",
+    "summary": "A \"promising\" idea,\nwith caveats.",
+    "key_strengths": ["Clear demand"],
+    "critical_risks": ["Crowded market"],
+    "recommendations": ["Run a pilot"],
+    "next_steps": ["Interview bakeries"],
+}
+
+
+def test_scores_are_reported_as_soon_as_they_complete():
+    """Test that watched fields come out of the stream before the narrative"""
+    text = json.dumps(REPORT, indent=2)
+    parser = IncrementalReportParser()
+
+    progress = []
+    for start in range(0, len(text), 5):
+        fields = parser.feed(text[start:start + 5])
+        if fields:
+            progress.append((start, fields))
+
+    assert [fields for _, fields in progress] == [
+        {"overall_score": 82},
+        {"metrics": {"marketing_score": 80}},
+        {"metrics": {"product_score": 70}},
+        {"metrics": {"legal_score": 90}},
+        {"recommendation": "HIGH_POTENTIAL"},
+    ]
+    assert progress[-1][0] < text.index('"summary"')
+
+
+def test_scanner_ignores_fences_and_unwatched_nested_values():
+    """Test that strings with braces and same-named nested keys do not confuse the scanner"""
+    parser = IncrementalReportParser()
+    text = '```json\n{"summary": "score {\\"overall_score\\": 1}", "extra": {"overall_score": 5}, "overall_score": 64}'
+
+    assert parser.feed(text) == {"overall_score": 64}
+
+
+def test_valid_json_is_parsed_and_normalized():
+    """Test that a fenced JSON reply is parsed and scores are clamped"""
+    reply = "```json\n" + json.dumps({**REPORT, "overall_score": 140}) + "\n```"
+
+    report = parse_report(reply)
+
+    assert report["overall_score"] == 100
+    assert report["metrics"] == REPORT["metrics"]
+    assert report["summary"] == REPORT["summary"]
+    assert report["next_steps"] == ["Interview bakeries"]
+
+
+def test_malformed_reply_falls_back_to_regex_extraction():
+    """Test that scores and lists are recovered from free text"""
+    reply = "\n".join([
+        "Overall Score: 58/100",
+        "Marketing score: 65",
+        "- Product Score: 40",
+        '"legal_score": 70,',
+        "",
+        "Key Strengths:",
+        "- Experienced team",
+        "Critical Risks",
+        "1. Thin margins",
+        "Next steps:",
+        "* Build an MVP",
+    ])
+
+    report = parse_report(reply)
+
+    assert report["overall_score"] == 58
+    assert report["recommendation"] == "MODERATE_POTENTIAL"
+    assert report["metrics"] == {"marketing_score": 65, "product_score": 40, "legal_score": 70}
+    assert report["key_strengths"] == ["Experienced team"]
+    assert report["critical_risks"] == ["Thin margins"]
+    assert report["next_steps"] == ["Build an MVP"]
+    assert report["summary"] == reply
+
+
+def test_null_section_score_is_kept():
+    """Test that an area scored null, as the prompt asks for failed analyses, stays null"""
+    metrics = REPORT_JSON_SCHEMA["properties"]["metrics"]["properties"]
+    assert all("null" in metrics[f"{area}_score"]["type"] for area in ("marketing", "product", "legal"))
+
+    reply = json.dumps({**REPORT, "metrics": {**REPORT["metrics"], "legal_score": None}})
+    assert parse_report(reply)["metrics"] == {"marketing_score": 80, "product_score": 70, "legal_score": None}
+    assert IncrementalReportParser().feed(reply)["metrics"]["legal_score"] is None
+
+    fallback = parse_report("Overall score: 70\nLegal score: N/A\nThe legal review scored 3 issues")
+    assert fallback["overall_score"] == 70
+    assert fallback["metrics"]["legal_score"] is None
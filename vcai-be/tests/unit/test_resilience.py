@@ -0,0 +1,102 @@
+"""
+Unit tests for agent call retries and hedging
+"""
+
+import asyncio
+import random
+
+import httpx
+import openai
+import pytest
+
+from app.services.resilience import ResilientCaller, backoff_delay, retry_reason
+
+
+def api_error(status_code: int, retry_after: str = None) -> openai.APIStatusError:
+    headers = {"retry-after": retry_after} if retry_after else {}
+    response = httpx.Response(status_code, headers=headers, request=httpx.Request("POST", "http://llm"))
+    error_class = openai.RateLimitError if status_code == 429 else openai.APIStatusError
+    return error_class("injected", response=response, body=None)
+
+
+def test_only_transient_errors_are_retried():
+    """Test the retry classification of API errors"""
+    assert retry_reason(api_error(429)) == "rate_limit"
+    assert retry_reason(api_error(503)) == "server"
+    assert retry_reason(TimeoutError()) == "timeout"
+    assert retry_reason(api_error(400)) is None
+    assert retry_reason(ValueError("bad prompt")) is None
+
+
+def test_backoff_is_jittered_and_capped():
+    """Test that delays are spread below the exponential ceiling"""
+    rng = random.Random(1)
+    delays = [backoff_delay(4, base=1.0, cap=5.0, rng=rng) for _ in range(200)]
+
+    assert max(delays) <= 5.0
+    assert min(delays) < 1.0
+    assert len(set(delays)) == len(delays)
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_call_is_retried_after_the_server_delay():
+    """Test that a 429 is retried and a non-retryable error is raised at once"""
+    caller = ResilientCaller(attempts=3, hedge_enabled=False)
+    failures = [api_error(429, retry_after="0.05")]
+
+    async def attempt(hedge):
+        if failures:
+            raise failures.pop()
+        return "reply"
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    assert await caller.call("marketing", attempt) == "reply"
+    assert loop.time() - started >= 0.05
+    assert caller.stats()["retries"] == 1
+
+    async def invalid(hedge):
+        raise api_error(400)
+
+    with pytest.raises(openai.APIStatusError):
+        await caller.call("marketing", invalid)
+    assert caller.stats()["retries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_within_the_rate_cap():
+    """Test that a call slower than recent latency gets a duplicate that wins"""
+    caller = ResilientCaller(
+        attempts=1, hedge_enabled=True, hedge_percentile=95, hedge_max_rate=0.5,
+        hedge_min_samples=5, latency_window=10,
+    )
+    for _ in range(5):
+        caller.latencies.record("legal", 0.01)
+        caller.hedge_budget.on_call()
+
+    cancelled = []
+
+    async def attempt(hedge):
+        if hedge:
+            return "hedged reply"
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return "slow reply"
+
+    assert await caller.call("legal", attempt) == "hedged reply"
+    await asyncio.sleep(0)
+    assert cancelled == [True]
+    assert caller.stats()["hedge_wins"] == 1
+
+    # The budget only earns max_rate of a hedge per call, so the next slow call isn't hedged
+    caller.hedge_budget._credit = 0.0
+
+    async def slowish(hedge):
+        await asyncio.sleep(0.05)
+        return "hedged" if hedge else "primary"
+
+    assert await caller.call("legal", slowish) == "primary"
+    assert caller.stats()["hedges"] == 1
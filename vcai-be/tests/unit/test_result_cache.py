@@ -0,0 +1,63 @@
+"""
+Unit tests for the agent result cache
+"""
+
+from app.services.result_cache import ResultCache, idea_fingerprint, make_cache_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_fingerprint_ignores_case_and_whitespace():
+    """Test that trivially different prompts share a fingerprint"""
+    files = [{"name": "deck.pdf", "sha256": "abc"}]
+
+    assert idea_fingerprint("An  AI\nidea ", files) == idea_fingerprint("an ai idea", files)
+    assert idea_fingerprint("an ai idea", files) != idea_fingerprint("an ai idea")
+    assert idea_fingerprint("an ai idea") != idea_fingerprint("another idea")
+
+
+def test_key_changes_with_system_message_and_model():
+    """Test that prompt or model changes invalidate cached replies"""
+    key = make_cache_key("marketing", "fp", "You are a marketer", "gpt-4")
+
+    assert key != make_cache_key("marketing", "fp", "You are a lawyer", "gpt-4")
+    assert key != make_cache_key("marketing", "fp", "You are a marketer", "gpt-4o")
+    assert key != make_cache_key("legal", "fp", "You are a marketer", "gpt-4")
+
+
+def test_least_recently_used_entry_is_evicted():
+    """Test that the entry cap evicts the coldest entry"""
+    cache = ResultCache(max_entries=2, max_bytes=1024, ttl_seconds=60)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_cap_and_ttl():
+    """Test that entries expire and the byte cap is enforced"""
+    clock = FakeClock()
+    cache = ResultCache(max_entries=10, max_bytes=8, ttl_seconds=60, clock=clock)
+    cache.set("a", "12345")
+    cache.set("b", "12345")
+
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 5
+
+    clock.now = 61
+    assert cache.get("b") is None
+
+    stats = cache.stats()
+    assert stats["entries"] == 0
+    assert stats["expirations"] == 1
+    assert stats["hits"] == 0
@@ -0,0 +1,508 @@
+"""
+Unit tests for the specialized AutoGen workflow
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import openai
+import pytest
+import pytest_asyncio
+from prometheus_client import REGISTRY
+
+from app.core.config import settings
+from app.core.exceptions import ConflictException
+from app.services.conversation_store import ConversationStore
+from app.services.model_router import ModelRouter, model_routes
+from app.services.resilience import ResilientCaller
+from app.services.agent_pool import session_key
+from app.services.specialized_autogen_service import (
+    AGENT_PHASES, JSON_SESSION_SUFFIX, SpecializedAutoGenService
+)
+from app.services.websocket_manager import manager
+from app.utils.tokens import estimate_tokens
+
+SPECIALIST_DELAYS = {"marketing": 0.05, "product": 0.10, "legal": 0.15}
+VERIFY_DELAY = 0.10
+
+
+@pytest_asyncio.fixture
+async def service(monkeypatch, tmp_path):
+    service = SpecializedAutoGenService(ConversationStore(f"sqlite:///{tmp_path}/vcai.db"))
+    await service.store.init()
+
+    async def fake_chat(agent_type, message, default_response, *args, **kwargs):
+        if agent_type in SPECIALIST_DELAYS:
+            await asyncio.sleep(SPECIALIST_DELAYS[agent_type])
+            return f"{agent_type} analysis"
+        if agent_type == "verifier":
+            await asyncio.sleep(VERIFY_DELAY)
+            return "verified"
+        return "summary"
+
+    monkeypatch.setattr(service, "_run_agent_chat", fake_chat)
+    yield service
+    await service.store.close()
+
+
+@pytest.fixture
+def events(monkeypatch):
+    captured = []
+
+    async def capture(message, conversation_id):
+        captured.append(message)
+
+    monkeypatch.setattr(manager, "broadcast_to_conversation", capture)
+    return captured
+
+
+@pytest.mark.asyncio
+async def test_verifications_are_pipelined(service, events):
+    """Test that each verification starts as soon as its specialist finishes"""
+    started = time.perf_counter()
+    result = await service.process_startup_analysis("An idea", conversation_id="conv-1")
+    elapsed = time.perf_counter() - started
+
+    # max(specialist + verify) = 0.25s; the old barrier + sequential loop took 0.45s
+    assert elapsed < 0.4
+    assert result["status"] == "completed"
+    assert set(result["metadata"]["verified_results"]) == {"marketing", "product", "legal"}
+    assert result["metadata"]["verified_results"]["legal"]["original_analysis"] == "legal analysis"
+
+
+@pytest.mark.asyncio
+async def test_events_keep_per_agent_order(service, events):
+    """Test that each specialist's analysis is broadcast before its verification"""
+    await service.process_startup_analysis("An idea", conversation_id="conv-1")
+
+    for agent_type in SPECIALIST_DELAYS:
+        kinds = [
+            event["type"] for event in events
+            if event.get("agent_type") == agent_type
+            or event.get("metadata", {}).get("specialist_type") == agent_type
+        ]
+        assert kinds.index("specialist_analysis") < kinds.index("verification_start")
+        assert kinds.index("verification_start") < kinds.index("verification_result")
+
+    statuses = [event["status"] for event in events if event["type"] == "conversation_status"]
+    assert statuses.count("verification") == 1
+
+
+@pytest.mark.asyncio
+async def test_results_are_persisted(service, events):
+    """Test that phase results and the report can be read back from the store"""
+    await service.process_startup_analysis("An idea", conversation_id="conv-1")
+
+    conversation = await service.get_conversation("conv-1")
+
+    assert conversation["status"] == "completed"
+    assert conversation["completed_at"] is not None
+    assert conversation["specialist_results"]["product"] == "product analysis"
+    assert conversation["verified_results"]["legal"]["verification_result"] == "verified"
+    assert conversation["final_report"]["summary"] == "summary"
+
+
+@pytest.mark.asyncio
+async def test_reused_conversation_id_leaves_the_earlier_run_untouched(service, events):
+    """Test that a duplicate ID is rejected without marking the stored conversation failed"""
+    await service.process_startup_analysis("An idea", conversation_id="dup-1")
+    events.clear()
+
+    with pytest.raises(ConflictException):
+        await service.process_startup_analysis("Another idea", conversation_id="dup-1")
+
+    conversation = await service.get_conversation("dup-1")
+    assert conversation["status"] == "completed"
+    assert conversation["error"] is None
+    assert conversation["final_report"]["summary"] == "summary"
+    assert events == []
+
+
+@pytest.mark.asyncio
+async def test_resubmitted_idea_is_served_from_cache(service, events, monkeypatch):
+    """Test that a trivially different resubmit skips every agent call unless refreshed"""
+    calls = []
+    fake_chat = service._run_agent_chat
+
+    async def counting_chat(agent_type, *args, **kwargs):
+        calls.append(agent_type)
+        return await fake_chat(agent_type, *args, **kwargs)
+
+    monkeypatch.setattr(service, "_run_agent_chat", counting_chat)
+
+    await service.process_startup_analysis("An idea", conversation_id="conv-1")
+    assert len(calls) == 7
+
+    result = await service.process_startup_analysis("  an   IDEA ", conversation_id="conv-2")
+    assert len(calls) == 7
+    assert result["report"]["summary"] == "summary"
+    assert service.result_cache.stats()["hits"] == 7
+
+    await service.process_startup_analysis("An idea", conversation_id="conv-3", force_refresh=True)
+    assert len(calls) == 14
+
+
+@pytest.mark.asyncio
+async def test_long_analyses_are_trimmed_and_savings_recorded(service, events, monkeypatch):
+    """Test that the summary prompt stays within budget and the saved tokens are stored"""
+    monkeypatch.setattr(settings, "SUMMARY_PROMPT_MAX_TOKENS", 400)
+    prompts = []
+    fake_chat = service._run_agent_chat
+
+    async def verbose_chat(agent_type, message, *args, **kwargs):
+        if agent_type == "summary":
+            prompts.append(message)
+            return "summary"
+        reply = await fake_chat(agent_type, message, *args, **kwargs)
+        return reply + "\nScore: 70/100\n" + "\n".join(f"detail line {i} " * 5 for i in range(50))
+
+    monkeypatch.setattr(service, "_run_agent_chat", verbose_chat)
+
+    result = await service.process_startup_analysis("An idea", conversation_id="conv-1")
+
+    assert estimate_tokens(prompts[0]) <= 400
+    assert prompts[0].count("Score: 70/100") == 6
+    saved = result["metadata"]["prompt_tokens_saved"]
+    assert saved["summary"] > 0
+    conversation = await service.get_conversation("conv-1")
+    assert conversation["metadata"]["prompt_tokens_saved"] == saved
+
+
+@pytest.mark.asyncio
+async def test_summary_scores_stream_before_the_final_report(service, events, monkeypatch):
+    """Test that scores reach clients while the summary streams and end up in the report"""
+    reply = json.dumps({
+        "overall_score": 81,
+        "metrics": {"marketing_score": 77, "product_score": 84, "legal_score": 69},
+        "recommendation": "HIGH_POTENTIAL",
+        "summary": "Strong idea.",
+        "key_strengths": ["Demand"],
+        "critical_risks": [],
+        "recommendations": [],
+        "next_steps": ["Pilot"],
+    })
+    fake_chat = service._run_agent_chat
+
+    async def streaming_chat(agent_type, message, default_response, conversation_id=None,
+                             stream_metadata=None, on_delta=None, **kwargs):
+        if agent_type != "summary":
+            return await fake_chat(agent_type, message, default_response)
+        for start in range(0, len(reply), 16):
+            await on_delta(reply[start:start + 16])
+        return reply
+
+    monkeypatch.setattr(service, "_run_agent_chat", streaming_chat)
+
+    result = await service.process_startup_analysis("An idea", conversation_id="conv-1")
+
+    types = [event["type"] for event in events]
+    progress = [event["fields"] for event in events if event["type"] == "report_progress"]
+    assert progress[0] == {"overall_score": 81}
+    assert len(progress) == 5
+    assert types.index("report_progress") < types.index("final_report")
+    report = result["report"]
+    assert report["overall_score"] == 81
+    assert report["metrics"]["legal_score"] == 69
+    assert report["summary"] == "Strong idea."
+    final = next(event for event in events if event["type"] == "final_report")
+    assert final["message"] == "Strong idea."
+
+
+@pytest.mark.asyncio
+async def test_phases_agents_and_failures_are_measured(service, events, monkeypatch):
+    """Test that a run records phase durations and the phase it failed in"""
+    def sample(name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0.0
+
+    totals_before = sample("vcai_analysis_phase_seconds_count", phase="total")
+    summaries_before = sample("vcai_analysis_phase_seconds_count", phase="summary_generation")
+
+    await service.process_startup_analysis("An idea", conversation_id="conv-1")
+
+    assert sample("vcai_analysis_phase_seconds_count", phase="total") == totals_before + 1
+    assert sample("vcai_analysis_phase_seconds_count", phase="summary_generation") == summaries_before + 1
+    assert sample("vcai_active_analyses") == 0
+
+    async def failing_summary(*args, **kwargs):
+        raise RuntimeError("summary agent unavailable")
+
+    monkeypatch.setattr(service, "_generate_summary_report", failing_summary)
+    errors_before = sample("vcai_analysis_errors_total", phase="summary_generation")
+
+    with pytest.raises(Exception):
+        await service.process_startup_analysis("Another idea", conversation_id="conv-2")
+
+    assert sample("vcai_analysis_errors_total", phase="summary_generation") == errors_before + 1
+    assert sample("vcai_active_analyses") == 0
+
+
+@pytest.mark.asyncio
+async def test_fast_profile_verifies_all_analyses_in_one_call(service, events, monkeypatch):
+    """Test that the fast profile makes one verifier call and keeps the verified_results shape"""
+    calls = []
+    fake_chat = service._run_agent_chat
+
+    async def batched_chat(agent_type, message, *args, **kwargs):
+        calls.append(agent_type)
+        if agent_type == "verifier":
+            return json.dumps({"marketing": "Sound.", "product": "Optimistic timeline.", "legal": "Check GDPR."})
+        return await fake_chat(agent_type, message, *args, **kwargs)
+
+    monkeypatch.setattr(service, "_run_agent_chat", batched_chat)
+
+    result = await service.process_startup_analysis("An idea", conversation_id="conv-1", profile="fast")
+
+    assert calls.count("verifier") == 1
+    assert len(calls) == 5
+    verified = result["metadata"]["verified_results"]
+    assert verified["product"] == {
+        "original_analysis": "product analysis",
+        "verification_result": "Optimistic timeline.",
+        "status": "verified",
+    }
+    assert {
+        event["metadata"]["specialist_type"]
+        for event in events if event["type"] == "verification_result"
+    } == {"marketing", "product", "legal"}
+
+    conversation = await service.get_conversation("conv-1")
+    assert conversation["metadata"]["workflow_profile"] == "fast"
+    assert conversation["verified_results"]["legal"]["verification_result"] == "Check GDPR."
+
+
+@pytest.mark.asyncio
+async def test_batched_verification_asks_the_model_for_a_json_object(service, events, monkeypatch):
+    """Test that the batched verifier call sets response_format, since free text can't be split"""
+    monkeypatch.setattr(settings, "LLM_EXECUTION_MODE", "async")
+    monkeypatch.setattr(settings, "STREAM_AGENT_OUTPUT", False)
+    monkeypatch.setattr(service, "_run_agent_chat", SpecializedAutoGenService._run_agent_chat.__get__(service))
+    reviews = {"marketing": "Sound.", "product": "Optimistic timeline.", "legal": "Check GDPR."}
+    verifier_configs = []
+
+    async def complete(messages, llm_config, on_delta=None):
+        if "Analysis Verification Expert" not in messages[0]["content"]:
+            return "analysis"
+        verifier_configs.append(llm_config)
+        if llm_config.get("response_format") == {"type": "json_object"}:
+            return json.dumps(reviews)
+        # Without JSON mode the model wraps its answer in prose
+        return f"Here is my review of each analysis: {json.dumps(reviews)} Let me know if you need more."
+
+    monkeypatch.setattr(service.completion_client, "complete", complete)
+
+    result = await service.process_startup_analysis("An idea", conversation_id="conv-1", profile="fast")
+
+    assert len(verifier_configs) == 1
+    verified = result["metadata"]["verified_results"]
+    assert {agent_type: review["verification_result"] for agent_type, review in verified.items()} == reviews
+    # Thread mode pools separate verifier sessions built for JSON replies
+    session = service._create_agent_session(session_key("verifier" + JSON_SESSION_SUFFIX, "gpt-4o-mini"))
+    assert session.agent.llm_config["response_format"] == {"type": "json_object"}
+    plain = service._create_agent_session(session_key("verifier", "gpt-4o-mini"))
+    assert "response_format" not in plain.agent.llm_config
+
+
+@pytest.mark.asyncio
+async def test_specialists_past_the_phase_timeout_leave_a_partial_report(service, events, monkeypatch):
+    """Test that unfinished specialists are cancelled and reported as missing sections"""
+    # marketing is verified after 0.15s, product after 0.2s and legal after 0.25s
+    monkeypatch.setattr(settings, "SPECIALIST_PHASE_TIMEOUT_SECONDS", 0.18)
+
+    result = await service.process_startup_analysis("An idea", conversation_id="conv-1")
+
+    report = result["report"]
+    assert result["status"] == "completed"
+    assert report["partial"] is True
+    assert report["missing_sections"] == ["product", "legal"]
+    assert list(result["metadata"]["verified_results"]) == ["marketing"]
+    completed = next(event for event in events if event.get("status") == "completed")
+    assert "product, legal" in completed["metadata"]["message"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_analysis_is_recorded_and_broadcast(service, events):
+    """Test that cancelling a run marks the conversation cancelled and stops its agents"""
+    task = asyncio.create_task(service.process_startup_analysis("An idea", conversation_id="conv-1"))
+    await asyncio.sleep(0.07)
+    task.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    conversation = await service.get_conversation("conv-1")
+    assert conversation["status"] == "cancelled"
+    assert events[-1]["status"] == "cancelled"
+    await asyncio.sleep(0.2)
+    assert not any(event["type"] == "verification_result" for event in events)
+
+
+@pytest.mark.asyncio
+async def test_transient_agent_failure_is_retried_instead_of_failing_the_run(service, events, monkeypatch):
+    """Test that a 503 from one specialist is retried and the analysis completes"""
+    service.resilience = ResilientCaller(attempts=3, base_delay=0.01, hedge_enabled=False)
+    fake_chat = service._run_agent_chat
+    failures = {"product": 1}
+
+    async def flaky_chat(agent_type, message, *args, **kwargs):
+        if failures.get(agent_type):
+            failures[agent_type] -= 1
+            response = httpx.Response(503, request=httpx.Request("POST", "http://llm"))
+            raise openai.InternalServerError("overloaded", response=response, body=None)
+        return await fake_chat(agent_type, message, *args, **kwargs)
+
+    monkeypatch.setattr(service, "_run_agent_chat", flaky_chat)
+
+    result = await service.process_startup_analysis("An idea", conversation_id="conv-1")
+
+    assert result["status"] == "completed"
+    assert result["metadata"]["specialist_results"]["product"] == "product analysis"
+    assert service.resilience.stats()["retries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_retried_stream_is_preceded_by_a_reset_frame(service, events, monkeypatch):
+    """Test that clients are told to drop a failed attempt's deltas before the retry streams"""
+    monkeypatch.setattr(settings, "LLM_EXECUTION_MODE", "async")
+    monkeypatch.setattr(settings, "STREAM_AGENT_OUTPUT", True)
+    monkeypatch.setattr(service, "_run_agent_chat", SpecializedAutoGenService._run_agent_chat.__get__(service))
+    service.resilience = ResilientCaller(attempts=2, base_delay=0.01, hedge_enabled=False)
+    reply = json.dumps({"overall_score": 81, "metrics": {"marketing_score": 77}, "summary": "Strong idea."})
+    summary_calls = []
+
+    async def complete(messages, llm_config, on_delta=None):
+        if "response_format" not in llm_config:
+            return "analysis"
+        summary_calls.append(llm_config)
+        if len(summary_calls) == 1:
+            on_delta('{"overall_score": 4')
+            await asyncio.sleep(0.05)
+            response = httpx.Response(503, request=httpx.Request("POST", "http://llm"))
+            raise openai.InternalServerError("overloaded", response=response, body=None)
+        on_delta(reply)
+        return reply
+
+    monkeypatch.setattr(service.completion_client, "complete", complete)
+
+    await service.process_startup_analysis("An idea", conversation_id="conv-1")
+
+    summary_events = [
+        event for event in events
+        if event.get("agent_type") == "summary" and event["type"] in ("agent_message_delta", "agent_message_reset")
+    ]
+    kinds = [event["type"] for event in summary_events]
+    assert kinds == ["agent_message_delta", "agent_message_reset", "agent_message_delta"]
+    assert summary_events[1]["attempt"] == 2
+    assert summary_events[2]["delta_index"] == 0 and summary_events[2]["delta"] == reply
+    progress = [event["fields"] for event in events if event["type"] == "report_progress"]
+    assert progress[0]["overall_score"] == 81
+
+
+@pytest.mark.asyncio
+async def test_async_execution_mode_runs_agent_chats_as_coroutines(service, events, monkeypatch):
+    """Test that async mode streams a completion from the event loop thread"""
+    monkeypatch.setattr(settings, "LLM_EXECUTION_MODE", "async")
+    monkeypatch.setattr(settings, "STREAM_AGENT_OUTPUT", True)
+    calls = []
+
+    async def complete(messages, llm_config, on_delta=None):
+        calls.append((threading.current_thread(), messages, llm_config))
+        for part in ("Strong ", "market."):
+            on_delta(part)
+            await asyncio.sleep(0)
+        return "Strong market."
+
+    monkeypatch.setattr(service.completion_client, "complete", complete)
+
+    reply = await SpecializedAutoGenService._run_agent_chat(
+        service, "summary", "Verified analyses", "none", "conv-1", {"message_type": "final_report"}
+    )
+
+    assert reply == "Strong market."
+    thread, messages, llm_config = calls[0]
+    assert thread is threading.main_thread()
+    assert messages[0]["role"] == "system" and messages[1]["content"] == "Verified analyses"
+    assert llm_config["response_format"] == {"type": "json_object"}
+    deltas = [event["delta"] for event in events if event["type"] == "agent_message_delta"]
+    assert "".join(deltas) == "Strong market."
+
+
+@pytest.mark.asyncio
+async def test_verifier_falls_back_from_a_failing_model_and_calls_are_recorded(service, events, monkeypatch):
+    """Test that a degraded preferred model is routed around and each call's model is stored"""
+    monkeypatch.setattr(settings, "LLM_EXECUTION_MODE", "async")
+    monkeypatch.setattr(settings, "STREAM_AGENT_OUTPUT", False)
+    monkeypatch.setattr(service, "_run_agent_chat", SpecializedAutoGenService._run_agent_chat.__get__(service))
+    service.resilience = ResilientCaller(attempts=3, base_delay=0.01, hedge_enabled=False)
+    routes = model_routes(AGENT_PHASES, agent_models={"verifier": ["mini", "large"]}, phase_models={})
+    service.model_router = ModelRouter(routes, min_samples=1, max_error_rate=0.5)
+
+    async def complete(messages, llm_config, on_delta=None):
+        if llm_config["model"] == "mini":
+            response = httpx.Response(503, request=httpx.Request("POST", "http://llm"))
+            raise openai.InternalServerError("overloaded", response=response, body=None)
+        return f"reply from {llm_config['model']}"
+
+    monkeypatch.setattr(service.completion_client, "complete", complete)
+
+    result = await service.process_startup_analysis("An idea", conversation_id="conv-1")
+
+    verified = result["metadata"]["verified_results"]
+    assert {review["verification_result"] for review in verified.values()} == {"reply from large"}
+    calls = result["metadata"]["model_calls"]
+    verifier_calls = [call for call in calls if call["agent_type"] == "verifier"]
+    assert verifier_calls[0]["model"] == "mini" and verifier_calls[0]["status"] == "error"
+    assert {call["model"] for call in verifier_calls if call["status"] == "completed"} == {"large"}
+    assert all(call["fallback"] for call in verifier_calls if call["model"] == "large")
+    assert {call["phase"] for call in calls} == {"specialist_analysis", "verification", "summary"}
+
+    conversation = await service.get_conversation("conv-1")
+    assert conversation["metadata"]["model_calls"] == calls
+
+
+@pytest.mark.asyncio
+async def test_fallback_model_replies_are_not_cached_as_the_preferred_model(service, events, monkeypatch):
+    """Test that only replies from an agent's preferred model are reused by later runs"""
+    monkeypatch.setattr(settings, "LLM_EXECUTION_MODE", "async")
+    monkeypatch.setattr(settings, "STREAM_AGENT_OUTPUT", False)
+    monkeypatch.setattr(service, "_run_agent_chat", SpecializedAutoGenService._run_agent_chat.__get__(service))
+    service.resilience = ResilientCaller(attempts=3, base_delay=0.01, hedge_enabled=False)
+    routes = model_routes(AGENT_PHASES, agent_models={"verifier": ["mini", "large"]}, phase_models={})
+    service.model_router = ModelRouter(routes, min_samples=1, max_error_rate=0.5)
+    models = []
+
+    async def complete(messages, llm_config, on_delta=None):
+        models.append(llm_config["model"])
+        if llm_config["model"] == "mini":
+            response = httpx.Response(503, request=httpx.Request("POST", "http://llm"))
+            raise openai.InternalServerError("overloaded", response=response, body=None)
+        return f"reply from {llm_config['model']}"
+
+    monkeypatch.setattr(service.completion_client, "complete", complete)
+
+    await service.process_startup_analysis("An idea", conversation_id="conv-1")
+    models.clear()
+    result = await service.process_startup_analysis("An idea", conversation_id="conv-2")
+
+    # Specialists and summary came from the cache; the verifications ran again
+    assert models.count("large") == 3 and "mini" not in models
+    verified = result["metadata"]["verified_results"]
+    assert {review["verification_result"] for review in verified.values()} == {"reply from large"}
+
+
+@pytest.mark.asyncio
+async def test_uploads_are_deleted_when_the_analysis_finishes(service, events, monkeypatch, tmp_path):
+    """Test that a run removes its attachments once the report is built"""
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    directory = tmp_path / "uploads" / "run-1"
+    directory.mkdir(parents=True)
+    deck = directory / "deck.txt"
+    deck.write_text("Pricing and market size")
+    files = [{"name": "deck.txt", "type": "text/plain", "size": 23, "path": str(deck)}]
+
+    result = await service.process_startup_analysis("An idea", files, conversation_id="conv-1")
+
+    assert result["status"] == "completed"
+    assert not directory.exists()
@@ -0,0 +1,252 @@
+"""
+Unit tests for WebSocket fan-out
+"""
+
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+from prometheus_client import REGISTRY
+
+from app.services.event_bus import EventBus, InMemoryEventBus
+from app.services.websocket_manager import SLOW_CONSUMER_CLOSE_CODE, ConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self, blocked: bool = False):
+        self.sent = []
+        self.closed_with = None
+        self.unblock = asyncio.Event()
+        if not blocked:
+            self.unblock.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        await self.unblock.wait()
+        self.sent.append(text)
+
+    async def close(self, code=1000, reason=None):
+        self.closed_with = code
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest_asyncio.fixture
+async def make_manager():
+    managers = []
+
+    def make(**kwargs):
+        managers.append(ConnectionManager(**kwargs))
+        return managers[-1]
+
+    yield make
+    for manager in managers:
+        for client_id in list(manager.active_connections):
+            manager.disconnect(client_id)
+    await settle()
+
+
+@pytest.mark.asyncio
+async def test_slow_client_does_not_block_broadcast(make_manager):
+    """Test that a stalled client neither blocks the caller nor other clients"""
+    manager = make_manager(max_queue_size=8)
+    fast, slow = FakeWebSocket(), FakeWebSocket(blocked=True)
+    for client_id, websocket in [("fast", fast), ("slow", slow)]:
+        await manager.connect(websocket, client_id)
+        manager.join_conversation(client_id, "conv-1")
+
+    for status in ["started", "specialist_analysis"]:
+        await asyncio.wait_for(
+            manager.broadcast_conversation_status("conv-1", status), timeout=0.1
+        )
+    await settle()
+
+    assert [json.loads(text)["status"] for text in fast.sent] == ["started", "specialist_analysis"]
+    assert slow.sent == []
+    # One frame is in flight on the stalled socket, the other is still queued
+    assert manager.stats()["max_queue_depth"] == 1
+
+    slow.unblock.set()
+    await settle()
+    # Serialized once and shared by every recipient
+    assert slow.sent[0] is fast.sent[0]
+
+
+@pytest.mark.asyncio
+async def test_typing_indicators_are_dropped_before_disconnecting(make_manager):
+    """Test the slow-consumer policy on a full queue"""
+    manager = make_manager(max_queue_size=2)
+    slow = FakeWebSocket(blocked=True)
+    await manager.connect(slow, "slow")
+    manager.join_conversation("slow", "conv-1")
+    await settle()
+
+    await manager.broadcast_typing_indicator("conv-1", "marketing", True)
+    await manager.broadcast_agent_message("conv-1", "marketing", "analysis 1")
+    await manager.broadcast_typing_indicator("conv-1", "marketing", False)
+    await manager.broadcast_agent_message("conv-1", "marketing", "analysis 2")
+
+    queued = [json.loads(text)["type"] for text, _ in manager.active_connections["slow"].queue]
+    assert queued == ["agent_message", "agent_message"]
+    assert manager.stats()["frames_dropped"] == 2
+
+    await manager.broadcast_agent_message("conv-1", "marketing", "analysis 3")
+    await settle()
+
+    stats = manager.stats()
+    assert "slow" not in manager.active_connections
+    assert "conv-1" not in manager.conversation_connections
+    assert stats["slow_consumer_disconnects"] == 1
+    assert slow.closed_with == SLOW_CONSUMER_CLOSE_CODE
+
+
+@pytest.mark.asyncio
+async def test_stale_disconnect_keeps_reconnected_client(make_manager):
+    """Test that the old socket's cleanup does not remove a reconnected client"""
+    manager = make_manager()
+    old, new = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(old, "client")
+    await manager.connect(new, "client")
+    manager.join_conversation("client", "conv-1")
+
+    manager.disconnect("client", old)
+
+    assert manager.active_connections["client"].websocket is new
+    assert manager.conversation_connections["conv-1"] == {"client"}
+
+
+@pytest.mark.asyncio
+async def test_disconnect_leaves_every_room(make_manager):
+    """Test that a client in several rooms is removed from all of them"""
+    manager = make_manager()
+    await manager.connect(FakeWebSocket(), "multi")
+    await manager.connect(FakeWebSocket(), "single")
+    for conversation_id in ["conv-1", "conv-2", "conv-3"]:
+        manager.join_conversation("multi", conversation_id)
+    manager.join_conversation("single", "conv-2")
+
+    manager.leave_conversation("multi", "conv-3")
+    assert manager.client_conversations["multi"] == {"conv-1", "conv-2"}
+    assert "conv-3" not in manager.conversation_connections
+
+    manager.disconnect("multi")
+
+    assert manager.conversation_connections == {"conv-2": {"single"}}
+    assert "multi" not in manager.client_conversations
+
+
+@pytest.mark.asyncio
+async def test_events_reach_sockets_on_other_workers(make_manager):
+    """Test that a broadcast from one worker is delivered by the worker holding the socket"""
+    bus = InMemoryEventBus()
+    worker_a, worker_b = make_manager(event_bus=bus), make_manager(event_bus=bus)
+    await worker_a.start()
+    await worker_b.start()
+
+    local, remote = FakeWebSocket(), FakeWebSocket()
+    await worker_a.connect(local, "local")
+    await worker_b.connect(remote, "remote")
+    worker_a.join_conversation("local", "conv-1")
+    worker_b.join_conversation("remote", "conv-1")
+
+    await worker_a.broadcast_typing_indicator("conv-1", "marketing", True)
+    await settle()
+
+    assert len(local.sent) == 1
+    assert remote.sent == local.sent
+    assert json.loads(remote.sent[0])["type"] == "typing_indicator"
+    assert worker_b.stats()["event_bus"] == "memory"
+
+
+class SharedSeqEventBus(InMemoryEventBus):
+    """In-memory bus that numbers events across workers, as the Redis bus does"""
+
+    def __init__(self):
+        super().__init__()
+        self.seqs = {}
+
+    async def next_seq(self, conversation_id):
+        self.seqs[conversation_id] = self.seqs.get(conversation_id, 0) + 1
+        return self.seqs[conversation_id]
+
+
+@pytest.mark.asyncio
+async def test_events_from_different_workers_share_one_seq_sequence(make_manager):
+    """Test that a status from a web worker continues the seqs of the worker running the job"""
+    bus = SharedSeqEventBus()
+    job_worker, web_worker = make_manager(event_bus=bus), make_manager(event_bus=bus)
+    await job_worker.start()
+    await web_worker.start()
+
+    client = FakeWebSocket()
+    await job_worker.connect(client, "client")
+    job_worker.join_conversation("client", "conv-1")
+
+    await job_worker.broadcast_conversation_status("conv-1", "started")
+    await job_worker.broadcast_agent_message("conv-1", "marketing", "analysis")
+    await web_worker.broadcast_conversation_status("conv-1", "cancelled")
+    await asyncio.sleep(0.01)
+
+    assert [json.loads(text)["seq"] for text in client.sent] == [1, 2, 3]
+    frames, _ = job_worker.event_log.replay("conv-1", 2)
+    assert json.loads(frames[0])["status"] == "cancelled"
+
+
+@pytest.mark.asyncio
+async def test_late_joiner_gets_missed_events_before_live_ones(make_manager):
+    """Test that joining with last_seq replays logged events in order"""
+    manager = make_manager()
+    await manager.broadcast_conversation_status("conv-1", "started")
+    await manager.broadcast_typing_indicator("conv-1", "marketing", True)
+    await manager.broadcast_conversation_status("conv-1", "specialist_analysis")
+
+    late = FakeWebSocket()
+    await manager.connect(late, "late")
+    manager.join_conversation("late", "conv-1", last_seq=1)
+    await manager.broadcast_agent_message("conv-1", "marketing", "analysis")
+    await settle()
+
+    received = [json.loads(text) for text in late.sent]
+    assert [event["seq"] for event in received] == [2, 3]
+    assert received[0]["status"] == "specialist_analysis"
+    assert received[1]["type"] == "agent_message"
+
+
+@pytest.mark.asyncio
+async def test_connections_and_fanout_are_measured(make_manager):
+    """Test that the connection gauge follows connects and each broadcast records its fan-out"""
+    manager = make_manager()
+    gauge = lambda: REGISTRY.get_sample_value("vcai_websocket_connections")
+    fanout = lambda: REGISTRY.get_sample_value("vcai_websocket_broadcast_fanout_sum")
+    connections_before, fanout_before = gauge(), fanout()
+
+    for client_id in ["a", "b", "c"]:
+        await manager.connect(FakeWebSocket(), client_id)
+        manager.join_conversation(client_id, "conv-1")
+    await manager.broadcast_agent_message("conv-1", "marketing", "hello")
+    await settle()
+
+    assert gauge() == connections_before + 3
+    assert fanout() == fanout_before + 3
+    assert REGISTRY.get_sample_value("vcai_websocket_send_seconds_count") >= 3
+
+    manager.disconnect("a")
+    manager.disconnect("a")
+    assert gauge() == connections_before + 2
+
+
+def test_event_bus_missing_a_method_fails_when_created():
+    """Test that an incomplete backend is rejected up front rather than mid-request"""
+
+    class SilentBus(EventBus):
+        async def start(self, handler):
+            pass
+
+    with pytest.raises(TypeError):
+        SilentBus()
@@ -0,0 +1,136 @@
+"""
+Unit tests for the Celery worker task
+"""
+
+import asyncio
+
+import pytest
+
+from app import worker
+from app.services.conversation_store import ConversationStore
+from app.services.job_queue import RUNNING_KEY_PREFIX
+from app.services.specialized_autogen_service import SpecializedAutoGenService
+
+
+class FakeRedis:
+    """The few synchronous Redis commands the worker uses"""
+
+    def __init__(self):
+        self.values = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def exists(self, key):
+        return int(key in self.values)
+
+    def expire(self, key, seconds):
+        return key in self.values
+
+    def delete(self, key):
+        return int(self.values.pop(key, None) is not None)
+
+    def zrem(self, key, member):
+        return 0
+
+    def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+    def incrbyfloat(self, key, amount):
+        self.values[key] = float(self.values.get(key, 0)) + amount
+        return self.values[key]
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self._client = client
+        self._commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._commands.append((getattr(self._client, name), args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        return [command(*args, **kwargs) for command, args, kwargs in self._commands]
+
+
+@pytest.fixture
+def celery_worker(monkeypatch, tmp_path):
+    """The worker module with fake Redis, a test database and agents that answer at once"""
+    calls = []
+    services = []
+
+    async def get_service():
+        if not services:
+            service = SpecializedAutoGenService(ConversationStore(f"sqlite:///{tmp_path}/vcai.db"))
+            await service.store.init()
+
+            async def fake_chat(agent_type, message, default_response, *args, **kwargs):
+                calls.append(agent_type)
+                return f"{agent_type} reply"
+
+            monkeypatch.setattr(service, "_run_agent_chat", fake_chat)
+            services.append(service)
+        return services[0]
+
+    client = FakeRedis()
+    monkeypatch.setattr(worker, "_loop", None)
+    monkeypatch.setattr(worker, "_get_redis", lambda: client)
+    monkeypatch.setattr(worker, "_get_service", get_service)
+    yield worker, client, calls, get_service
+
+    if services:
+        worker._run(services[0].store.close())
+    worker._loop.close()
+    asyncio.set_event_loop(None)
+
+
+def test_redelivered_job_restarts_a_run_left_processing_and_later_copies_are_dropped(celery_worker):
+    """Test delivering the same job twice after its first worker was lost"""
+    worker, client, calls, get_service = celery_worker
+    service = worker._run(get_service())
+
+    # The lost worker stored the conversation and a result; its running key has expired
+    async def lost_run():
+        await service.store.create_conversation("conv-1", "An idea")
+        service.store.record_phase_result("conv-1", "specialist_analysis", "marketing", {"text": "stale"})
+        await service.store.flush()
+
+    worker._run(lost_run())
+    job = {"conversation_id": "conv-1", "prompt": "An idea"}
+
+    worker.run_startup_analysis(**job)
+
+    conversation = worker._run(service.store.get_conversation("conv-1"))
+    assert conversation["status"] == "completed"
+    assert conversation["specialist_results"]["marketing"] == "marketing reply"
+    assert f"{RUNNING_KEY_PREFIX}conv-1" not in client.values
+    assert len(calls) == 7
+
+    worker.run_startup_analysis(**job)
+
+    assert len(calls) == 7
+    assert worker._run(service.store.get_conversation("conv-1"))["status"] == "completed"
+
+
+def test_job_delivered_while_another_worker_runs_it_is_dropped(celery_worker):
+    """Test that a live worker's running key keeps a second delivery from starting the run again"""
+    worker, client, calls, get_service = celery_worker
+    service = worker._run(get_service())
+    worker._run(service.store.create_conversation("conv-1", "An idea"))
+    client.set(f"{RUNNING_KEY_PREFIX}conv-1", 1)
+
+    worker.run_startup_analysis(conversation_id="conv-1", prompt="An idea")
+
+    assert calls == []
+    assert worker._run(service.store.get_conversation("conv-1"))["status"] == "processing"
+    assert f"{RUNNING_KEY_PREFIX}conv-1" in client.values
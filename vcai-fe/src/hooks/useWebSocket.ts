@@ -7,6 +7,8 @@ export interface WebSocketMessage {
   message?: string;
   is_typing?: boolean;
   status?: string;
+  // Set on every replayable event; used to resume after a reconnect
+  seq?: number;
   timestamp: number;
   metadata?: Record<string, any>;
 }
@@ -39,6 +41,12 @@ export const useWebSocket = (options: UseWebSocketOptions) => {
 
   const wsRef = useRef<WebSocket | null>(null);
   const reconnectTimeoutRef = useRef<NodeJS.Timeout>();
+  // Highest seq received; the server replays everything after it on (re)connect
+  const lastSeqRef = useRef(0);
+
+  useEffect(() => {
+    lastSeqRef.current = 0;
+  }, [url]);
 
   const connect = useCallback(() => {
     if (wsRef.current?.readyState === WebSocket.OPEN) {
@@ -49,7 +57,9 @@ export const useWebSocket = (options: UseWebSocketOptions) => {
     setConnectionError(null);
 
     try {
-      const ws = new WebSocket(url);
+      const target = new URL(url);
+      target.searchParams.set("last_seq", String(lastSeqRef.current));
+      const ws = new WebSocket(target.toString());
       wsRef.current = ws;
 
       ws.onopen = () => {
@@ -64,6 +74,13 @@ export const useWebSocket = (options: UseWebSocketOptions) => {
       ws.onmessage = (event) => {
         try {
           const message: WebSocketMessage = JSON.parse(event.data);
+          if (typeof message.seq === "number") {
+            // Already seen before a reconnect
+            if (message.seq <= lastSeqRef.current) {
+              return;
+            }
+            lastSeqRef.current = message.seq;
+          }
           onMessage?.(message);
         } catch (error) {
           console.error("Failed to parse WebSocket message:", error);
@@ -21,6 +21,13 @@ export interface ConversationStatus {
   has_final_report: boolean;
 }
 
+export interface ConversationPage {
+  conversations: Array<Record<string, any>>;
+  limit: number;
+  // Pass back as `cursor` for the next page; null on the last page
+  next_cursor: string | null;
+}
+
 export interface AgentInfo {
   agent_id: string;
   name: string;
@@ -125,12 +132,15 @@ class BackendApiService {
   }
 
   /**
-   * List all conversations
+   * List conversations newest first, one page at a time
    */
-  async listConversations(limit = 10, offset = 0): Promise<any> {
+  async listConversations(
+    limit = 10,
+    cursor?: string | null
+  ): Promise<ConversationPage> {
     try {
       const response = await api.get(`/api/v1/chat/conversations`, {
-        params: { limit, offset },
+        params: cursor ? { limit, cursor } : { limit },
       });
       return response.data;
     } catch (error) {